@@ -1,5 +1,11 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
 import pykociemba
+import hashlib
+import json
+import math
+import os
+import queue
+import threading
 import time
 
 # Import the custom tools as requested
@@ -8,74 +14,306 @@ from pykociemba.scramble_to_state import scramble_to_state
 
 app = Flask(__name__)
 
+# Sampled cProfile capture of live solves, switched on by setting SOLVE_PROFILE_DIR
+if os.environ.get('SOLVE_PROFILE_DIR'):
+    slow_ms = os.environ.get('SOLVE_PROFILE_SLOW_MS')
+    pykociemba.set_profiler(pykociemba.SamplingProfiler(
+        os.environ['SOLVE_PROFILE_DIR'],
+        sample_rate=float(os.environ.get('SOLVE_PROFILE_RATE', '0.01')),
+        slow_ms=float(slow_ms) if slow_ms else None,
+        max_files=int(os.environ.get('SOLVE_PROFILE_KEEP', '100')),
+    ))
+
+# Server policy for /solve: at most SOLVE_CONCURRENCY solves at once (default: one per core) and SOLVE_QUEUE waiting.
+# Requests may ask for a max_depth (clamped to SOLVE_MIN_DEPTH..24) and a timeout in seconds (at most
+# SOLVE_MAX_TIMEOUT, the default), which is the budget for waiting and solving together.
+SOLVE_MAX_TIMEOUT = float(os.environ.get('SOLVE_MAX_TIMEOUT', '120'))
+SOLVE_MIN_DEPTH = int(os.environ.get('SOLVE_MIN_DEPTH', '20'))
+admission = pykociemba.AdmissionController(int(os.environ.get('SOLVE_CONCURRENCY', '0')) or os.cpu_count() or 1,
+                                           int(os.environ.get('SOLVE_QUEUE', '16')))
+
+# /get_scramble hands out random-state scrambles from a pool of SCRAMBLE_POOL_SIZE (default 0: plain random face turns),
+# kept in SCRAMBLE_POOL_FILE if set and refilled by a thread or SCRAMBLE_POOL_PROCESSES processes. The refills are full
+# solves outside of the admission control, so they slow down /solve on a busy server. A request waits up to
+# SCRAMBLE_POOL_WAIT seconds for the pool before it falls back to random face turns.
+scramble_pool = None
+if int(os.environ.get('SCRAMBLE_POOL_SIZE', '0')) > 0:
+    scramble_pool = pykociemba.ScramblePool(int(os.environ['SCRAMBLE_POOL_SIZE']),
+                                            min_length=int(os.environ.get('SCRAMBLE_POOL_MIN_LENGTH', '0')),
+                                            path=os.environ.get('SCRAMBLE_POOL_FILE'),
+                                            processes=int(os.environ.get('SCRAMBLE_POOL_PROCESSES', '0')))
+SCRAMBLE_POOL_WAIT = float(os.environ.get('SCRAMBLE_POOL_WAIT', '5'))
+
+# GET /solve and GET /get_state_from_scramble answer with strong ETags derived from the input and the solver version,
+# and may be cached by browsers and proxies for SOLVE_CACHE_MAX_AGE seconds.
+SOLVE_CACHE_MAX_AGE = int(os.environ.get('SOLVE_CACHE_MAX_AGE', '86400'))
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
-@app.route('/get_scramble', methods=['GET'])
-def get_scramble_route():
-    """Generates a random scramble using the provided tool and returns it as a string."""
-    scramble_list = random_scramble()
+# The request handling below is shared with the ASGI version of the app in asgi.py: each helper returns the JSON
+# payload and the HTTP status.
+
+def scramble_response():
+    """A random scramble as a string, to a random state if the scramble pool has one."""
+    scramble_list = None
+    if scramble_pool is not None:
+        # started on first use, so that only the process serving requests refills it
+        scramble_list = scramble_pool.start().get(SCRAMBLE_POOL_WAIT)
+    if scramble_list is None:
+        scramble_list = random_scramble()
     scramble_string = " ".join(scramble_list)
-    return jsonify({'scramble': scramble_string})
+    return {'scramble': scramble_string}, 200
 
-@app.route('/get_state_from_scramble', methods=['POST'])
-def get_state_from_scramble_route():
-    """Converts a scramble string to a state string."""
-    data = request.get_json()
+def state_response(data):
+    """Converts the scramble string of a request to a state string."""
     if not data or 'scramble' not in data:
-        return jsonify({'error': 'Scramble string not provided'}), 400
+        return {'error': 'Scramble string not provided'}, 400
 
     scramble_string = data['scramble']
     scramble_list = scramble_string.strip().split()
 
     try:
         state_string = scramble_to_state(scramble_list)
-        return jsonify({'state': state_string})
+        return {'state': state_string}, 200
     except Exception as e:
-        return jsonify({'error': f'Failed to convert scramble to state: {str(e)}'})
+        return {'error': f'Failed to convert scramble to state: {str(e)}'}, 200
 
-@app.route('/solve', methods=['POST'])
-def solve_cube_route():
-    """
-    Solves a cube based on a state string.
-    """
-    data = request.get_json()
+def solve_request(data):
+    """The state string of a solve request, and None, or None and the error response."""
     if not data or 'state' not in data:
-        return jsonify({'error': 'State string not provided'}), 400
+        return None, ({'error': 'State string not provided'}, 400)
 
     state_string = data['state']
-    
+
     if len(state_string) != 54:
-        return jsonify({'error': 'Invalid cube state provided'})
+        return None, ({'error': 'Invalid cube state provided'}, 200)
+    return state_string, None
+
+def solve_limits(data):
+    """The (max_depth, timeout) of a solve request within the server policy and None, or None and the error response."""
+    try:
+        max_depth = float(data.get('max_depth', 24))
+        timeout = float(data.get('timeout', SOLVE_MAX_TIMEOUT))
+    except (TypeError, ValueError):
+        return None, ({'error': 'max_depth and timeout must be numbers'}, 400)
+    # NaN would pass the clamps below, as every comparison with it is false
+    if not math.isfinite(max_depth) or max_depth <= 0:
+        return None, ({'error': 'max_depth must be a positive number'}, 400)
+    if not math.isfinite(timeout) or timeout <= 0:
+        return None, ({'error': 'timeout must be positive'}, 400)
+    return (min(max(int(max_depth), SOLVE_MIN_DEPTH), 24), min(timeout, SOLVE_MAX_TIMEOUT)), None
+
+def solve_response(solution, solve_time_ms, timings):
+    """The response to a solve request, given the solver's result."""
+    if solution.startswith("Error"):
+        return {'error': solution}, 200
+
+    parts = solution.split(' . ')
+    phase1_moves = len(parts[0].split())
+    phase2_moves = len(parts[1].split()) if len(parts) > 1 else 0
+    solution_length = phase1_moves + phase2_moves
+
+    return {
+        'solution': solution.replace(' . ', ' '),
+        'solve_time': round(solve_time_ms, 2),
+        'solution_length': solution_length,
+        'phase1_moves': phase1_moves,
+        'phase2_moves': phase2_moves,
+        'timings': {stage: round(ms, 3) for stage, ms in timings.items()}
+    }, 200
+
+def etag(kind, *key):
+    """The strong ETag of the response to a cacheable request of kind for key, under the current solver version."""
+    digest = hashlib.sha256('\0'.join((kind, pykociemba.solver_version()) + tuple(map(str, key))).encode())
+    return '"%s"' % digest.hexdigest()[:32]
+
+def cache_headers(tag, cacheable=True):
+    """The caching headers of a response with ETag tag."""
+    if not cacheable:
+        return {'Cache-Control': 'no-store'}
+    return {'ETag': tag, 'Cache-Control': f'public, max-age={SOLVE_CACHE_MAX_AGE}'}
+
+def not_modified(tag, if_none_match):
+    """Whether the If-None-Match header value if_none_match matches the ETag tag."""
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == '*' or tag in [t.strip().removeprefix('W/') for t in if_none_match.split(',')]
+
+def state_key(data):
+    """The ETag of a cacheable scramble-to-state request, None without a scramble."""
+    if not data or 'scramble' not in data:
+        return None
+    return etag('state', ' '.join(data['scramble'].split()))
+
+def cached_solve_response(solution):
+    """
+    The response to a cacheable solve request: the parts of the /solve payload that depend on the state and max_depth
+    alone, and whether it may be cached, which a timeout may not.
+    """
+    payload, status = solve_response(solution, 0, {})
+    payload.pop('solve_time', None)
+    payload.pop('timings', None)
+    return payload, status, solution != 'Error 8'
+
+def cached(payload, status, headers):
+    response = jsonify(payload)
+    response.status_code = status
+    response.headers.update(headers)
+    return response
+
+@app.route('/get_scramble', methods=['GET'])
+def get_scramble_route():
+    """Generates a random scramble using the provided tool and returns it as a string."""
+    payload, status = scramble_response()
+    return jsonify(payload), status
+
+@app.route('/get_state_from_scramble', methods=['GET', 'POST'])
+def get_state_from_scramble_route():
+    """Converts a scramble string to a state string. GET takes it as ?scramble=... and may be cached."""
+    if request.method == 'POST':
+        payload, status = state_response(request.get_json())
+        return jsonify(payload), status
+    tag = state_key(request.args)
+    if tag and not_modified(tag, request.headers.get('If-None-Match')):
+        return Response(status=304, headers=cache_headers(tag))
+    payload, status = state_response(request.args)
+    return cached(payload, status, cache_headers(tag, tag is not None))
+
+@app.route('/solve', methods=['GET', 'POST'])
+def solve_cube_route():
+    """
+    Solves a cube based on a state string. GET takes the parameters as ?state=... and answers with a cacheable
+    response, without the timings.
+    """
+    data = request.get_json() if request.method == 'POST' else request.args
+    state_string, error = solve_request(data)
+    if not error:
+        limits, error = solve_limits(data)
+    if error:
+        payload, status = error
+        return jsonify(payload), status
+    max_depth, timeout = limits
+    tag = etag('solve', state_string, max_depth)
+    if request.method == 'GET' and not_modified(tag, request.headers.get('If-None-Match')):
+        return Response(status=304, headers=cache_headers(tag))
 
     try:
         # Now, solve the generated state
-        start_time = time.time()
-        solution = pykociemba.solve(state_string, use_separator=True)
-        end_time = time.time()
-
-        if solution.startswith("Error"):
-            return jsonify({'error': solution})
-
-        solve_time_ms = (end_time - start_time) * 1000
-        
-        parts = solution.split(' . ')
-        phase1_moves = len(parts[0].split())
-        phase2_moves = len(parts[1].split()) if len(parts) > 1 else 0
-        solution_length = phase1_moves + phase2_moves
-
-        return jsonify({
-            'solution': solution.replace(' . ', ' '),
-            'solve_time': round(solve_time_ms, 2),
-            'solution_length': solution_length,
-            'phase1_moves': phase1_moves,
-            'phase2_moves': phase2_moves
-        })
+        timings = {}
+        queued_time = time.time()
+        with admission.admit(timeout) as budget:
+            start_time = time.time()
+            solution = pykociemba.solve(state_string, use_separator=True, timings=timings, max_depth=max_depth,
+                                        timeout=budget)
+            end_time = time.time()
+        if request.method == 'GET':
+            payload, status, cacheable = cached_solve_response(solution)
+            return cached(payload, status, cache_headers(tag, cacheable))
+        timings['queue'] = (start_time - queued_time) * 1000
+        payload, status = solve_response(solution, (end_time - start_time) * 1000, timings)
+        return jsonify(payload), status
+    except pykociemba.Overloaded as e:
+        response = jsonify({'error': 'Server busy, please retry later'})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response
     except Exception as e:
         return jsonify({'error': f'Solver error: {str(e)}'})
 
+# seconds between keep-alive comments on an idle event stream; a write to a closed connection ends the solve
+SSE_HEARTBEAT = 1.0
+
+def sse(event, payload):
+    return f'event: {event}\ndata: {json.dumps(payload)}\n\n'
+
+def stream_request(data):
+    """The (state, max_depth, timeout, target) of a /solve_stream request and None, or None and the error response."""
+    state_string, error = solve_request(data)
+    if not error:
+        limits, error = solve_limits(data)
+    if error:
+        return None, error
+    try:
+        target = int(data.get('target', 0))
+    except (TypeError, ValueError):
+        target = 0
+    return (state_string,) + limits + (target,), None
+
+def stream_solutions(search, state_string, max_depth, budget, put):
+    """
+    Find the solutions of a /solve_stream request on search, in the order of /solve: the opening book first, then ever
+    shorter ones. Each one is passed to put as it is found, then None; an exception is passed instead of the rest.
+    """
+    try:
+        for solution in pykociemba.solutions(state_string, max_depth, budget, True, search=search):
+            put(solution)
+    except Exception as e:
+        put(e)
+    finally:
+        put(None)
+
+def stream_events(found, elapsed, timeout, target):
+    """The server-sent events for what stream_solutions found after elapsed seconds, and whether the stream ends."""
+    if isinstance(found, pykociemba.Overloaded):
+        return sse('error', {'error': 'Server busy, please retry later', 'retry_after': found.retry_after}), True
+    if isinstance(found, Exception):
+        return sse('error', {'error': f'Solver error: {str(found)}'}), True
+    if found is None:
+        return sse('done', {'reason': 'timeout' if elapsed >= timeout else 'exhausted'}), True
+    payload, status = solve_response(found, elapsed * 1000, {})
+    if 'error' in payload:
+        return sse('error', payload), True
+    if payload['solution_length'] <= target:
+        return sse('solution', payload) + sse('done', {'reason': 'target'}), True
+    return sse('solution', payload), False
+
+SSE_HEADERS = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+
+@app.route('/solve_stream', methods=['GET'])
+def solve_stream_route():
+    """
+    Streams ever shorter solutions of ?state=... as server-sent 'solution' events, with the payload of /solve, until
+    one has at most ?target= moves, the timeout is up or no shorter one exists. A final 'done' event gives the reason;
+    errors, including a busy server, come as an 'error' event.
+    """
+    params, error = stream_request(request.args)
+    if error:
+        payload, status = error
+        return jsonify(payload), status
+    state_string, max_depth, timeout, target = params
+
+    def events():
+        search = pykociemba.Search()
+        found = queue.Queue()
+        start_time = time.time()
+
+        def run():
+            try:
+                with admission.admit(timeout) as budget:
+                    stream_solutions(search, state_string, max_depth, budget, found.put)
+            except pykociemba.Overloaded as e:
+                found.put(e)
+
+        threading.Thread(target=run, daemon=True).start()
+        try:
+            while True:
+                try:
+                    solution = found.get(timeout=SSE_HEARTBEAT)
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+                    continue
+                text, end = stream_events(solution, time.time() - start_time, timeout, target)
+                yield text
+                if end:
+                    return
+        finally:
+            # the client has the answer it wants, or has gone away
+            search.cancel()
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream', headers=SSE_HEADERS)
+
 if __name__ == '__main__':
-    import os
     port = int(os.environ.get("PORT", 5000))
     app.run(host='0.0.0.0', port=port, debug=True)
@@ -0,0 +1,226 @@
+"""
+ASGI version of the web app in app.py, with the same routes and responses, for an ASGI server:
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+
+Every connection is a coroutine instead of a thread, so thousands of slow or long-polling clients can wait at once.
+The solves run on a bounded pool of SOLVE_WORKERS threads (default: one per core) through pykociemba.solve_async,
+and the search of a client that disconnects before its solution is ready, or during /solve_stream, is cancelled.
+They are admitted by the admission controller of app.py, with the same policy and the same 503 responses when the
+server is busy.
+"""
+import asyncio
+import json
+import mimetypes
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
+
+import jinja2
+
+import pykociemba
+import app as web
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STATIC = os.path.join(ROOT, 'static')
+
+templates = jinja2.Environment(loader=jinja2.FileSystemLoader(os.path.join(ROOT, 'templates')), autoescape=True)
+executor = ThreadPoolExecutor(int(os.environ.get('SOLVE_WORKERS', '0')) or os.cpu_count() or 1)
+
+
+def url_for(endpoint, filename):
+    return '/static/' + filename
+
+
+async def read_json(receive):
+    """The JSON request body, None if it is empty or not JSON."""
+    body = b''
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            raise ConnectionError('client disconnected')
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            break
+    try:
+        return json.loads(body) if body else None
+    except ValueError:
+        return None
+
+
+async def wait_for_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+def query(scope):
+    return dict(parse_qsl(scope['query_string'].decode()))
+
+
+def if_none_match(scope):
+    return dict(scope['headers']).get(b'if-none-match', b'').decode()
+
+
+async def respond(send, status, body, content_type, headers=None):
+    headers = [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()]
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(b'content-type', content_type.encode()),
+                            (b'content-length', str(len(body)).encode())] + headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def respond_json(send, payload, status=200, headers=None):
+    await respond(send, status, json.dumps(payload).encode(), 'application/json', headers)
+
+
+async def respond_not_modified(send, tag):
+    await send({'type': 'http.response.start', 'status': 304,
+                'headers': [(name.lower().encode(), value.encode()) for name, value in web.cache_headers(tag).items()]})
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+async def state(scope, send):
+    data = query(scope)
+    tag = web.state_key(data)
+    if tag and web.not_modified(tag, if_none_match(scope)):
+        return await respond_not_modified(send, tag)
+    payload, status = web.state_response(data)
+    await respond_json(send, payload, status, web.cache_headers(tag, tag is not None))
+
+
+async def solve(scope, receive, send):
+    cacheable = scope['method'] == 'GET'
+    data = query(scope) if cacheable else await read_json(receive)
+    state_string, error = web.solve_request(data)
+    if not error:
+        limits, error = web.solve_limits(data)
+    if error:
+        return await respond_json(send, *error)
+    max_depth, timeout = limits
+    tag = web.etag('solve', state_string, max_depth)
+    if cacheable and web.not_modified(tag, if_none_match(scope)):
+        return await respond_not_modified(send, tag)
+
+    timings = {}
+    queued_time = time.time()
+    try:
+        async with web.admission.admit_async(timeout) as budget:
+            start_time = time.time()
+            solving = asyncio.ensure_future(pykociemba.solve_async(state_string, use_separator=True, timeout=budget,
+                                                                   executor=executor, timings=timings,
+                                                                   max_depth=max_depth))
+            disconnect = asyncio.ensure_future(wait_for_disconnect(receive))
+            await asyncio.wait([solving, disconnect], return_when=asyncio.FIRST_COMPLETED)
+            if not solving.done():
+                solving.cancel()
+                return
+            disconnect.cancel()
+            end_time = time.time()
+    except pykociemba.Overloaded as e:
+        return await respond_json(send, {'error': 'Server busy, please retry later'}, 503,
+                                  {'Retry-After': str(e.retry_after)})
+    try:
+        solution = solving.result()
+    except Exception as e:
+        return await respond_json(send, {'error': f'Solver error: {str(e)}'})
+    if cacheable:
+        payload, status, keep = web.cached_solve_response(solution)
+        return await respond_json(send, payload, status, web.cache_headers(tag, keep))
+    timings['queue'] = (start_time - queued_time) * 1000
+    await respond_json(send, *web.solve_response(solution, (end_time - start_time) * 1000, timings))
+
+
+async def solve_stream(scope, receive, send):
+    params, error = web.stream_request(query(scope))
+    if error:
+        return await respond_json(send, *error)
+    state_string, max_depth, timeout, target = params
+    await send({'type': 'http.response.start', 'status': 200,
+                'headers': [(b'content-type', b'text/event-stream')] +
+                           [(name.lower().encode(), value.encode()) for name, value in web.SSE_HEADERS.items()]})
+
+    async def event(text, end=False):
+        await send({'type': 'http.response.body', 'body': text.encode(), 'more_body': not end})
+
+    loop = asyncio.get_running_loop()
+    found = asyncio.Queue()
+    search = pykociemba.Search()
+    start_time = time.time()
+    disconnect = asyncio.ensure_future(wait_for_disconnect(receive))
+    try:
+        async with web.admission.admit_async(timeout) as budget:
+            solving = loop.run_in_executor(executor, web.stream_solutions, search, state_string, max_depth, budget,
+                                           lambda item: loop.call_soon_threadsafe(found.put_nowait, item))
+            try:
+                while True:
+                    getting = asyncio.ensure_future(found.get())
+                    await asyncio.wait([getting, disconnect], timeout=web.SSE_HEARTBEAT,
+                                       return_when=asyncio.FIRST_COMPLETED)
+                    if not getting.done():
+                        getting.cancel()
+                        if disconnect.done():
+                            return
+                        await event(': keep-alive\n\n')
+                        continue
+                    text, end = web.stream_events(getting.result(), time.time() - start_time, timeout, target)
+                    await event(text, end)
+                    if end:
+                        return
+            finally:
+                # the client has the answer it wants, or has gone away; the slot is held until the search stops
+                search.cancel()
+                await asyncio.wait([solving])
+    except pykociemba.Overloaded as e:
+        await event(web.stream_events(e, 0, timeout, target)[0], True)
+    finally:
+        disconnect.cancel()
+
+
+async def static(path, send):
+    filename = os.path.normpath(os.path.join(STATIC, path[len('/static/'):]))
+    if not filename.startswith(STATIC + os.sep) or not os.path.isfile(filename):
+        return await respond(send, 404, b'Not Found', 'text/plain')
+    with open(filename, 'rb') as f:
+        body = f.read()
+    await respond(send, 200, body, mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            executor.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['type'] != 'http':
+        return
+    method, path = scope['method'], scope['path']
+    try:
+        if method in ('GET', 'POST') and path == '/solve':
+            return await solve(scope, receive, send)
+        if method == 'GET' and path == '/solve_stream':
+            return await solve_stream(scope, receive, send)
+        if method == 'GET' and path == '/get_scramble':
+            # may wait for the scramble pool to refill
+            payload = await asyncio.get_running_loop().run_in_executor(executor, web.scramble_response)
+            return await respond_json(send, *payload)
+        if method == 'GET' and path == '/get_state_from_scramble':
+            return await state(scope, send)
+        if method == 'POST' and path == '/get_state_from_scramble':
+            return await respond_json(send, *web.state_response(await read_json(receive)))
+        if method == 'GET' and path == '/':
+            html = templates.get_template('index.html').render(url_for=url_for)
+            return await respond(send, 200, html.encode(), 'text/html; charset=utf-8')
+        if method == 'GET' and path.startswith('/static/'):
+            return await static(path, send)
+        await respond(send, 404, b'Not Found', 'text/plain')
+    except ConnectionError:
+        pass
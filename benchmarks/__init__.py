@@ -0,0 +1,5 @@
+"""
+Benchmarks for the pykociemba solver.
+
+Run them with ``python -m benchmarks``; see ``python -m benchmarks --help`` for the options.
+"""
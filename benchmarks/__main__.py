@@ -0,0 +1,122 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+from .corpora import CORPORA
+from . import solve, startup
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Benchmark the pykociemba solver.')
+    parser.add_argument('--corpus', action='append', choices=sorted(CORPORA),
+                        help='corpus to run, can be repeated (default: random and short; hard takes minutes)')
+    parser.add_argument('--count', type=int, default=20, help='cubes per generated corpus')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--warmup', type=int, default=2, help='untimed solves before each corpus')
+    parser.add_argument('--repeat', type=int, default=1, help='timed solves per cube')
+    parser.add_argument('--max-depth', type=int, default=24)
+    parser.add_argument('--engine', choices=sorted(solve.ENGINES), default='search', help='solver to benchmark')
+    parser.add_argument('--timeout', type=float, default=1000, help='solver timeout per cube in seconds')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='results to compare against, if the file exists')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='fraction by which a metric may exceed the baseline before it counts as a regression')
+    parser.add_argument('--save-baseline', action='store_true', help='store the results as the new baseline')
+    parser.add_argument('--startup', action='store_true',
+                        help='measure import time and the load time and memory of every table instead of solving')
+    parser.add_argument('--import-runs', type=int, default=5, help='fresh interpreters to time the import in')
+    parser.add_argument('--regenerate', action='append', metavar='TABLE',
+                        help='with --startup, also time computing this table from scratch, can be repeated or "all" '
+                             '(pruning tables take minutes)')
+    parser.add_argument('--mmap-tables', metavar='PATH',
+                        help='with --startup, also measure attaching to this memory-mapped table file, written by '
+                             '"python -m pykociemba export-tables" (created if missing)')
+    args = parser.parse_args(argv)
+
+    results = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'count': args.count,
+            'seed': args.seed,
+            'warmup': args.warmup,
+            'repeat': args.repeat,
+            'max_depth': args.max_depth,
+            'engine': args.engine,
+            'timeout': args.timeout,
+            'import_runs': args.import_runs,
+        },
+        'corpora': {},
+    }
+    if args.startup:
+        summary = results['startup'] = startup.summarize(startup.measure_import(args.import_runs),
+                                                         startup.measure_tables())
+        print('import   cold %9.2f ms  warm %9.2f ms' % (summary['cold_import_ms'], summary['warm_import_ms']))
+        for name, table in summary['tables'].items():
+            print('%-28s %-6s %9.2f ms  %10d bytes traced  %10s bytes rss  %10d bytes on disk' % (
+                name, table['format'], table['load_ms'], table['tracemalloc_bytes'], table['rss_bytes'],
+                table['file_bytes']))
+        if args.mmap_tables:
+            if not os.path.exists(args.mmap_tables):
+                from pykociemba.coordcube import export_tables
+                export_tables(args.mmap_tables)
+            mapped = summary['mmap'] = startup.measure_mmap(args.mmap_tables)
+            mapped.update(startup.measure_import(args.import_runs, args.mmap_tables))
+            print('import   cold %9.2f ms  warm %9.2f ms  with the tables memory-mapped' % (
+                mapped['cold_import_ms'], mapped['warm_import_ms']))
+            print('%-28s %-6s %9.2f ms  %10d bytes traced  %10s bytes rss  %10d bytes on disk' % (
+                'all tables', mapped['format'], mapped['load_ms'], mapped['tracemalloc_bytes'], mapped['rss_bytes'],
+                mapped['file_bytes']))
+        if args.regenerate:
+            from pykociemba.coordcube import TABLES
+            names = list(TABLES) if 'all' in args.regenerate else args.regenerate
+            for name, built in startup.measure_regeneration(names).items():
+                summary['tables'][name]['build_ms'] = built['build_ms']
+                print('%-28s built in %.2f ms' % (name, built['build_ms']))
+
+    for name in args.corpus or ([] if args.startup else ['random', 'short']):
+        states = CORPORA[name](args.count, args.seed)
+        samples = solve.measure(states, args.warmup, args.repeat, args.max_depth, args.timeout,
+                                solve.ENGINES[args.engine])
+        summary = results['corpora'][name] = solve.summarize(samples)
+        print('%-8s n=%-4d p50 %9.2f ms  p90 %9.2f ms  p99 %9.2f ms  %9.0f nodes/s  length %.2f' % (
+            name, summary['samples'], summary['p50_ms'], summary['p90_ms'], summary['p99_ms'],
+            summary['nodes_per_sec'] or 0, summary['length']['mean'] or 0))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    status = 0
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        try:
+            regressions = solve.compare(results, baseline, args.threshold) + startup.compare(results, baseline,
+                                                                                            args.threshold)
+        except solve.Incomparable as e:
+            print('NOT COMPARED against %s: %s; save a new baseline with --save-baseline' % (args.baseline, e))
+            return 2
+        for corpus, metric, old, new in regressions:
+            print('REGRESSION %s %s: %.2f -> %.2f (%+.1f%%)' % (corpus, metric, old, new, (new / old - 1) * 100))
+        if regressions:
+            status = 1
+        else:
+            print('no regression against %s' % args.baseline)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print('baseline saved to %s' % args.baseline)
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
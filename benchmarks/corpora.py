@@ -0,0 +1,37 @@
+"""Reproducible sets of cube definition strings to benchmark the solver on."""
+import random
+
+from pykociemba.tools import randomCube, random_scramble
+from pykociemba.scramble_to_state import scramble_to_state
+
+# Positions that are known to be hard, given by a maneuver that generates them.
+HARD_MANEUVERS = {
+    'superflip': "U R2 F B R B2 R U2 L B2 R U' D' R2 F R' L B2 U2 F2",
+    'superflip_fourspot': "F U' F2 D' B U R' F' L D' R' U' L U B' D2 R' F U2 D2",
+    'cube_in_cube': "F L F U' R U F2 L2 U' L' B D' B' L2 U",
+    'checkerboard': "U2 D2 F2 B2 L2 R2",
+}
+
+
+def random_states(count, seed=0):
+    """count uniformly random cubes"""
+    rng = random.Random(seed)
+    return [randomCube(rng) for _ in range(count)]
+
+
+def short_scrambles(count, seed=0, min_length=1, max_length=8):
+    """count cubes scrambled with min_length to max_length random face turns"""
+    rng = random.Random(seed)
+    return [scramble_to_state(random_scramble(rng.randint(min_length, max_length), rng)) for _ in range(count)]
+
+
+def hard_states(count=None, seed=0):
+    """The positions of HARD_MANEUVERS, count and seed are ignored"""
+    return [scramble_to_state(maneuver.split()) for maneuver in HARD_MANEUVERS.values()]
+
+
+CORPORA = {
+    'random': random_states,
+    'short': short_scrambles,
+    'hard': hard_states,
+}
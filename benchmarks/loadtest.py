@@ -0,0 +1,194 @@
+"""
+Load test for the Flask endpoints.
+
+Starts the web app locally (python app.py, or any --server-cmd such as a gunicorn command line), drives it with a
+closed loop of concurrent clients at increasing concurrency levels and reports throughput, latency percentiles and
+error rates per level, plus the saturation point: the first level after which adding clients no longer buys
+throughput.
+
+    python -m benchmarks.loadtest --concurrency 1,2,4,8 --duration 20
+    python -m benchmarks.loadtest --server-cmd "gunicorn -w 4 -b 127.0.0.1:{port} app:app"
+    python -m benchmarks.loadtest --url http://127.0.0.1:5000 --endpoint scramble
+"""
+import argparse
+import json
+import os
+import random
+import shlex
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+try:
+    from urllib.request import Request, urlopen
+    from urllib.error import HTTPError, URLError
+except ImportError:
+    from urllib2 import Request, urlopen, HTTPError, URLError
+
+from pykociemba.tools import randomCube, random_scramble
+from .solve import percentile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# a level saturates the server when the next level does not add at least this fraction of throughput
+SATURATION_GAIN = 0.10
+
+
+class Workload(object):
+    """Builds the requests: (method, path, JSON body) for the chosen endpoints from a seeded random corpus."""
+
+    def __init__(self, endpoints, corpus_size, seed):
+        rng = random.Random(seed)
+        self.endpoints = endpoints
+        self.states = [randomCube(rng) for _ in range(corpus_size)] if 'solve' in endpoints else []
+        self.scrambles = [' '.join(random_scramble(20, rng)) for _ in range(corpus_size)]
+
+    def request(self, rng):
+        endpoint = rng.choice(self.endpoints)
+        if endpoint == 'solve':
+            return 'POST', '/solve', {'state': rng.choice(self.states)}
+        if endpoint == 'state':
+            return 'POST', '/get_state_from_scramble', {'scramble': rng.choice(self.scrambles)}
+        return 'GET', '/get_scramble', None
+
+
+def send(url, method, path, body, timeout):
+    """Send one request and return (latency in ms, error or None). Error replies with status 200 count as errors."""
+    data = json.dumps(body).encode() if body is not None else None
+    request = Request(url + path, data=data, method=method, headers={'Content-Type': 'application/json'})
+    start = time.perf_counter()
+    try:
+        response = urlopen(request, timeout=timeout)
+        payload = json.loads(response.read().decode())
+        error = payload.get('error') if isinstance(payload, dict) else None
+    except HTTPError as e:
+        error = 'HTTP %d' % e.code
+    except (URLError, OSError, ValueError) as e:
+        error = type(e).__name__
+    return (time.perf_counter() - start) * 1000, error
+
+
+def run_level(url, workload, concurrency, duration, timeout, seed):
+    """Run concurrency clients back to back for duration seconds and summarize what they saw."""
+    samples = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(index):
+        rng = random.Random(seed * 1000 + index)
+        while time.perf_counter() < deadline:
+            latency, error = send(url, *workload.request(rng), timeout=timeout)
+            with lock:
+                samples.append((latency, error))
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, error in samples if error is None)
+    errors = {}
+    for latency, error in samples:
+        if error is not None:
+            errors[error] = errors.get(error, 0) + 1
+    return {
+        'concurrency': concurrency,
+        'requests': len(samples),
+        'throughput_rps': len(latencies) / elapsed,
+        'error_rate': (len(samples) - len(latencies)) / len(samples) if samples else 0.0,
+        'errors': errors,
+        'p50_ms': percentile(latencies, 50),
+        'p90_ms': percentile(latencies, 90),
+        'p99_ms': percentile(latencies, 99),
+        'max_ms': latencies[-1] if latencies else None,
+    }
+
+
+def saturation_point(levels):
+    """The concurrency of the first level whose successor adds less than SATURATION_GAIN throughput, or None."""
+    for level, following in zip(levels, levels[1:]):
+        if following['throughput_rps'] < level['throughput_rps'] * (1 + SATURATION_GAIN):
+            return level['concurrency']
+    return None
+
+
+def start_server(command, port):
+    env = dict(os.environ, PORT=str(port))
+    # own process group, so the Flask reloader child or the gunicorn workers go down with it
+    return subprocess.Popen(shlex.split(command.format(port=port)), cwd=ROOT, env=env, start_new_session=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def stop_server(process):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(10)
+    except (OSError, subprocess.TimeoutExpired):
+        os.killpg(process.pid, signal.SIGKILL)
+
+
+def wait_until_ready(url, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        latency, error = send(url, 'GET', '/get_scramble', None, timeout=2)
+        if error is None:
+            return
+        time.sleep(0.2)
+    raise RuntimeError('server at %s did not come up within %ss' % (url, timeout))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.loadtest', description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--url', help='test an already running server instead of starting one')
+    parser.add_argument('--server-cmd', default='%s app.py' % shlex.quote(sys.executable),
+                        help='command that starts the server, {port} is replaced by the port (default: %(default)s)')
+    parser.add_argument('--port', type=int, default=5099)
+    parser.add_argument('--endpoint', action='append', choices=['solve', 'scramble', 'state'],
+                        help='endpoint to load, can be repeated to mix them (default: solve)')
+    parser.add_argument('--concurrency', default='1,2,4,8,16', help='comma separated concurrency levels')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per concurrency level')
+    parser.add_argument('--corpus-size', type=int, default=200, help='distinct states and scrambles to send')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=60, help='client timeout per request in seconds')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args(argv)
+
+    workload = Workload(args.endpoint or ['solve'], args.corpus_size, args.seed)
+    server = None
+    url = args.url
+    if url is None:
+        url = 'http://127.0.0.1:%d' % args.port
+        server = start_server(args.server_cmd, args.port)
+    try:
+        wait_until_ready(url, 60)
+        levels = []
+        for concurrency in [int(c) for c in args.concurrency.split(',')]:
+            level = run_level(url, workload, concurrency, args.duration, args.timeout, args.seed)
+            levels.append(level)
+            print('c=%-4d %7d req  %8.2f req/s  errors %5.1f%%  p50 %9.2f ms  p90 %9.2f ms  p99 %9.2f ms' % (
+                concurrency, level['requests'], level['throughput_rps'], level['error_rate'] * 100,
+                level['p50_ms'] or 0, level['p90_ms'] or 0, level['p99_ms'] or 0))
+    finally:
+        if server is not None:
+            stop_server(server)
+
+    saturation = saturation_point(levels)
+    print('saturation point: %s' % ('concurrency %d' % saturation if saturation else 'not reached'))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'server': args.url or args.server_cmd,
+                'endpoints': workload.endpoints,
+                'duration': args.duration,
+                'levels': levels,
+                'saturation_concurrency': saturation,
+            }, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""Latency, search effort and solution length of Search.solution over a corpus."""
+import time
+
+from pykociemba import Search, FrontierSearch
+
+# the solver classes that can be benchmarked, by name
+ENGINES = {
+    'search': Search,
+    'frontier': FrontierSearch,
+}
+
+# metrics of a corpus summary where a higher value is a regression
+COMPARED_METRICS = ('p50_ms', 'p90_ms', 'mean_ms')
+# the meta fields two runs must agree on for their corpus timings to be compared
+COMPARED_META = ('python', 'implementation', 'machine', 'count', 'seed', 'warmup', 'repeat', 'max_depth', 'engine',
+                 'timeout')
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of the sorted list values"""
+    if not values:
+        return None
+    rank = max(1, -(-len(values) * p // 100))
+    return values[int(rank) - 1]
+
+
+def measure(states, warmup=2, repeat=1, max_depth=24, timeout=1000, engine=Search):
+    """
+    Solve every state repeat times with the Search class engine, after warmup untimed solves, and return one sample
+    per solve.
+    A sample is a dict with the elapsed ns, the nodes generated in both phases and the solution length (None on error).
+    """
+    for state in states[:warmup]:
+        engine().solution(state, max_depth, timeout, False)
+
+    samples = []
+    for state in states:
+        for _ in range(repeat):
+            search = engine()
+            start = time.perf_counter_ns()
+            solution = search.solution(state, max_depth, timeout, False)
+            elapsed = time.perf_counter_ns() - start
+            samples.append({
+                'state': state,
+                'ns': elapsed,
+                'nodes_phase1': search.nodesPhase1,
+                'nodes_phase2': search.nodesPhase2,
+                'length': None if solution.startswith('Error') else len(solution.split()),
+            })
+    return samples
+
+
+def summarize(samples):
+    times = sorted(sample['ns'] / 1e6 for sample in samples)
+    total_s = sum(sample['ns'] for sample in samples) / 1e9
+    nodes_phase1 = sum(sample['nodes_phase1'] for sample in samples)
+    nodes_phase2 = sum(sample['nodes_phase2'] for sample in samples)
+    lengths = [sample['length'] for sample in samples if sample['length'] is not None]
+    histogram = {}
+    for length in lengths:
+        histogram[str(length)] = histogram.get(str(length), 0) + 1
+    return {
+        'samples': len(samples),
+        'errors': len(samples) - len(lengths),
+        'min_ms': times[0],
+        'mean_ms': sum(times) / len(times),
+        'p50_ms': percentile(times, 50),
+        'p90_ms': percentile(times, 90),
+        'p99_ms': percentile(times, 99),
+        'max_ms': times[-1],
+        'nodes_phase1': nodes_phase1,
+        'nodes_phase2': nodes_phase2,
+        'nodes_per_sec': (nodes_phase1 + nodes_phase2) / total_s if total_s else None,
+        'length': {
+            'min': min(lengths) if lengths else None,
+            'mean': sum(lengths) / len(lengths) if lengths else None,
+            'max': max(lengths) if lengths else None,
+            'histogram': dict(sorted(histogram.items(), key=lambda item: int(item[0]))),
+        },
+    }
+
+
+class Incomparable(ValueError):
+    """The baseline was measured under other conditions than the results, see check_meta()."""
+
+
+def check_meta(results, baseline, keys):
+    """Raise Incomparable if the meta fields keys of the two result documents differ."""
+    old, new = baseline.get('meta', {}), results.get('meta', {})
+    differences = ['%s %r != %r' % (key, old.get(key), new.get(key)) for key in keys if old.get(key) != new.get(key)]
+    if differences:
+        raise Incomparable('the baseline was measured with other settings: ' + ', '.join(differences))
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare the corpus summaries of two result documents, which must agree on the COMPARED_META fields (else
+    Incomparable is raised).
+    @return a list of (corpus, metric, baseline value, current value) for every metric that got worse by more than
+            the threshold fraction
+    """
+    if not any(corpus in baseline.get('corpora', {}) for corpus in results['corpora']):
+        return []
+    check_meta(results, baseline, COMPARED_META)
+    regressions = []
+    for corpus, summary in results['corpora'].items():
+        old = baseline.get('corpora', {}).get(corpus)
+        if old is None:
+            continue
+        for metric in COMPARED_METRICS:
+            if old.get(metric) and summary[metric] > old[metric] * (1 + threshold):
+                regressions.append((corpus, metric, old[metric], summary[metric]))
+    return regressions
@@ -0,0 +1,145 @@
+"""
+Import time, per-table load time and memory footprint of the CoordCube tables.
+
+Every measurement runs in a fresh interpreter so the numbers are not skewed by what the benchmark process has already
+loaded. The first import run is reported as cold, the median of the others as warm: only the first one pays for an
+empty page cache and missing bytecode, unless the machine has just been rebooted or the caches dropped, it is only
+"colder".
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+from .solve import check_meta
+
+# metrics of the startup summary where a higher value is a regression
+COMPARED_METRICS = ('cold_import_ms', 'warm_import_ms', 'total_load_ms')
+COMPARED_META = ('python', 'implementation', 'machine', 'import_runs')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SCRIPT = '''
+import json, time
+start = time.perf_counter()
+import pykociemba
+print(json.dumps({'import_ms': (time.perf_counter() - start) * 1000}))
+'''
+
+RSS_FUNCTION = '''
+def rss():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (IOError, OSError, ValueError):
+        return None
+'''
+
+TABLE_SCRIPT = '''
+import gc, json, os, sys, time, tracemalloc
+from pykociemba import coordcube
+''' + RSS_FUNCTION + '''
+name = sys.argv[1]
+gc.collect()
+tracemalloc.start()
+rss_before = rss()
+start = time.perf_counter()
+table = coordcube.freeze(coordcube.load_cachetable(name))
+load_ms = (time.perf_counter() - start) * 1000
+rss_after = rss()
+traced = tracemalloc.get_traced_memory()[0]
+path = coordcube.cachetable_path(name)
+print(json.dumps({
+    'format': os.path.splitext(path)[1].lstrip('.'),
+    'file_bytes': os.path.getsize(path),
+    'load_ms': load_ms,
+    'tracemalloc_bytes': traced,
+    'rss_bytes': rss_after - rss_before if rss_before is not None else None,
+}))
+'''
+
+# run with PYKOCIEMBA_TABLES set, so the import itself already attaches to the file
+MMAP_SCRIPT = '''
+import gc, json, os, sys, time, tracemalloc
+from pykociemba import coordcube
+''' + RSS_FUNCTION + '''
+path = sys.argv[1]
+gc.collect()
+tracemalloc.start()
+rss_before = rss()
+start = time.perf_counter()
+tables = coordcube.attach_tables(path)
+load_ms = (time.perf_counter() - start) * 1000
+rss_after = rss()
+print(json.dumps({
+    'format': 'mmap',
+    'file_bytes': os.path.getsize(path),
+    'load_ms': load_ms,
+    'tracemalloc_bytes': tracemalloc.get_traced_memory()[0],
+    'rss_bytes': rss_after - rss_before if rss_before is not None else None,
+}))
+'''
+
+
+def _run(script, *args, **kwargs):
+    output = subprocess.check_output([sys.executable, '-c', script] + list(args), cwd=ROOT, **kwargs)
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def _mmap_env(path):
+    return dict(os.environ, PYKOCIEMBA_TABLES=os.path.abspath(path))
+
+
+def measure_import(runs=5, mmap_tables=None):
+    """Import times, attaching to the memory-mapped table file mmap_tables instead of unpickling if it is given."""
+    env = _mmap_env(mmap_tables) if mmap_tables else None
+    times = [_run(IMPORT_SCRIPT, env=env)['import_ms'] for _ in range(runs)]
+    warm = sorted(times[1:]) or times
+    return {
+        'runs': runs,
+        'cold_import_ms': times[0],
+        'warm_import_ms': warm[len(warm) // 2],
+        'import_ms': times,
+    }
+
+
+def measure_tables():
+    from pykociemba.coordcube import TABLES
+    return dict((name, _run(TABLE_SCRIPT, name)) for name in TABLES)
+
+
+def measure_mmap(path):
+    """Time and memory to attach to the memory-mapped table file path, in the format of a measure_tables() entry."""
+    return _run(MMAP_SCRIPT, os.path.abspath(path), env=_mmap_env(path))
+
+
+def measure_regeneration(names):
+    """Time to compute the tables in names from scratch, as if their cache file was missing."""
+    from pykociemba.coordcube import build_table
+    result = {}
+    for name in names:
+        start = time.perf_counter()
+        build_table(name)
+        result[name] = {'build_ms': (time.perf_counter() - start) * 1000}
+    return result
+
+
+def summarize(import_result, tables):
+    summary = dict(import_result)
+    summary['total_load_ms'] = sum(table['load_ms'] for table in tables.values())
+    summary['total_tracemalloc_bytes'] = sum(table['tracemalloc_bytes'] for table in tables.values())
+    rss = [table['rss_bytes'] for table in tables.values()]
+    summary['total_rss_bytes'] = sum(rss) if None not in rss else None
+    summary['tables'] = tables
+    return summary
+
+
+def compare(results, baseline, threshold):
+    """Like solve.compare(), for the startup summary."""
+    summary, old = results.get('startup'), baseline.get('startup')
+    if not summary or not old:
+        return []
+    check_meta(results, baseline, COMPARED_META)
+    return [('startup', metric, old[metric], summary[metric]) for metric in COMPARED_METRICS
+            if old.get(metric) and summary[metric] > old[metric] * (1 + threshold)]
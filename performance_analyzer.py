@@ -1,3 +1,5 @@
+import argparse
+import multiprocessing
 import time
 import matplotlib.pyplot as plt
 from pykociemba import solve
@@ -106,15 +108,32 @@ test_cases = [
     "DRLUUBFBRBLURRLRUBLRDDFDLFUFUFFDBRDUBRUFLLFDDBFLUBLRBD",
 ]
 
-def performance_test():
+def timed_solve(case):
+    """Solve one (index, state) case and return (index, seconds), timed inside the worker so queueing is not counted."""
+    i, test_case = case
+    start_time = time.perf_counter()
+    solve(test_case)
+    return i, time.perf_counter() - start_time
+
+def performance_test(workers=1):
     solve_times = []
-    for i, test_case in enumerate(test_cases):
-        start_time = time.time()
-        solve(test_case)
-        end_time = time.time()
-        solve_time = end_time - start_time
-        solve_times.append(solve_time)
-        print(f"Test case {i+1}/{len(test_cases)} solved in {solve_time:.4f} seconds.")
+    cases = list(enumerate(test_cases))
+    start_time = time.perf_counter()
+    if workers > 1:
+        # Forked workers share the tables imported above instead of loading their own
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+        with context.Pool(workers) as pool:
+            results = pool.imap_unordered(timed_solve, cases)
+            for done, (i, solve_time) in enumerate(results):
+                solve_times.append(solve_time)
+                print(f"Test case {i+1} ({done+1}/{len(test_cases)}) solved in {solve_time:.4f} seconds.")
+    else:
+        for i, test_case in cases:
+            _, solve_time = timed_solve((i, test_case))
+            solve_times.append(solve_time)
+            print(f"Test case {i+1}/{len(test_cases)} solved in {solve_time:.4f} seconds.")
+    wall_time = time.perf_counter() - start_time
 
     # --- Performance Statistics ---
     min_time = min(solve_times)
@@ -125,6 +144,7 @@ def performance_test():
     print(f"Minimum solve time: {min_time:.4f} seconds")
     print(f"Maximum solve time: {max_time:.4f} seconds")
     print(f"Average solve time: {avg_time:.4f} seconds")
+    print(f"Throughput: {len(solve_times) / wall_time:.2f} solves/second with {workers} worker(s) ({wall_time:.2f} seconds in total)")
     # --- Chart Generation ---
     plt.figure(figsize=(10, 6))
     plt.hist(solve_times, bins=20, edgecolor='black')
@@ -136,4 +156,7 @@ def performance_test():
     print("\nChart saved to performance_chart.png")
 
 if __name__ == "__main__":
-    performance_test()
+    parser = argparse.ArgumentParser(description="Solve the test cases and chart the distribution of solve times.")
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes (default: 1, serial)")
+    args = parser.parse_args()
+    performance_test(args.workers)
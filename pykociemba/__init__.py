@@ -1,13 +1,113 @@
+import asyncio
+import time
+
 from .color import *
 from .coordcube import *
 from .cubiecube import *
 from .edge import *
 from .facecube import *
 from .facelet import *
-from .search import Search, patternize
+from .search import Search, patternize, patternize_cubie, solver_version
+from .frontier import FrontierSearch
+from .lockstep import LockstepSolver
+from .threads import solve_many
+from .subinterpreters import InterpreterPool
 from .tools import *
+from .tracing import Tracer, set_tracer, get_tracer
+from .profiling import SamplingProfiler, set_profiler, get_profiler
+from .admission import AdmissionController, Overloaded
+from .scramblepool import ScramblePool
+from .randomstates import random_states, unpack_states
+from .book import OpeningBook, opening_book, book_solution
+from .endgame import EndgameTable, endgame_table
+from .difficulty import estimate, lower_bounds
+
+def solve(cubestring, patternstring=None, use_separator=True, timings=None, max_depth=24, timeout=1000, book=True):
+    """
+    Solve the cube given as facelet string with at most max_depth moves, giving up after timeout seconds. If timings
+    is a dict, it is filled with the milliseconds spent in each stage of the solver (validate, facecube, cubiecube,
+    coordcube, phase1, phase2 and format). With book, a cube in the opening book gets its optimal solution from there
+    (timed as stage book), without a separator. A patternstring makes it solve to that pattern instead of the solved
+    cube.
+    """
+    cube = _patternize(cubestring, patternstring)
+    if book:
+        solution = _book_solution(cube, max_depth, timings)
+        if solution is not None:
+            return solution
+    profiler = get_profiler()
+    # only valid cubes are profiled, the others are answered with an error code right away
+    if profiler is not None and _valid(cube):
+        solution, stages = profiler.call(cubestring, _solve, cube, use_separator, max_depth, timeout)
+    else:
+        solution, stages = _solve(cube, use_separator, max_depth, timeout)
+    if timings is not None:
+        timings.update(stages)
+    return solution
+
+def _patternize(cubestring, patternstring):
+    """The cube to solve: the facelet string itself, or with a pattern the CubieCube that solves to it."""
+    if not patternstring:
+        return cubestring
+    return patternize_cubie(FaceCube(cubestring).toCubieCube(), patternstring)
+
+def _valid(cube):
+    return (cube.verify() if isinstance(cube, CubieCube) else verify(cube)) == 0
+
+def _book_solution(cube, max_depth, timings):
+    start = time.perf_counter()
+    solution = book_solution(cube) if _valid(cube) else None
+    if solution is not None and len(solution.split()) > max_depth:
+        # the book's solutions are optimal, so there is none within max_depth moves
+        solution = 'Error 7'
+    if timings is not None:
+        timings['book'] = (time.perf_counter() - start) * 1000
+    return solution
+
+def _solution(search, cube, max_depth, timeout, use_separator):
+    if isinstance(cube, CubieCube):
+        return search.solve_cubie(cube, max_depth, timeout, use_separator)
+    return search.solution(cube, max_depth, timeout, use_separator)
+
+def _book_or_solution(search, cube, max_depth, timeout, use_separator, book, timings):
+    solution = _book_solution(cube, max_depth, timings) if book else None
+    if solution is None:
+        solution = _solution(search, cube, max_depth, timeout, use_separator)
+    return solution
+
+def solutions(cubestring, max_depth=24, timeout=1000, use_separator=True, book=True, search=None):
+    """
+    Generate ever shorter solutions of the cube given as facelet string like Search.solutions, starting with the one
+    solve() returns: with book, a cube in the opening book gets just its optimal solution from there. The search runs
+    on search if given, so that cancelling it ends the generator.
+    """
+    if book:
+        solution = _book_solution(cubestring, max_depth, None)
+        if solution is not None:
+            yield solution
+            return
+    yield from (search or Search()).solutions(cubestring, max_depth, timeout, use_separator)
+
+def _solve(cube, use_separator, max_depth, timeout):
+    search = Search()
+    return _solution(search, cube, max_depth, timeout, use_separator), search.timings
 
-def solve(cubestring, patternstring=None, use_separator=True):
-    if patternstring:
-        return Search().solution(patternize(cubestring, patternstring), 24, 1000, use_separator)
-    return Search().solution(cubestring, 24, 1000, use_separator)
+async def solve_async(cubestring, patternstring=None, use_separator=True, timeout=1000, executor=None, timings=None,
+                      max_depth=24, book=True):
+    """
+    Solve like solve() on executor (default: the event loop's default executor) without blocking the event loop.
+    Cancelling the awaiting task also stops the search.
+    """
+    cube = _patternize(cubestring, patternstring)
+    search = Search()
+    loop = asyncio.get_running_loop()
+    try:
+        # the book lookup runs on the executor too, as its first use loads or builds the book
+        solution = await loop.run_in_executor(executor, _book_or_solution, search, cube, max_depth, timeout,
+                                              use_separator, book, timings)
+    except asyncio.CancelledError:
+        search.cancel()
+        raise
+    if timings is not None:
+        timings.update(search.timings)
+    return solution
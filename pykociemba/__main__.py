@@ -0,0 +1,96 @@
+import argparse
+import os
+import sys
+import time
+
+
+def solve_batch_command(args):
+    from .batch import solve_batch
+
+    fmt = args.format or ('csv' if args.output.endswith('.csv') else 'jsonl')
+    lines = sys.stdin if args.input == '-' else open(args.input)
+    start = time.time()
+    try:
+        solved, skipped = solve_batch(lines, args.output, fmt, args.workers, args.scrambles, args.max_depth,
+                                      args.timeout, args.resume, args.chunksize, lockstep=args.lockstep,
+                                      threads=args.threads)
+    finally:
+        if lines is not sys.stdin:
+            lines.close()
+    elapsed = time.time() - start
+    sys.stderr.write('solved %d cubes in %.1fs (%.1f/s), skipped %d already in %s\n' % (
+        solved, elapsed, solved / elapsed if elapsed else 0, skipped, args.output))
+
+
+def export_tables_command(args):
+    from .coordcube import MMAP_TABLES_PATH, export_tables
+
+    path = args.output or MMAP_TABLES_PATH
+    export_tables(path)
+    sys.stderr.write('wrote %s (%d bytes); set PYKOCIEMBA_TABLES to it to memory-map the tables\n' % (
+        path, os.path.getsize(path)))
+
+
+def random_states_command(args):
+    from .randomstates import random_states
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        # chunks of a fixed size with their own seeds, so that the same seed always gives the same corpus
+        for chunk, start in enumerate(range(0, args.count, RANDOM_STATES_CHUNK)):
+            count = min(RANDOM_STATES_CHUNK, args.count - start)
+            seed = None if args.seed is None else [args.seed, chunk]
+            states = random_states(count, seed, args.subset, 'packed' if args.packed else 'facelets')
+            if args.packed:
+                out.writelines('%d %d\n' % (corners, edges) for corners, edges in states.tolist())
+            else:
+                out.writelines(state + '\n' for state in states)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+RANDOM_STATES_CHUNK = 1 << 20
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m pykociemba')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    batch = commands.add_parser('solve-batch', help='solve a file of cubes on a pool of worker processes')
+    batch.add_argument('input', help='file with one cube definition string (or scramble) per line, '
+                                     'optionally preceded by an id and a tab; - reads stdin')
+    batch.add_argument('-o', '--output', required=True, help='result file, written as results come in')
+    batch.add_argument('--format', choices=['jsonl', 'csv'], help='default: csv for *.csv, else jsonl')
+    batch.add_argument('--scrambles', action='store_true', help='the input lines are scrambles, not states')
+    batch.add_argument('--resume', action='store_true', help='append to the output and skip the ids it already has')
+    batch.add_argument('-j', '--workers', type=int, default=os.cpu_count(), help='default: %(default)s')
+    batch.add_argument('--max-depth', type=int, default=24)
+    batch.add_argument('--timeout', type=float, default=1000, help='solver timeout per cube in seconds')
+    batch.add_argument('--chunksize', type=int, default=4, help='cubes handed to a worker at a time')
+    batch.add_argument('--threads', action='store_true',
+                       help='use worker threads instead of processes; they run in parallel on free-threaded builds')
+    batch.add_argument('--lockstep', type=int, metavar='N',
+                       help='solve N cubes at a time per worker with their phase-1 searches in lockstep (needs numpy)')
+    batch.set_defaults(func=solve_batch_command)
+
+    states = commands.add_parser('random-states', help='write uniformly random cube states, one per line (needs numpy)')
+    states.add_argument('count', type=int)
+    states.add_argument('-o', '--output', default='-', help='default: stdout')
+    states.add_argument('--seed', type=int, help='the same seed gives the same states')
+    states.add_argument('--subset', choices=['all', 'last_layer'], default='all')
+    states.add_argument('--packed', action='store_true',
+                        help='write each state as two integers instead of a cube definition string')
+    states.set_defaults(func=random_states_command)
+
+    export = commands.add_parser('export-tables', help='write the tables to one file that can be memory-mapped')
+    export.add_argument('-o', '--output', help='default: pykociemba/prunetables/tables.mmap')
+    export.set_defaults(func=export_tables_command)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Admission control for solve requests.
+
+At most concurrency solves run at once and at most queue_size more wait for a slot. A request comes with a budget,
+the seconds its client is willing to wait in total. It is admitted only if the expected wait for a slot, estimated
+from the number of requests ahead of it and a moving average of recent solve times, fits into the budget, and it is
+given what is left of the budget as the solver timeout. Rejected requests get an Overloaded with a retry-after hint
+instead of joining a backlog that nobody will wait for. admit() is for threads, admit_async() for coroutines.
+"""
+import asyncio
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+
+
+class Overloaded(Exception):
+    """A request was not admitted. retry_after is the number of seconds after which it may fit."""
+
+    def __init__(self, retry_after):
+        super(Overloaded, self).__init__('overloaded, retry after %ds' % retry_after)
+        self.retry_after = retry_after
+
+
+class AdmissionController(object):
+    """Bounded, deadline-aware admission for solves, see the module docstring. Thread-safe."""
+
+    def __init__(self, concurrency, queue_size, estimate=1.0, alpha=0.2):
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.estimate = estimate    # moving average of the solve time in seconds
+        self.alpha = alpha
+        self.pending = 0            # admitted requests, running or waiting for a slot
+        self.lock = threading.Lock()
+        self.slots = threading.Semaphore(concurrency)
+        self.waiting = None         # the executor of admit_async(), created on first use
+
+    def expected_wait(self):
+        """Seconds a request admitted now would wait for a slot: the slots free up at concurrency / estimate per s."""
+        ahead = self.pending - self.concurrency + 1
+        return ahead * self.estimate / self.concurrency if ahead > 0 else 0.0
+
+    def record(self, seconds):
+        with self.lock:
+            self.estimate += self.alpha * (seconds - self.estimate)
+
+    def reserve(self, budget):
+        """Count a request as pending, or raise Overloaded if it may not wait for a slot with budget seconds."""
+        with self.lock:
+            wait = self.expected_wait()
+            if self.pending >= self.concurrency + self.queue_size:
+                raise Overloaded(max(1, int(math.ceil(wait))))
+            if wait >= budget:
+                raise Overloaded(max(1, int(math.ceil(wait - budget))))
+            self.pending += 1
+
+    def unreserve(self):
+        with self.lock:
+            self.pending -= 1
+
+    def timed_out(self):
+        return Overloaded(max(1, int(math.ceil(self.expected_wait()))))
+
+    @contextmanager
+    def admit(self, budget):
+        """
+        Wait for a solve slot and yield the seconds left of budget, or raise Overloaded if the queue is full or the
+        request is not expected to get a slot within its budget. The time spent in the block updates the estimate.
+        """
+        self.reserve(budget)
+        start = time.perf_counter()
+        try:
+            if not self.slots.acquire(timeout=budget):
+                raise self.timed_out()
+            try:
+                started = time.perf_counter()
+                yield budget - (started - start)
+            finally:
+                self.slots.release()
+                self.record(time.perf_counter() - started)
+        finally:
+            self.unreserve()
+
+    @asynccontextmanager
+    async def admit_async(self, budget):
+        """
+        admit() for a coroutine: the wait for a slot runs on a thread of its own, so the event loop goes on. If the
+        coroutine is cancelled while it waits, a slot acquired after all is given back.
+        """
+        self.reserve(budget)
+        start = time.perf_counter()
+        try:
+            if not self.slots.acquire(blocking=False):
+                waiting = asyncio.get_running_loop().run_in_executor(self.waiters(), self.slots.acquire, True, budget)
+                try:
+                    acquired = await asyncio.shield(waiting)
+                except asyncio.CancelledError:
+                    waiting.add_done_callback(self.release_acquired)
+                    raise
+                if not acquired:
+                    raise self.timed_out()
+            try:
+                started = time.perf_counter()
+                yield budget - (started - start)
+            finally:
+                self.slots.release()
+                self.record(time.perf_counter() - started)
+        finally:
+            self.unreserve()
+
+    def waiters(self):
+        """The threads that wait for slots for admit_async(), one for every request that may be pending."""
+        with self.lock:
+            if self.waiting is None:
+                self.waiting = ThreadPoolExecutor(self.concurrency + self.queue_size)
+            return self.waiting
+
+    def release_acquired(self, waiting):
+        if not waiting.cancelled() and waiting.exception() is None and waiting.result():
+            self.slots.release()
@@ -0,0 +1,191 @@
+"""
+Solve many cubes on all cores, streaming the results to a JSONL or CSV file.
+
+Every input line is a cube definition string, or a scramble with scrambles=True, optionally preceded by an id and a
+tab. Lines without an id get their line number. Results are written as soon as a worker finishes them, so they are
+not in input order; the seq field gives the input position. Resuming skips the ids already in the output file.
+With lockstep=N every worker solves N cubes at a time with the LockstepSolver; ms is then the chunk time per cube.
+With threads=True the workers are threads sharing this process's tables, for free-threaded Python builds.
+"""
+import csv
+import gc
+import json
+import multiprocessing
+import multiprocessing.pool
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from .lockstep import LockstepSolver
+from .search import Search
+from .scramble_to_state import scramble_to_state
+
+FIELDS = ['id', 'seq', 'input', 'solution', 'length', 'error', 'ms']
+
+
+def parse_lines(lines):
+    """Yield (seq, id, input) for every non-empty input line."""
+    for seq, line in enumerate(lines):
+        line = line.strip()
+        if not line:
+            continue
+        if '\t' in line:
+            id, value = line.split('\t', 1)
+        else:
+            id, value = str(seq + 1), line
+        yield seq, id, value.strip()
+
+
+def record(item, solution, ms):
+    seq, id, value = item
+    error = solution if solution.startswith('Error') else None
+    return {
+        'id': id,
+        'seq': seq,
+        'input': value,
+        'solution': None if error else solution,
+        'length': None if error else len(solution.split()),
+        'error': error,
+        'ms': round(ms, 3),
+    }
+
+
+def solve_item(item, scrambles=False, max_depth=24, timeout=1000):
+    """Solve one (seq, id, input) item and return its result record."""
+    start = time.perf_counter()
+    value = item[2]
+    state = scramble_to_state(value.split()) if scrambles else value
+    solution = Search().solution(state, max_depth, timeout, False)
+    return record(item, solution, (time.perf_counter() - start) * 1000)
+
+
+def solve_items(items, scrambles=False, max_depth=24, timeout=1000):
+    """Solve a list of items together with the LockstepSolver and return their result records."""
+    start = time.perf_counter()
+    states = [scramble_to_state(value.split()) if scrambles else value for seq, id, value in items]
+    solutions = LockstepSolver(max_depth, timeout, lanes=len(items)).solve(states, False)
+    ms = (time.perf_counter() - start) * 1000 / len(items)
+    return [record(item, solution, ms) for item, solution in zip(items, solutions)]
+
+
+def _solve_item(args):
+    return [solve_item(*args)]
+
+
+def _solve_items(args):
+    return solve_items(*args)
+
+
+class Writer(object):
+    """Appends result records to a JSONL or CSV file."""
+
+    def __init__(self, f, fmt, header):
+        self.f = f
+        self.fmt = fmt
+        if fmt == 'csv':
+            self.csv = csv.DictWriter(f, FIELDS)
+            if header:
+                self.csv.writeheader()
+
+    def write(self, record):
+        if self.fmt == 'csv':
+            self.csv.writerow(record)
+        else:
+            self.f.write(json.dumps(record) + '\n')
+
+
+def done_ids(path, fmt):
+    """
+    The ids already in the output file path. A partially written last line, left by an interrupted run, is cut
+    off so that appending to the file keeps it well-formed.
+    """
+    if not os.path.exists(path):
+        return set()
+    with open(path, 'rb+') as f:
+        data = f.read()
+        end = data.rfind(b'\n') + 1
+        if end != len(data):
+            f.truncate(end)
+    lines = data[:end].decode().splitlines()
+    if fmt == 'csv':
+        return set(row['id'] for row in csv.DictReader(lines))
+    ids = set()
+    for line in lines:
+        if line.strip():
+            ids.add(json.loads(line)['id'])
+    return ids
+
+
+@contextmanager
+def make_pool(workers, threads=False):
+    if threads:
+        with multiprocessing.pool.ThreadPool(workers) as pool:
+            yield pool
+        return
+    # Forked workers share the tables loaded by this process instead of unpickling their own copy. Freezing the
+    # objects keeps the garbage collector from touching, and so copying, the pages they live in. They are unfrozen
+    # when the pool is closed, so a caller of solve_batch gets its garbage collector back.
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+    freeze = hasattr(gc, 'freeze')
+    if freeze:
+        gc.freeze()
+    try:
+        with context.Pool(workers) as pool:
+            yield pool
+    finally:
+        if freeze:
+            gc.unfreeze()
+
+
+def solve_batch(lines, path, fmt='jsonl', workers=None, scrambles=False, max_depth=24, timeout=1000, resume=False,
+                chunksize=4, window=None, lockstep=None, threads=False):
+    """
+    Solve the cubes of lines into the file path, see the module docstring.
+
+    At most window items (default 64 per worker, or 2 lockstep chunks) are in flight, so arbitrarily long inputs are
+    streamed.
+    @return (number of cubes solved, number skipped because their id was already in the output)
+    """
+    workers = workers or os.cpu_count() or 1
+    skip = done_ids(path, fmt) if resume else set()
+    slots = threading.BoundedSemaphore(window or (2 * lockstep if lockstep else 64) * workers)
+    skipped = [0]
+
+    def items():
+        for seq, id, value in parse_lines(lines):
+            if id in skip:
+                skipped[0] += 1
+                continue
+            slots.acquire()
+            yield seq, id, value
+
+    def tasks():
+        if not lockstep:
+            for item in items():
+                yield item, scrambles, max_depth, timeout
+            return
+        chunk = []
+        for item in items():
+            chunk.append(item)
+            if len(chunk) == lockstep:
+                yield chunk, scrambles, max_depth, timeout
+                chunk = []
+        if chunk:
+            yield chunk, scrambles, max_depth, timeout
+
+    solved = 0
+    header = not (resume and os.path.exists(path) and os.path.getsize(path))
+    with open(path, 'a' if resume else 'w', newline='') as f:
+        writer = Writer(f, fmt, header)
+        with make_pool(workers, threads) as pool:
+            solve = _solve_items if lockstep else _solve_item
+            for records in pool.imap_unordered(solve, tasks(), 1 if lockstep else chunksize):
+                for result in records:
+                    writer.write(result)
+                    slots.release()
+                    solved += 1
+                    if solved % 100 == 0:
+                        f.flush()
+    return solved, skipped[0]
@@ -0,0 +1,168 @@
+"""
+An opening book: every cube within a few moves of solved, with its distance and an optimal first move.
+
+The book is built by a breadth-first search from the solved cube in NumPy, over the cubie arrays of randomstates and
+keyed by their packed form (pack_states), and kept in the prunetables directory like the other tables. Looking a
+cube up takes two binary searches, and following the stored moves from it gives an optimal (shortest in the face
+turn metric) solution. solve() consults the book before running the two-phase search.
+"""
+import logging
+import threading
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .coordcube import dump_cachetable, load_cachetable
+from .cubiecube import CubieCube, moveCube
+from .facecube import FaceCube
+from .randomstates import pack_states
+
+log = logging.getLogger(__name__)
+
+BOOK_DEPTH = 5
+
+_FACES = 'URFDLB'
+_POWERS = ('', '2', "'")
+
+
+def _moves():
+    """The 18 moves 3 * axis + power - 1 as index arrays (cp, co, ep, eo) to apply them to the cubie arrays."""
+    moves = []
+    for m in moveCube:
+        cp, co, ep, eo = list(range(8)), [0] * 8, list(range(12)), [0] * 12
+        for _ in range(3):
+            co = [(co[m.cp[i]] + m.co[i]) % 3 for i in range(8)]
+            cp = [cp[m.cp[i]] for i in range(8)]
+            eo = [(eo[m.ep[i]] + m.eo[i]) % 2 for i in range(12)]
+            ep = [ep[m.ep[i]] for i in range(12)]
+            moves.append(tuple(np.array(a, dtype=np.int8) for a in (cp, co, ep, eo)))
+    return moves
+
+
+def apply_move(states, move):
+    """The cubie arrays states after the move, given as from _moves()."""
+    cp, co, ep, eo = states
+    mcp, mco, mep, meo = move
+    return cp[:, mcp], (co[:, mcp] + mco) % 3, ep[:, mep], (eo[:, mep] + meo) % 2
+
+
+def inverse(mv):
+    return mv - mv % 3 + 2 - mv % 3
+
+
+def build_book(depth=BOOK_DEPTH):
+    """
+    Breadth-first search to depth moves from the solved cube.
+    @return the keys (corners, edges) of all cubes found, sorted, their distances and the first moves to solve them
+    """
+    moves = _moves()
+    solved = (np.arange(8, dtype=np.int8)[None], np.zeros((1, 8), dtype=np.int8),
+              np.arange(12, dtype=np.int8)[None], np.zeros((1, 12), dtype=np.int8))
+    keys = pack_states(*solved)
+    distances = [np.zeros(1, dtype=np.uint8)]
+    firstMoves = [np.full(1, 255, dtype=np.uint8)]
+    frontier = solved
+    for d in range(1, depth + 1):
+        children = [apply_move(frontier, move) for move in moves]
+        states = tuple(np.concatenate(parts) for parts in zip(*children))
+        reached = np.repeat(np.arange(18, dtype=np.uint8), len(frontier[0]))
+        found = pack_states(*states)
+        # keep the first occurrence of every cube not seen before: in lexicographic key order, stable in input order
+        both = np.concatenate([keys, found])
+        order = np.lexsort((np.arange(len(both)), both[:, 1], both[:, 0]))
+        ordered = both[order]
+        first = np.ones(len(both), dtype=bool)
+        first[1:] = (ordered[1:] != ordered[:-1]).any(axis=1)
+        new = np.sort(order[first & (order >= len(keys))] - len(keys))
+        keys = np.concatenate([keys, found[new]])
+        distances.append(np.full(len(new), d, dtype=np.uint8))
+        firstMoves.append(np.array([inverse(mv) for mv in range(18)], dtype=np.uint8)[reached[new]])
+        frontier = tuple(a[new] for a in states)
+    order = np.lexsort((keys[:, 1], keys[:, 0]))
+    return keys[order], np.concatenate(distances)[order], np.concatenate(firstMoves)[order]
+
+
+class OpeningBook(object):
+    """The cubes within depth moves of solved, see the module docstring."""
+
+    def __init__(self, depth=BOOK_DEPTH):
+        self.depth = depth
+        self.moves = _moves()
+        name = 'OpeningBook%d' % depth
+        table = load_cachetable(name)
+        if table is None:
+            table = build_book(depth)
+            try:
+                dump_cachetable(table, name)
+            except OSError as e:
+                # keep the book in memory, it is built again next time
+                log.warning('could not write cache for %s: %s', name, e)
+        self.keys, self.distances, self.firstMoves = table
+
+    def find(self, key):
+        """The index of the packed key in the book, or -1."""
+        corners = self.keys[:, 0]
+        lo = np.searchsorted(corners, key[0], 'left')
+        hi = np.searchsorted(corners, key[0], 'right')
+        i = lo + np.searchsorted(self.keys[lo:hi, 1], key[1])
+        return int(i) if i < hi and self.keys[i, 1] == key[1] else -1
+
+    def _states(self, cube):
+        cc = cube if isinstance(cube, CubieCube) else FaceCube(cube).toCubieCube()
+        return tuple(np.array([a], dtype=np.int8) for a in (cc.cp, cc.co, cc.ep, cc.eo))
+
+    def distance(self, cube):
+        """
+        The number of moves of an optimal solution of the cube (a facelet string or CubieCube), None if it is not in
+        the book.
+        """
+        i = self.find(pack_states(*self._states(cube))[0])
+        return None if i < 0 else int(self.distances[i])
+
+    def solution(self, cube):
+        """
+        An optimal solution of the cube (a facelet string or CubieCube) as a list of moves, None if it is not in the
+        book.
+        """
+        states = self._states(cube)
+        solution = []
+        while True:
+            i = self.find(pack_states(*states)[0])
+            if i < 0:
+                return None
+            if self.distances[i] == 0:
+                return solution
+            mv = int(self.firstMoves[i])
+            solution.append(_FACES[mv // 3] + _POWERS[mv % 3])
+            states = apply_move(states, self.moves[mv])
+
+
+_book = None
+_book_failed = False
+_book_lock = threading.Lock()
+
+
+def opening_book():
+    """The opening book, loaded (or built) on first use; None without numpy or if it could not be built."""
+    global _book, _book_failed
+    with _book_lock:
+        if _book is None and np is not None and not _book_failed:
+            try:
+                _book = OpeningBook()
+            except Exception:
+                # solve() goes on without the book rather than failing, and does not try again on every call
+                log.exception('could not build the opening book')
+                _book_failed = True
+        return _book
+
+
+def book_solution(cube):
+    """
+    An optimal solution of the valid cube (a facelet string or CubieCube) from the opening book as a string, None if
+    it is not in the book.
+    """
+    book = opening_book()
+    solution = book.solution(cube) if book is not None else None
+    return None if solution is None else ' '.join(solution)
@@ -1,6 +1,19 @@
+from array import array
 from builtins import range
+from collections import OrderedDict
+import hashlib
+import json
 import logging
+import mmap
 import os.path
+import struct
+import sys
+import threading
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 try:
     import cPickle
@@ -8,11 +21,21 @@ except ImportError:
     import pickle as cPickle
 
 from .cubiecube import CubieCube, moveCube, getURtoDF
+from .moves import PHASE2_INDEX, PHASE2_MOVES
+from .version import SOLVER_VERSION
 
 log = logging.getLogger(__name__)
 
 cache_dir = os.path.join(os.path.dirname(__file__), 'prunetables')
 
+# A single file holding all tables as flat arrays, to be memory-mapped instead of unpickled, see export_tables().
+# load_tables() attaches to it when the -X option pykociemba_tables or else PYKOCIEMBA_TABLES names it. Sub-interpreters
+# set the option in their own sys._xoptions, as os.environ is shared by the whole process.
+MMAP_TABLES_ENV = 'PYKOCIEMBA_TABLES'
+MMAP_TABLES_XOPTION = 'pykociemba_tables'
+MMAP_TABLES_PATH = os.path.join(cache_dir, 'tables.mmap')
+MMAP_MAGIC = b'PYKOCMAP'
+
 
 def setPruning(table, index, value):
     """Set pruning value in table. Two values are stored in one byte."""
@@ -34,19 +57,47 @@ def getPruning(table, index):
     # return table[index] & 0xf
 
 
+def cachetable_path(name):
+    return os.path.join(cache_dir, name + '.pkl')
+
+
 def load_cachetable(name):
     obj = None
     try:
-        with open(os.path.join(cache_dir, name + '.pkl'), 'rb') as f:
+        with open(cachetable_path(name), 'rb') as f:
             obj = cPickle.load(f)
-    except IOError as e:
+    except (IOError, EOFError, cPickle.UnpicklingError) as e:
         log.warning('could not read cache for %s: %s. Recalculating it...', name, e)
     return obj
 
 
+def write_atomically(path, write):
+    """Call write(f) on a temporary file next to path and rename it to path, so readers never see a partial file."""
+    tmp = '%s.%d.%d.tmp' % (path, os.getpid(), threading.get_ident())
+    try:
+        with open(tmp, 'wb') as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
 def dump_cachetable(obj, name):
-    with open(os.path.join(cache_dir, name + '.pkl'), 'wb') as f:
-        cPickle.dump(obj, f)
+    write_atomically(cachetable_path(name), lambda f: cPickle.dump(obj, f))
+
+
+def freeze(table):
+    """
+    The read-only form of a table, shared by all threads: a tuple of tuples for a move table, bytes for a pruning
+    table (two 4-bit values per byte, read by getPruning as before).
+    """
+    if isinstance(table, (tuple, bytes, memoryview)):
+        return table
+    if isinstance(table[0], list):
+        return tuple(tuple(row) for row in table)
+    return bytes(table)
 
 
 class CoordCube(object):
@@ -112,281 +163,479 @@ class CoordCube(object):
             # are not in UD-slice
             self.URtoDF = self.MergeURtoULandUBtoDF[self.URtoUL][self.UBtoDF]
 
-    # ******************************************Phase 1 move tables*****************************************************
-
-    log.debug('Preparing move table for the twists of the corners...')
-    # Move table for the twists of the corners
-    # twist < 2187 in phase 2.
-    # twist = 0 in phase 2.
-    twistMove = load_cachetable('twistMove')
-    if not twistMove:
-        twistMove = [[0] * N_MOVE for i in range(N_TWIST)]   # new short[N_TWIST][N_MOVE]
-        a = CubieCube()
-        for i in range(N_TWIST):
-            a.setTwist(i)
-            for j in range(6):
-                for k in range(3):
-                    a.cornerMultiply(moveCube[j])
-                    twistMove[i][3 * j + k] = a.getTwist()
-                a.cornerMultiply(moveCube[j])   # 4. faceturn restores
-                # a
-        dump_cachetable(twistMove, 'twistMove')
-
-    # ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-    # Move table for the flips of the edges
-    # flip < 2048 in phase 1
-    # flip = 0 in phase 2.
-    log.debug('Preparing move table for the flips of the edges')
-
-    flipMove = load_cachetable('flipMove')
-    if not flipMove:
-        flipMove = [[0] * N_MOVE for i in range(N_FLIP)]     # new short[N_FLIP][N_MOVE]
-        a = CubieCube()
-        for i in range(N_FLIP):
-            a.setFlip(i)
-            for j in range(6):
-                for k in range(3):
-                    a.edgeMultiply(moveCube[j])
-                    flipMove[i][3 * j + k] = a.getFlip()
-                a.edgeMultiply(moveCube[j])
-                # a
-        dump_cachetable(flipMove, 'flipMove')
-
     # ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     # Parity of the corner permutation. This is the same as the parity for the edge permutation of a valid cube.
     # parity has values 0 and 1
-    parityMove = [
-        [1, 0, 1, 1, 0, 1, 1, 0, 1, 1, 0, 1, 1, 0, 1, 1, 0, 1],
-        [0, 1, 0, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, 1, 0],
-    ]
-
-    # ***********************************Phase 1 and 2 movetable********************************************************
-    log.debug('Preparing move table for the four UD-slice edges FR, FL, Bl and BR')
-    # ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-    # Move table for the four UD-slice edges FR, FL, Bl and BR
-    # FRtoBRMove < 11880 in phase 1
-    # FRtoBRMove < 24 in phase 2
-    # FRtoBRMove = 0 for solved cube
-
-    FRtoBR_Move = load_cachetable('FRtoBR_Move')
-    if not FRtoBR_Move:
-        FRtoBR_Move = [[0] * N_MOVE for i in range(N_FRtoBR)]    # new short[N_FRtoBR][N_MOVE]
-        a = CubieCube()
-        for i in range(N_FRtoBR):
-            a.setFRtoBR(i)
-            for j in range(6):
-                for k in range(3):
-                    a.edgeMultiply(moveCube[j])
-                    FRtoBR_Move[i][3 * j + k] = a.getFRtoBR()
+    parityMove = (
+        (1, 0, 1, 1, 0, 1, 1, 0, 1, 1, 0, 1, 1, 0, 1, 1, 0, 1),
+        (0, 1, 0, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, 1, 0),
+    )
+    # parityMove for the phase 2 moves U, U2, U', R2, F2, D, D2, D', L2, B2, the columns of the phase 2 move tables
+    parityMove2 = (
+        (1, 0, 1, 0, 0, 1, 0, 1, 0, 0),
+        (0, 1, 0, 1, 1, 0, 1, 0, 1, 1),
+    )
+
+    # The move and pruning tables below are attached to the class by load_tables() when the module is imported.
+
+
+# ******************************************Phase 1 move tables*********************************************************
+
+def build_twistMove():
+    """Move table for the twists of the corners. twist < 2187 in phase 1, twist = 0 in phase 2."""
+    twistMove = [[0] * CoordCube.N_MOVE for i in range(CoordCube.N_TWIST)]   # new short[N_TWIST][N_MOVE]
+    a = CubieCube()
+    for i in range(CoordCube.N_TWIST):
+        a.setTwist(i)
+        for j in range(6):
+            for k in range(3):
+                a.cornerMultiply(moveCube[j])
+                twistMove[i][3 * j + k] = a.getTwist()
+            a.cornerMultiply(moveCube[j])   # 4. faceturn restores
+            # a
+    return twistMove
+
+
+def build_flipMove():
+    """Move table for the flips of the edges. flip < 2048 in phase 1, flip = 0 in phase 2."""
+    flipMove = [[0] * CoordCube.N_MOVE for i in range(CoordCube.N_FLIP)]     # new short[N_FLIP][N_MOVE]
+    a = CubieCube()
+    for i in range(CoordCube.N_FLIP):
+        a.setFlip(i)
+        for j in range(6):
+            for k in range(3):
                 a.edgeMultiply(moveCube[j])
-        dump_cachetable(FRtoBR_Move, 'FRtoBR_Move')
-
-    # *******************************************Phase 1 and 2 movetable************************************************
-
-    # ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-    # Move table for permutation of six corners. The positions of the DBL and DRB corners are determined by the parity.
-    # URFtoDLF < 20160 in phase 1
-    # URFtoDLF < 20160 in phase 2
-    # URFtoDLF = 0 for solved cube.
-    log.debug('Preparing move table for permutation of six corners. The positions of the DBL and DRB corners are determined by the parity.')
-    URFtoDLF_Move = load_cachetable('URFtoDLF_Move')
-    if not URFtoDLF_Move:
-        URFtoDLF_Move = [[0] * N_MOVE for i in range(N_URFtoDLF)]    # new short[N_URFtoDLF][N_MOVE]
-        a = CubieCube()
-        for i in range(N_URFtoDLF):
-            a.setURFtoDLF(i)
-            for j in range(6):
-                for k in range(3):
-                    a.cornerMultiply(moveCube[j])
-                    URFtoDLF_Move[i][3 * j + k] = a.getURFtoDLF()
+                flipMove[i][3 * j + k] = a.getFlip()
+            a.edgeMultiply(moveCube[j])
+            # a
+    return flipMove
+
+
+# ***********************************Phase 1 and 2 movetable************************************************************
+
+def build_FRtoBR_Move():
+    """
+    Move table for the four UD-slice edges FR, FL, Bl and BR
+    FRtoBRMove < 11880 in phase 1
+    FRtoBRMove < 24 in phase 2
+    FRtoBRMove = 0 for solved cube
+    """
+    FRtoBR_Move = [[0] * CoordCube.N_MOVE for i in range(CoordCube.N_FRtoBR)]    # new short[N_FRtoBR][N_MOVE]
+    a = CubieCube()
+    for i in range(CoordCube.N_FRtoBR):
+        a.setFRtoBR(i)
+        for j in range(6):
+            for k in range(3):
+                a.edgeMultiply(moveCube[j])
+                FRtoBR_Move[i][3 * j + k] = a.getFRtoBR()
+            a.edgeMultiply(moveCube[j])
+    return FRtoBR_Move
+
+
+def build_URFtoDLF_Move():
+    """
+    Move table for permutation of six corners. The positions of the DBL and DRB corners are determined by the parity.
+    URFtoDLF < 20160 in phase 1
+    URFtoDLF < 20160 in phase 2
+    URFtoDLF = 0 for solved cube.
+    """
+    URFtoDLF_Move = [[0] * CoordCube.N_MOVE for i in range(CoordCube.N_URFtoDLF)]    # new short[N_URFtoDLF][N_MOVE]
+    a = CubieCube()
+    for i in range(CoordCube.N_URFtoDLF):
+        a.setURFtoDLF(i)
+        for j in range(6):
+            for k in range(3):
                 a.cornerMultiply(moveCube[j])
-        dump_cachetable(URFtoDLF_Move, 'URFtoDLF_Move')
-
-    # ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-    # Move table for the permutation of six U-face and D-face edges in phase2. The positions of the DL and DB edges are
-    # determined by the parity.
-    # URtoDF < 665280 in phase 1
-    # URtoDF < 20160 in phase 2
-    # URtoDF = 0 for solved cube.
-    log.debug('Preparing move table for the permutation of six U-face and D-face edges in phase2. The positions of the DL and DB edges are')
-    URtoDF_Move = load_cachetable('URtoDF_Move')
-    if not URtoDF_Move:
-        URtoDF_Move = [[0] * N_MOVE for i in range(N_URtoDF)]    # new short[N_URtoDF][N_MOVE]
-        a = CubieCube()
-        for i in range(N_URtoDF):
-            a.setURtoDF(i)
-            for j in range(6):
-                for k in range(3):
-                    a.edgeMultiply(moveCube[j])
-                    URtoDF_Move[i][3 * j + k] = a.getURtoDF()
-                    # Table values are only valid for phase 2 moves!
-                    # For phase 1 moves, casting to short is not possible.
+                URFtoDLF_Move[i][3 * j + k] = a.getURFtoDLF()
+            a.cornerMultiply(moveCube[j])
+    return URFtoDLF_Move
+
+
+# ******************************************Phase 2 move tables*********************************************************
+# Only the 10 phase 2 moves, one column each in the order of moves.PHASE2_MOVES, over the phase 2 coordinate ranges.
+# URFtoDLF has the same range in both phases, so phase 2 reads the phase 2 columns of URFtoDLF_Move instead of a copy.
+
+def build_FRtoBR_Move2(FRtoBR_Move):
+    """Move table for the UD-slice edges in phase 2, FRtoBR < 24."""
+    return [[FRtoBR_Move[i][mv] for mv in PHASE2_MOVES] for i in range(CoordCube.N_SLICE2)]
+
+
+def build_URtoDF_Move2():
+    """
+    Move table for the permutation of six U-face and D-face edges in phase2. The positions of the DL and DB edges are
+    determined by the parity.
+    URtoDF < 665280 in phase 1
+    URtoDF < 20160 in phase 2
+    URtoDF = 0 for solved cube.
+    """
+    URtoDF_Move2 = [[0] * len(PHASE2_MOVES) for i in range(CoordCube.N_URtoDF)]
+    a = CubieCube()
+    for i in range(CoordCube.N_URtoDF):
+        a.setURtoDF(i)
+        for j in range(6):
+            for k in range(3):
                 a.edgeMultiply(moveCube[j])
-        dump_cachetable(URtoDF_Move, 'URtoDF_Move')
-
-    # **************************helper move tables to compute URtoDF for the beginning of phase2************************
-    # ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-    # Move table for the three edges UR,UF and UL in phase1.
-    log.debug('Preparing move table for the three edges UR,UF and UL in phase1.')
-    URtoUL_Move = load_cachetable('URtoUL_Move')
-    if not URtoUL_Move:
-        URtoUL_Move = [[0] * N_MOVE for i in range(N_URtoUL)]    # new short[N_URtoUL][N_MOVE]
-        a = CubieCube()
-        for i in range(N_URtoUL):
-            a.setURtoUL(i)
-            for j in range(6):
-                for k in range(3):
-                    a.edgeMultiply(moveCube[j])
-                    URtoUL_Move[i][3 * j + k] = a.getURtoUL()
+                # phase 1 moves take the edges out of phase 2, where getURtoDF() is not below 20160
+                if PHASE2_INDEX[3 * j + k] >= 0:
+                    URtoDF_Move2[i][PHASE2_INDEX[3 * j + k]] = a.getURtoDF()
+            a.edgeMultiply(moveCube[j])
+    return URtoDF_Move2
+
+
+# **************************helper move tables to compute URtoDF for the beginning of phase2****************************
+
+def build_URtoUL_Move():
+    """Move table for the three edges UR,UF and UL in phase1."""
+    URtoUL_Move = [[0] * CoordCube.N_MOVE for i in range(CoordCube.N_URtoUL)]    # new short[N_URtoUL][N_MOVE]
+    a = CubieCube()
+    for i in range(CoordCube.N_URtoUL):
+        a.setURtoUL(i)
+        for j in range(6):
+            for k in range(3):
                 a.edgeMultiply(moveCube[j])
-        dump_cachetable(URtoUL_Move, 'URtoUL_Move')
-
-    # ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-    # Move table for the three edges UB,DR and DF in phase1.
-    log.debug('Preparing move table for the three edges UB,DR and DF in phase1.')
-    UBtoDF_Move = load_cachetable('UBtoDF_Move')
-    if not UBtoDF_Move:
-        UBtoDF_Move = [[0] * N_MOVE for i in range(N_UBtoDF)]    # new short[N_UBtoDF][N_MOVE]
-        a = CubieCube()
-        for i in range(N_UBtoDF):
-            a.setUBtoDF(i)
-            for j in range(6):
-                for k in range(3):
-                    a.edgeMultiply(moveCube[j])
-                    UBtoDF_Move[i][3 * j + k] = a.getUBtoDF()
+                URtoUL_Move[i][3 * j + k] = a.getURtoUL()
+            a.edgeMultiply(moveCube[j])
+    return URtoUL_Move
+
+
+def build_UBtoDF_Move():
+    """Move table for the three edges UB,DR and DF in phase1."""
+    UBtoDF_Move = [[0] * CoordCube.N_MOVE for i in range(CoordCube.N_UBtoDF)]    # new short[N_UBtoDF][N_MOVE]
+    a = CubieCube()
+    for i in range(CoordCube.N_UBtoDF):
+        a.setUBtoDF(i)
+        for j in range(6):
+            for k in range(3):
                 a.edgeMultiply(moveCube[j])
-        dump_cachetable(UBtoDF_Move, 'UBtoDF_Move')
-
-    # ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-    # Table to merge the coordinates of the UR,UF,UL and UB,DR,DF edges at the beginning of phase2
-    log.debug('Preparing table to merge the coordinates of the UR,UF,UL and UB,DR,DF edges at the beginning of phase2')
-    MergeURtoULandUBtoDF = load_cachetable('MergeURtoULandUBtoDF')
-    if not MergeURtoULandUBtoDF:
-        MergeURtoULandUBtoDF = [[0] * 336 for i in range(336)]   # new short[336][336]
-        # for i, j <336 the six edges UR,UF,UL,UB,DR,DF are not in the
-        # UD-slice and the index is <20160
-        for uRtoUL in range(336):
-            for uBtoDF in range(336):
-                MergeURtoULandUBtoDF[uRtoUL][uBtoDF] = getURtoDF(uRtoUL, uBtoDF)
-        dump_cachetable(MergeURtoULandUBtoDF, 'MergeURtoULandUBtoDF')
-
-    # ****************************************Pruning tables for the search*********************************************
-    # ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-    # Pruning table for the permutation of the corners and the UD-slice edges in phase2.
-    # The pruning table entries give a lower estimation for the number of moves to reach the solved cube.
-    log.debug('Preparing pruning table for the permutation of the corners and the UD-slice edges in phase2.')
-    Slice_URFtoDLF_Parity_Prun = load_cachetable('Slice_URFtoDLF_Parity_Prun')
-    if not Slice_URFtoDLF_Parity_Prun:
-        Slice_URFtoDLF_Parity_Prun = [-1] * (N_SLICE2 * N_URFtoDLF * N_PARITY // 2)     # new byte[N_SLICE2 * N_URFtoDLF * N_PARITY / 2]
-        # Slice_URFtoDLF_Parity_Prun = [-1] * (N_SLICE2 * N_URFtoDLF * N_PARITY)
-        depth = 0
-        setPruning(Slice_URFtoDLF_Parity_Prun, 0, 0)
-        done = 1
-        while (done != N_SLICE2 * N_URFtoDLF * N_PARITY):
-            for i in range(N_SLICE2 * N_URFtoDLF * N_PARITY):
-                parity = i % 2
-                URFtoDLF = (i // 2) // N_SLICE2
-                _slice = (i // 2) % N_SLICE2
-                if getPruning(Slice_URFtoDLF_Parity_Prun, i) == depth:
-                    for j in range(18):
-                        if j in (3, 5, 6, 8, 12, 14, 15, 17):
-                            continue
-                        else:
-                            newSlice = FRtoBR_Move[_slice][j]
-                            newURFtoDLF = URFtoDLF_Move[URFtoDLF][j]
-                            newParity = parityMove[parity][j]
-                            if (getPruning(Slice_URFtoDLF_Parity_Prun, (N_SLICE2 * newURFtoDLF + newSlice) * 2 + newParity) == 0x0f):
-                                setPruning(
-                                    Slice_URFtoDLF_Parity_Prun,
-                                    (N_SLICE2 * newURFtoDLF + newSlice) * 2 + newParity,
-                                    (depth + 1) & 0xff
-                                )
-                                done += 1
-
-            depth += 1
-        dump_cachetable(Slice_URFtoDLF_Parity_Prun, 'Slice_URFtoDLF_Parity_Prun')
-
-    # ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-    # Pruning table for the permutation of the edges in phase2.
-    # The pruning table entries give a lower estimation for the number of moves to reach the solved cube.
-    log.debug('Preparing pruning table for the permutation of the edges in phase2.')
-    Slice_URtoDF_Parity_Prun = load_cachetable('Slice_URtoDF_Parity_Prun')
-    if not Slice_URtoDF_Parity_Prun:
-        Slice_URtoDF_Parity_Prun = [-1] * (N_SLICE2 * N_URtoDF * N_PARITY // 2)  # new byte[N_SLICE2 * N_URtoDF * N_PARITY / 2]
-        # Slice_URtoDF_Parity_Prun = [-1] * (N_SLICE2 * N_URtoDF * N_PARITY)  # new byte[N_SLICE2 * N_URtoDF * N_PARITY / 2]
-        depth = 0
-        setPruning(Slice_URtoDF_Parity_Prun, 0, 0)
-        done = 1
-        while (done != N_SLICE2 * N_URtoDF * N_PARITY):
-            for i in range(N_SLICE2 * N_URtoDF * N_PARITY):
-                parity = i % 2
-                URtoDF = (i // 2) // N_SLICE2
-                _slice = (i // 2) % N_SLICE2
-                if (getPruning(Slice_URtoDF_Parity_Prun, i) == depth):
-                    for j in range(18):
-                        if j in (3, 5, 6, 8, 12, 14, 15, 17):
-                            continue
-                        else:
-                            newSlice = FRtoBR_Move[_slice][j]
-                            newURtoDF = URtoDF_Move[URtoDF][j]
-                            newParity = parityMove[parity][j]
-                            if (getPruning(Slice_URtoDF_Parity_Prun, (N_SLICE2 * newURtoDF + newSlice) * 2 + newParity) == 0x0f):
-                                setPruning(
-                                    Slice_URtoDF_Parity_Prun,
-                                    (N_SLICE2 * newURtoDF + newSlice) * 2 + newParity,
-                                    (depth + 1) & 0xff
-                                )
-                                done += 1
-            depth += 1
-        dump_cachetable(Slice_URtoDF_Parity_Prun, 'Slice_URtoDF_Parity_Prun')
-
-    # ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-    # Pruning table for the twist of the corners and the position (not permutation) of the UD-slice edges in phase1
-    # The pruning table entries give a lower estimation for the number of moves to reach the H-subgroup.
-    log.debug('Pruning table for the twist of the corners and the position (not permutation) of the UD-slice edges in phase1')
-    Slice_Twist_Prun = load_cachetable('Slice_Twist_Prun')
-    if not Slice_Twist_Prun:
-        Slice_Twist_Prun = [-1] * (N_SLICE1 * N_TWIST // 2 + 1)  # new byte[N_SLICE1 * N_TWIST / 2 + 1]
-        # Slice_Twist_Prun = [-1] * (N_SLICE1 * N_TWIST + 1)  # new byte[N_SLICE1 * N_TWIST / 2 + 1]
-        depth = 0
-        setPruning(Slice_Twist_Prun, 0, 0)
-        done = 1
-        while (done != N_SLICE1 * N_TWIST):
-            for i in range(N_SLICE1 * N_TWIST):
-                twist = i // N_SLICE1
-                _slice = i % N_SLICE1
-                if (getPruning(Slice_Twist_Prun, i) == depth):
-                    for j in range(18):
-                        newSlice = FRtoBR_Move[_slice * 24][j] // 24
-                        newTwist = twistMove[twist][j]
-                        if (getPruning(Slice_Twist_Prun, N_SLICE1 * newTwist + newSlice) == 0x0f):
-                            setPruning(Slice_Twist_Prun, N_SLICE1 * newTwist + newSlice, (depth + 1) & 0xff)
-                            done += 1
-
-            depth += 1
-        dump_cachetable(Slice_Twist_Prun, 'Slice_Twist_Prun')
-
-    # ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-    # Pruning table for the flip of the edges and the position (not permutation) of the UD-slice edges in phase1
-    # The pruning table entries give a lower estimation for the number of moves to reach the H-subgroup.
-    log.debug('Pruning table for the flip of the edges and the position (not permutation) of the UD-slice edges in phase1')
-    Slice_Flip_Prun = load_cachetable('Slice_Flip_Prun')
-    if not Slice_Flip_Prun:
-        Slice_Flip_Prun = [-1] * (N_SLICE1 * N_FLIP // 2)    # new byte[N_SLICE1 * N_FLIP / 2]
-        # Slice_Flip_Prun = [-1] * (N_SLICE1 * N_FLIP)    # new byte[N_SLICE1 * N_FLIP / 2]
-        depth = 0
-        setPruning(Slice_Flip_Prun, 0, 0)
-        done = 1
-        while (done != N_SLICE1 * N_FLIP):
-            for i in range(N_SLICE1 * N_FLIP):
-                flip = i // N_SLICE1
-                _slice = i % N_SLICE1
-                if (getPruning(Slice_Flip_Prun, i) == depth):
-                    for j in range(18):
-                        newSlice = FRtoBR_Move[_slice * 24][j] // 24
-                        newFlip = flipMove[flip][j]
-                        if (getPruning(Slice_Flip_Prun, N_SLICE1 * newFlip + newSlice) == 0x0f):
-                            setPruning(Slice_Flip_Prun, N_SLICE1 * newFlip + newSlice, (depth + 1) & 0xff)
-                            done += 1
-            depth += 1
-        dump_cachetable(Slice_Flip_Prun, 'Slice_Flip_Prun')
+                UBtoDF_Move[i][3 * j + k] = a.getUBtoDF()
+            a.edgeMultiply(moveCube[j])
+    return UBtoDF_Move
+
+
+def build_MergeURtoULandUBtoDF():
+    """Table to merge the coordinates of the UR,UF,UL and UB,DR,DF edges at the beginning of phase2"""
+    MergeURtoULandUBtoDF = [[0] * 336 for i in range(336)]   # new short[336][336]
+    # for i, j <336 the six edges UR,UF,UL,UB,DR,DF are not in the
+    # UD-slice and the index is <20160
+    for uRtoUL in range(336):
+        for uBtoDF in range(336):
+            MergeURtoULandUBtoDF[uRtoUL][uBtoDF] = getURtoDF(uRtoUL, uBtoDF)
+    return MergeURtoULandUBtoDF
+
+
+# ****************************************Pruning tables for the search*************************************************
+
+def build_Slice_URFtoDLF_Parity_Prun(FRtoBR_Move2, URFtoDLF_Move):
+    """
+    Pruning table for the permutation of the corners and the UD-slice edges in phase2.
+    The pruning table entries give a lower estimation for the number of moves to reach the solved cube.
+    """
+    N_SLICE2, N_URFtoDLF, N_PARITY = CoordCube.N_SLICE2, CoordCube.N_URFtoDLF, CoordCube.N_PARITY
+    parityMove2 = CoordCube.parityMove2
+    Slice_URFtoDLF_Parity_Prun = [-1] * (N_SLICE2 * N_URFtoDLF * N_PARITY // 2)     # new byte[N_SLICE2 * N_URFtoDLF * N_PARITY / 2]
+    # Slice_URFtoDLF_Parity_Prun = [-1] * (N_SLICE2 * N_URFtoDLF * N_PARITY)
+    depth = 0
+    setPruning(Slice_URFtoDLF_Parity_Prun, 0, 0)
+    done = 1
+    while (done != N_SLICE2 * N_URFtoDLF * N_PARITY):
+        for i in range(N_SLICE2 * N_URFtoDLF * N_PARITY):
+            parity = i % 2
+            URFtoDLF = (i // 2) // N_SLICE2
+            _slice = (i // 2) % N_SLICE2
+            if getPruning(Slice_URFtoDLF_Parity_Prun, i) == depth:
+                for j in range(len(PHASE2_MOVES)):
+                    newSlice = FRtoBR_Move2[_slice][j]
+                    newURFtoDLF = URFtoDLF_Move[URFtoDLF][PHASE2_MOVES[j]]
+                    newParity = parityMove2[parity][j]
+                    if (getPruning(Slice_URFtoDLF_Parity_Prun, (N_SLICE2 * newURFtoDLF + newSlice) * 2 + newParity) == 0x0f):
+                        setPruning(
+                            Slice_URFtoDLF_Parity_Prun,
+                            (N_SLICE2 * newURFtoDLF + newSlice) * 2 + newParity,
+                            (depth + 1) & 0xff
+                        )
+                        done += 1
+
+        depth += 1
+    return Slice_URFtoDLF_Parity_Prun
+
+
+def build_Slice_URtoDF_Parity_Prun(FRtoBR_Move2, URtoDF_Move2):
+    """
+    Pruning table for the permutation of the edges in phase2.
+    The pruning table entries give a lower estimation for the number of moves to reach the solved cube.
+    """
+    N_SLICE2, N_URtoDF, N_PARITY = CoordCube.N_SLICE2, CoordCube.N_URtoDF, CoordCube.N_PARITY
+    parityMove2 = CoordCube.parityMove2
+    Slice_URtoDF_Parity_Prun = [-1] * (N_SLICE2 * N_URtoDF * N_PARITY // 2)  # new byte[N_SLICE2 * N_URtoDF * N_PARITY / 2]
+    # Slice_URtoDF_Parity_Prun = [-1] * (N_SLICE2 * N_URtoDF * N_PARITY)  # new byte[N_SLICE2 * N_URtoDF * N_PARITY / 2]
+    depth = 0
+    setPruning(Slice_URtoDF_Parity_Prun, 0, 0)
+    done = 1
+    while (done != N_SLICE2 * N_URtoDF * N_PARITY):
+        for i in range(N_SLICE2 * N_URtoDF * N_PARITY):
+            parity = i % 2
+            URtoDF = (i // 2) // N_SLICE2
+            _slice = (i // 2) % N_SLICE2
+            if (getPruning(Slice_URtoDF_Parity_Prun, i) == depth):
+                for j in range(len(PHASE2_MOVES)):
+                    newSlice = FRtoBR_Move2[_slice][j]
+                    newURtoDF = URtoDF_Move2[URtoDF][j]
+                    newParity = parityMove2[parity][j]
+                    if (getPruning(Slice_URtoDF_Parity_Prun, (N_SLICE2 * newURtoDF + newSlice) * 2 + newParity) == 0x0f):
+                        setPruning(
+                            Slice_URtoDF_Parity_Prun,
+                            (N_SLICE2 * newURtoDF + newSlice) * 2 + newParity,
+                            (depth + 1) & 0xff
+                        )
+                        done += 1
+        depth += 1
+    return Slice_URtoDF_Parity_Prun
+
+
+def build_Slice_Twist_Prun(FRtoBR_Move, twistMove):
+    """
+    Pruning table for the twist of the corners and the position (not permutation) of the UD-slice edges in phase1
+    The pruning table entries give a lower estimation for the number of moves to reach the H-subgroup.
+    """
+    N_SLICE1, N_TWIST = CoordCube.N_SLICE1, CoordCube.N_TWIST
+    Slice_Twist_Prun = [-1] * (N_SLICE1 * N_TWIST // 2 + 1)  # new byte[N_SLICE1 * N_TWIST / 2 + 1]
+    # Slice_Twist_Prun = [-1] * (N_SLICE1 * N_TWIST + 1)  # new byte[N_SLICE1 * N_TWIST / 2 + 1]
+    depth = 0
+    setPruning(Slice_Twist_Prun, 0, 0)
+    done = 1
+    while (done != N_SLICE1 * N_TWIST):
+        for i in range(N_SLICE1 * N_TWIST):
+            twist = i // N_SLICE1
+            _slice = i % N_SLICE1
+            if (getPruning(Slice_Twist_Prun, i) == depth):
+                for j in range(18):
+                    newSlice = FRtoBR_Move[_slice * 24][j] // 24
+                    newTwist = twistMove[twist][j]
+                    if (getPruning(Slice_Twist_Prun, N_SLICE1 * newTwist + newSlice) == 0x0f):
+                        setPruning(Slice_Twist_Prun, N_SLICE1 * newTwist + newSlice, (depth + 1) & 0xff)
+                        done += 1
+
+        depth += 1
+    return Slice_Twist_Prun
+
+
+def build_Slice_Flip_Prun(FRtoBR_Move, flipMove):
+    """
+    Pruning table for the flip of the edges and the position (not permutation) of the UD-slice edges in phase1
+    The pruning table entries give a lower estimation for the number of moves to reach the H-subgroup.
+    """
+    N_SLICE1, N_FLIP = CoordCube.N_SLICE1, CoordCube.N_FLIP
+    Slice_Flip_Prun = [-1] * (N_SLICE1 * N_FLIP // 2)    # new byte[N_SLICE1 * N_FLIP / 2]
+    # Slice_Flip_Prun = [-1] * (N_SLICE1 * N_FLIP)    # new byte[N_SLICE1 * N_FLIP / 2]
+    depth = 0
+    setPruning(Slice_Flip_Prun, 0, 0)
+    done = 1
+    while (done != N_SLICE1 * N_FLIP):
+        for i in range(N_SLICE1 * N_FLIP):
+            flip = i // N_SLICE1
+            _slice = i % N_SLICE1
+            if (getPruning(Slice_Flip_Prun, i) == depth):
+                for j in range(18):
+                    newSlice = FRtoBR_Move[_slice * 24][j] // 24
+                    newFlip = flipMove[flip][j]
+                    if (getPruning(Slice_Flip_Prun, N_SLICE1 * newFlip + newSlice) == 0x0f):
+                        setPruning(Slice_Flip_Prun, N_SLICE1 * newFlip + newSlice, (depth + 1) & 0xff)
+                        done += 1
+        depth += 1
+    return Slice_Flip_Prun
+
+
+def build_Twist_Flip_Prun(twistMove, flipMove):
+    """
+    Pruning table for the twist of the corners and the flip of the edges in phase1, at index N_FLIP * twist + flip.
+    The entries give a lower estimation for the number of moves to reach the H-subgroup. Built breadth-first with
+    numpy, as there are 4478976 entries.
+    """
+    if np is None:
+        raise ImportError('building Twist_Flip_Prun requires numpy')
+    N_TWIST, N_FLIP = CoordCube.N_TWIST, CoordCube.N_FLIP
+    twistMove = np.array(twistMove, dtype=np.int32)
+    flipMove = np.array(flipMove, dtype=np.int32)
+    dist = np.full(N_TWIST * N_FLIP, 0x0f, dtype=np.uint8)
+    dist[0] = 0
+    depth = 0
+    while True:
+        frontier = np.flatnonzero(dist == depth)
+        if not frontier.size:
+            break
+        for start in range(0, frontier.size, 1 << 18):
+            chunk = frontier[start:start + (1 << 18)]
+            twist, flip = chunk // N_FLIP, chunk % N_FLIP
+            for j in range(18):
+                index = N_FLIP * twistMove[twist, j] + flipMove[flip, j]
+                index = index[dist[index] == 0x0f]
+                dist[index] = depth + 1
+        depth += 1
+    return (dist[0::2] | (dist[1::2] << 4)).tobytes()
+
+
+# The cached tables of CoordCube in load order: name -> (builder, names of the tables the builder needs)
+TABLES = OrderedDict([
+    ('twistMove', (build_twistMove, ())),
+    ('flipMove', (build_flipMove, ())),
+    ('FRtoBR_Move', (build_FRtoBR_Move, ())),
+    ('URFtoDLF_Move', (build_URFtoDLF_Move, ())),
+    ('FRtoBR_Move2', (build_FRtoBR_Move2, ('FRtoBR_Move',))),
+    ('URtoDF_Move2', (build_URtoDF_Move2, ())),
+    ('URtoUL_Move', (build_URtoUL_Move, ())),
+    ('UBtoDF_Move', (build_UBtoDF_Move, ())),
+    ('MergeURtoULandUBtoDF', (build_MergeURtoULandUBtoDF, ())),
+    ('Slice_URFtoDLF_Parity_Prun', (build_Slice_URFtoDLF_Parity_Prun, ('FRtoBR_Move2', 'URFtoDLF_Move'))),
+    ('Slice_URtoDF_Parity_Prun', (build_Slice_URtoDF_Parity_Prun, ('FRtoBR_Move2', 'URtoDF_Move2'))),
+    ('Slice_Twist_Prun', (build_Slice_Twist_Prun, ('FRtoBR_Move', 'twistMove'))),
+    ('Slice_Flip_Prun', (build_Slice_Flip_Prun, ('FRtoBR_Move', 'flipMove'))),
+    ('Twist_Flip_Prun', (build_Twist_Flip_Prun, ('twistMove', 'flipMove'))),
+])
+
+
+def build_table(name):
+    """Compute the table name from scratch, the tables it depends on must already be loaded."""
+    build, dependencies = TABLES[name]
+    return build(*[getattr(CoordCube, dependency) for dependency in dependencies])
+
+
+def export_tables(path=MMAP_TABLES_PATH):
+    """
+    Write the loaded tables to path in the memory-mappable format: the magic, the length of a JSON header, the
+    header, then every table as a flat array of int32 (move tables) or bytes (pruning tables), 8-byte aligned. The
+    header has the SOLVER_VERSION and tables_digest() of the tables and, under tables, where each of them is.
+    """
+    tables = {}
+    chunks = []
+    offset = 0
+    for name in TABLES:
+        table = getattr(CoordCube, name)
+        if isinstance(table, bytes):
+            data, typecode, rows, cols = table, 'B', len(table), 0
+        else:
+            data = array('i', [value for row in table for value in row]).tobytes()
+            typecode, rows, cols = 'i', len(table), len(table[0])
+        tables[name] = [typecode, rows, cols, offset, len(data)]
+        padding = -len(data) % 8
+        chunks.append(data + b'\0' * padding)
+        offset += len(data) + padding
+    header = {'solver_version': SOLVER_VERSION, 'digest': tables_digest(), 'tables': tables}
+    encoded = json.dumps(header).encode()
+    encoded += b' ' * (-(len(MMAP_MAGIC) + 4 + len(encoded)) % 8)
+
+    def write(f):
+        f.write(MMAP_MAGIC + struct.pack('<I', len(encoded)) + encoded)
+        for chunk in chunks:
+            f.write(chunk)
+
+    write_atomically(path, write)
+
+
+def _read_header(view, path):
+    """
+    The header of the table file path mapped to view and the offset of the data after it. Raises ValueError if it is
+    not a table file or not one of this SOLVER_VERSION with all tables.
+    """
+    if bytes(view[:len(MMAP_MAGIC)]) != MMAP_MAGIC:
+        raise ValueError('%s is not a pykociemba table file' % path)
+    start = len(MMAP_MAGIC) + 4
+    size, = struct.unpack('<I', view[len(MMAP_MAGIC):start])
+    header = json.loads(bytes(view[start:start + size]).decode())
+    if 'tables' not in header:
+        raise ValueError('%s was written by an older version of pykociemba; export the tables again' % path)
+    if header['solver_version'] != SOLVER_VERSION:
+        raise ValueError('%s was written by solver version %s, this is %s; export the tables again' % (
+            path, header['solver_version'], SOLVER_VERSION))
+    missing = [name for name in TABLES if name not in header['tables']]
+    if missing:
+        raise ValueError('%s was written by another version of pykociemba and lacks %s; export the tables again' % (
+            path, ', '.join(missing)))
+    return header, start + size
+
+
+def table_file_header(path=MMAP_TABLES_PATH):
+    """
+    The header of the table file path written by export_tables(), see there. Raises ValueError like attach_tables(),
+    but does not check the digest.
+    """
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        with memoryview(data) as view:
+            return _read_header(view, path)[0]
+
+
+def attach_tables(path=MMAP_TABLES_PATH):
+    """
+    Map the table file path written by export_tables() read-only into memory and return {name: table}. Pruning
+    tables are byte memoryviews, move tables tuples of row memoryviews, indexed like the frozen tables. All processes
+    and interpreters attached to the same file share one copy of the data in the page cache. Raises ValueError if
+    the file is not one of this SOLVER_VERSION with all tables, or its data does not match the digest in its header.
+    """
+    with open(path, 'rb') as f:
+        view = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    header, start = _read_header(view, path)
+    data = view[start:]
+    tables = {}
+    for name in TABLES:
+        typecode, rows, cols, offset, length = header['tables'][name]
+        flat = data[offset:offset + length].cast(typecode)
+        tables[name] = tuple(flat[i * cols:(i + 1) * cols] for i in range(rows)) if cols else flat
+    if digest_tables(tables) != header['digest']:
+        raise ValueError('the tables in %s do not match their digest; export the tables again' % path)
+    return tables
+
+
+_tables_lock = threading.Lock()
+_tables_digest = None
+
+
+def digest_tables(tables):
+    """The SHA-256 hex digest of the contents of the tables {name: table}, the same however they were loaded."""
+    digest = hashlib.sha256()
+    for name in TABLES:
+        table = tables[name]
+        digest.update(name.encode())
+        if isinstance(table[0], int):
+            digest.update(bytes(table))
+        elif isinstance(table[0], memoryview):
+            # the rows of an attached table are already int32 arrays
+            for row in table:
+                digest.update(row)
+        else:
+            digest.update(array('i', [value for row in table for value in row]).tobytes())
+    return digest.hexdigest()
+
+
+def tables_digest():
+    """The digest_tables() of all loaded tables."""
+    global _tables_digest
+    if _tables_digest is None:
+        _tables_digest = digest_tables({name: getattr(CoordCube, name) for name in TABLES})
+    return _tables_digest
+
+
+def load_tables():
+    """
+    Attach all tables to CoordCube, reading them from the cache or computing (and caching) the missing ones. The
+    tables are frozen, so solver threads can share them without locking. If the environment variable
+    PYKOCIEMBA_TABLES (or the -X option pykociemba_tables) names a file written by export_tables(), the tables are
+    memory-mapped from it instead.
+    """
+    global _tables_digest
+    with _tables_lock:
+        path = sys._xoptions.get(MMAP_TABLES_XOPTION) or os.environ.get(MMAP_TABLES_ENV)
+        if path:
+            for name, table in attach_tables(path).items():
+                setattr(CoordCube, name, table)
+            # attach_tables() checked the data against it
+            _tables_digest = table_file_header(path)['digest']
+            return
+        for name in TABLES:
+            log.debug('Preparing %s', name)
+            table = load_cachetable(name)
+            if not table:
+                table = freeze(build_table(name))
+                dump_cachetable(table, name)
+            setattr(CoordCube, name, freeze(table))
+
+
+load_tables()
@@ -598,11 +598,11 @@ epB = [UR, UF, UL, BR, DR, DF, DL, BL, FR, FL, UB, DB]
 eoB = [0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 1, 1]
 
 # this CubieCube array represents the 6 basic cube moves
-moveCube = [
+moveCube = (
     CubieCube(cp=cpU, co=coU, ep=epU, eo=eoU),
     CubieCube(cp=cpR, co=coR, ep=epR, eo=eoR),
     CubieCube(cp=cpF, co=coF, ep=epF, eo=eoF),
     CubieCube(cp=cpD, co=coD, ep=epD, eo=eoD),
     CubieCube(cp=cpL, co=coL, ep=epL, eo=eoL),
     CubieCube(cp=cpB, co=coB, ep=epB, eo=eoB),
-]
+)
@@ -0,0 +1,156 @@
+"""
+Difficulty estimates for many cubes, without solving them to the end.
+
+estimate(states) gives each cube a lower and an upper bound for the length of its solution. The lower bound is the
+phase-1 pruning bound, the largest of Slice_Flip_Prun, Slice_Twist_Prun and Twist_Flip_Prun at its twist, flip and
+slice coordinates: the cube is at least that many moves from the H subgroup, so at least that many from solved. With
+numpy, all cubes are turned into cubie arrays and coordinates at once and every table is read with one gather. The
+upper bound is the length of the first solution Search finds within a small time budget per cube, None if it finds
+none in time; for a cube in the opening book it is the optimal length from there.
+
+The cubes are facelet strings or, from random_states(output='arrays'), the arrays (cp, co, ep, eo).
+"""
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .book import book_solution
+from .color import colors, U, D
+from .coordcube import CoordCube, getPruning
+from .cubiecube import CubieCube, Cnk
+from .edge import FR
+from .facecube import FaceCube
+from .search import Search
+from .tools import verify
+
+
+def facelet_arrays(facelets):
+    """
+    The facelet strings as arrays (cp, co, ep, eo), as FaceCube.toCubieCube() reads them, and a boolean array that
+    tells which of them are valid cubes (tools.verify() returns 0).
+    """
+    count = len(facelets)
+    lut = np.full(256, 6, dtype=np.int64)    # 6 for anything but a color
+    for key, color in colors.items():
+        lut[ord(key)] = color
+    data = ''.join(s[:54].ljust(54, '?') for s in facelets).encode('ascii', 'replace')
+    f = lut[np.frombuffer(data, dtype=np.uint8).reshape(count, 54)]
+    valid = ((f[:, :, None] == np.arange(6)).sum(axis=1) == 9).all(axis=1)
+
+    # corners: the orientation is the first facelet with U or D, the two colors after it tell the corner
+    faces = f[:, np.array(FaceCube.cornerFacelet)]
+    upDown = (faces == U) | (faces == D)
+    co = np.where(upDown.any(axis=2), upDown.argmax(axis=2), 2)
+    col1 = np.take_along_axis(faces, ((co + 1) % 3)[:, :, None], axis=2)[:, :, 0]
+    col2 = np.take_along_axis(faces, ((co + 2) % 3)[:, :, None], axis=2)[:, :, 0]
+    corner = np.full(49, -1, dtype=np.int64)
+    for j, color in enumerate(FaceCube.cornerColor):
+        corner[7 * color[1] + color[2]] = j
+    cp = corner[7 * col1 + col2]
+    co = np.where(cp >= 0, co, 0)
+    cp = np.maximum(cp, 0)    # like FaceCube.toCubieCube, a corner it does not recognize is URF
+
+    # edges: the two colors in either order tell the edge and its orientation
+    faces = f[:, np.array(FaceCube.edgeFacelet)]
+    edge = np.full(49, -1, dtype=np.int64)
+    flipped = np.zeros(49, dtype=np.int64)
+    for j, color in enumerate(FaceCube.edgeColor):
+        edge[7 * color[0] + color[1]] = j
+        edge[7 * color[1] + color[0]] = j
+        flipped[7 * color[1] + color[0]] = 1
+    index = 7 * faces[:, :, 0] + faces[:, :, 1]
+    ep = np.maximum(edge[index], 0)
+    eo = np.where(edge[index] >= 0, flipped[index], 0)
+
+    arrays = tuple(a.astype(np.int8) for a in (cp, co, ep, eo))
+    return arrays, valid & valid_arrays(*arrays)
+
+
+def valid_arrays(cp, co, ep, eo):
+    """A boolean array that tells which of the states given as arrays are valid cubes, as CubieCube.verify checks."""
+    valid = (np.sort(ep, axis=1) == np.arange(12)).all(axis=1) & (eo.sum(axis=1) % 2 == 0)
+    valid &= (np.sort(cp, axis=1) == np.arange(8)).all(axis=1) & (co.sum(axis=1) % 3 == 0)
+    # orientations out of range would give coordinates outside of the tables
+    valid &= ((co >= 0) & (co < 3)).all(axis=1) & ((eo >= 0) & (eo < 2)).all(axis=1)
+    return valid & (_parity(cp) == _parity(ep))
+
+
+def _parity(perm):
+    n = perm.shape[1]
+    inversions = (perm[:, :, None] > perm[:, None, :]) & np.triu(np.ones((n, n), dtype=bool), 1)
+    return inversions.sum(axis=(1, 2)) % 2
+
+
+def phase1_coordinates(cp, co, ep, eo):
+    """
+    The twist, flip and slice (FRtoBR // 24) coordinates of the states given as arrays, as CoordCube has them. The
+    states must be valid, see valid_arrays().
+    """
+    twist = co[:, :7].astype(np.int64) @ (3 ** np.arange(6, -1, -1, dtype=np.int64))
+    flip = eo[:, :11].astype(np.int64) @ (2 ** np.arange(10, -1, -1, dtype=np.int64))
+    # the index of the positions of the UD-slice edges among the 12 choose 4, as in CubieCube.getFRtoBR
+    binomial = np.array([[Cnk(n, k) for k in range(6)] for n in range(12)], dtype=np.int64)
+    inSlice = ep >= FR
+    slice_ = np.zeros(len(ep), dtype=np.int64)
+    seen = np.zeros(len(ep), dtype=np.int64)
+    for j in range(11, -1, -1):
+        slice_ += np.where(inSlice[:, j], binomial[11 - j, seen + 1], 0)
+        seen += inSlice[:, j]
+    return twist, flip, slice_
+
+
+def lower_bounds(states):
+    """
+    The phase-1 pruning bounds of the states (facelet strings or arrays, see the module docstring) as a list, -1 for
+    an invalid cube.
+    """
+    if np is None:
+        return [_lower_bound(FaceCube(s).toCubieCube()) if verify(s) == 0 else -1 for s in states]
+    from .frontier import numpy_tables
+
+    if isinstance(states, tuple):
+        arrays = tuple(np.asarray(a) for a in states)
+        valid = valid_arrays(*arrays)
+    else:
+        arrays, valid = facelet_arrays(states)
+    bounds = np.full(len(valid), -1, dtype=np.int64)
+    if valid.any():
+        # only the valid cubes, the coordinates of the others may be out of range
+        twist, flip, slice_ = phase1_coordinates(*(a[valid] for a in arrays))
+        t = numpy_tables()
+        bounds[valid] = np.maximum.reduce([
+            t['Slice_Flip_Prun'][CoordCube.N_SLICE1 * flip + slice_],
+            t['Slice_Twist_Prun'][CoordCube.N_SLICE1 * twist + slice_],
+            t['Twist_Flip_Prun'][CoordCube.N_FLIP * twist + flip],
+        ])
+    return bounds.tolist()
+
+
+def _lower_bound(cc):
+    twist, flip, slice_ = cc.getTwist(), cc.getFlip(), cc.getFRtoBR() // 24
+    return max(getPruning(CoordCube.Slice_Flip_Prun, CoordCube.N_SLICE1 * flip + slice_),
+               getPruning(CoordCube.Slice_Twist_Prun, CoordCube.N_SLICE1 * twist + slice_),
+               getPruning(CoordCube.Twist_Flip_Prun, CoordCube.N_FLIP * twist + flip))
+
+
+def estimate(states, timeout=0.1, max_depth=24):
+    """
+    A (lower, upper) bound of the solution length for each of the states (facelet strings or arrays, see the module
+    docstring). upper is the length of the first solution found within timeout seconds, None if there is none in time
+    or within max_depth moves. An invalid cube gets (None, None).
+    """
+    estimates = []
+    for i, lower in enumerate(lower_bounds(states)):
+        if lower < 0:
+            estimates.append((None, None))
+            continue
+        if isinstance(states, tuple):
+            cc = CubieCube(*[a[i].tolist() for a in states])
+        else:
+            cc = FaceCube(states[i]).toCubieCube()
+        solution = book_solution(cc)
+        if solution is None:
+            solution = Search().solve_cubie(cc, max_depth, timeout, False)
+        estimates.append((lower, None if solution.startswith('Error') else len(solution.split())))
+    return estimates
@@ -0,0 +1,100 @@
+"""
+An exact phase-2 endgame table: every phase-2 cube within a few moves of solved, with its distance.
+
+The phase-2 cubes (the permutations of the corners, of the U- and D-face edges and of the UD-slice edges, with equal
+parity) are about 2 * 10^10, too many for an exact table of them all, but the ones within ENDGAME_DEPTH = 8 moves are
+five million. They are found by a breadth-first search in NumPy over the phase-2 move tables and kept, as sorted keys
+with their distances, in the prunetables directory like the other tables (built on first use).
+
+With Search.endgame set to the table, totalDepth looks the exact distance up wherever at most depth moves of phase 2
+are left and follows decreasing distances from there, instead of searching the last levels. It takes the first move
+in search order at every step, so the solutions are the same as without the table.
+"""
+import logging
+import threading
+from array import array
+from bisect import bisect_left
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .coordcube import CoordCube, dump_cachetable, load_cachetable
+from .moves import PHASE2_MOVES
+
+log = logging.getLogger(__name__)
+
+ENDGAME_DEPTH = 8
+
+
+def endgame_key(URFtoDLF, URtoDF, FRtoBR, parity):
+    """The key of a phase-2 cube in the table, from its coordinates."""
+    return ((URFtoDLF * CoordCube.N_URtoDF + URtoDF) * CoordCube.N_SLICE2 + FRtoBR) * CoordCube.N_PARITY + parity
+
+
+def build_endgame(depth=ENDGAME_DEPTH):
+    """
+    Breadth-first search to depth phase-2 moves from the solved cube.
+    @return the keys of all cubes found, sorted, and their distances
+    """
+    tables = [np.array(CoordCube.URFtoDLF_Move, dtype=np.int64)[:, list(PHASE2_MOVES)]] + [
+        np.array(getattr(CoordCube, name), dtype=np.int64) for name in ('URtoDF_Move2', 'FRtoBR_Move2', 'parityMove2')]
+    frontier = [np.zeros(1, dtype=np.int64)] * 4
+    keys = endgame_key(*frontier)
+    found = [keys]
+    distances = [np.zeros(1, dtype=np.uint8)]
+    for d in range(1, depth + 1):
+        children = [np.concatenate([table[coord, j] for j in range(table.shape[1])])
+                    for table, coord in zip(tables, frontier)]
+        childKeys, first = np.unique(endgame_key(*children), return_index=True)
+        new = ~np.isin(childKeys, keys, assume_unique=True)
+        frontier = [coord[first[new]] for coord in children]
+        keys = np.union1d(keys, childKeys[new])
+        found.append(childKeys[new])
+        distances.append(np.full(int(new.sum()), d, dtype=np.uint8))
+    found = np.concatenate(found)
+    order = np.argsort(found)
+    return found[order], np.concatenate(distances)[order]
+
+
+class EndgameTable(object):
+    """The phase-2 cubes within depth moves of solved, see the module docstring."""
+
+    def __init__(self, depth=ENDGAME_DEPTH):
+        self.depth = depth
+        name = 'Phase2Endgame%d' % depth
+        table = load_cachetable(name)
+        if table is None:
+            table = build_endgame(depth)
+            try:
+                dump_cachetable(table, name)
+            except OSError as e:
+                # keep the table in memory, it is built again next time
+                log.warning('could not write cache for %s: %s', name, e)
+        keys, distances = table
+        # plain arrays, as the search looks up one cube at a time
+        self.keys = array('q', keys.astype(np.int64).tobytes())
+        self.distances = distances.astype(np.uint8).tobytes()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def distance(self, URFtoDLF, URtoDF, FRtoBR, parity):
+        """The number of moves from the phase-2 cube to solved, None if it is more than depth."""
+        key = endgame_key(URFtoDLF, URtoDF, FRtoBR, parity)
+        i = bisect_left(self.keys, key)
+        return self.distances[i] if i < len(self.keys) and self.keys[i] == key else None
+
+
+_endgame = None
+_endgame_lock = threading.Lock()
+
+
+def endgame_table():
+    """The endgame table, loaded (or built) on first use; None without numpy."""
+    global _endgame
+    with _endgame_lock:
+        if _endgame is None and np is not None:
+            _endgame = EndgameTable()
+        return _endgame
@@ -0,0 +1,211 @@
+"""
+Phase 1 with the shallow levels expanded breadth-first in NumPy.
+
+FrontierSearch expands every phase-1 maneuver of up to frontierDepth moves at once, as arrays of (flip, twist, slice)
+coordinates, with one vectorized gather per move table and one vectorized pruning lookup per pruning table and level.
+For each phase-1 depth the pruning filter is applied level by level to the arrays, and only the surviving nodes of the
+last level are handed to a depth-first search. The frontier keeps the order in which Search would visit the nodes,
+so FrontierSearch finds the same solutions, and phase 2 is the unchanged Search.totalDepth.
+"""
+import threading
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .coordcube import CoordCube, getPruning
+from .moves import START, SUCCESSORS
+from .search import Search
+
+class _Timeout(Exception):
+    pass
+
+
+_tables = None
+_tables_lock = threading.Lock()
+
+
+def numpy_tables():
+    """The phase-1 move and pruning tables as NumPy arrays, built on first use."""
+    global _tables
+    with _tables_lock:
+        if _tables is None:
+            if np is None:
+                raise ImportError('FrontierSearch requires numpy')
+            slice_move = np.array([[CoordCube.FRtoBR_Move[s * 24][mv] // 24 for mv in range(18)]
+                                   for s in range(CoordCube.N_SLICE1)], dtype=np.int32)
+
+            def unpack(table, size):
+                packed = np.frombuffer(table, dtype=np.uint8)
+                return np.stack([packed & 0x0f, packed >> 4], axis=1).reshape(-1)[:size]
+
+            valid = np.array([[mv in SUCCESSORS[prev] for mv in range(18)] for prev in range(7)])
+            _tables = {
+                'flipMove': np.array(CoordCube.flipMove, dtype=np.int32),
+                'twistMove': np.array(CoordCube.twistMove, dtype=np.int32),
+                'sliceMove': slice_move,
+                'Slice_Flip_Prun': unpack(CoordCube.Slice_Flip_Prun, CoordCube.N_SLICE1 * CoordCube.N_FLIP),
+                'Slice_Twist_Prun': unpack(CoordCube.Slice_Twist_Prun, CoordCube.N_SLICE1 * CoordCube.N_TWIST),
+                'Twist_Flip_Prun': unpack(CoordCube.Twist_Flip_Prun, CoordCube.N_TWIST * CoordCube.N_FLIP),
+                'valid': valid,
+            }
+        return _tables
+
+
+class Frontier(object):
+    """All phase-1 maneuvers of 1..depth moves from a root, level by level, in the order Search visits them."""
+
+    def __init__(self, flip, twist, slice_, depth, twistFlipPruning=True):
+        t = numpy_tables()
+        moves = np.arange(18, dtype=np.int32)
+        self.levels = []
+        parent_count = 1
+        flips = np.array([flip], dtype=np.int32)
+        twists = np.array([twist], dtype=np.int32)
+        slices = np.array([slice_], dtype=np.int32)
+        axes = np.array([START], dtype=np.int32)
+        history = np.zeros((1, 0), dtype=np.int8)
+        for _ in range(depth):
+            parent = np.repeat(np.arange(parent_count), 18)
+            mv = np.tile(moves, parent_count)
+            keep = t['valid'][axes[parent], mv]
+            parent, mv = parent[keep], mv[keep]
+            flips = t['flipMove'][flips[parent], mv]
+            twists = t['twistMove'][twists[parent], mv]
+            slices = t['sliceMove'][slices[parent], mv]
+            dist = np.maximum(t['Slice_Flip_Prun'][CoordCube.N_SLICE1 * flips + slices],
+                              t['Slice_Twist_Prun'][CoordCube.N_SLICE1 * twists + slices])
+            if twistFlipPruning:
+                # Search only looks it up for nodes it does not prune anyway, but it is 0 wherever dist is, so taking
+                # it everywhere prunes the same nodes
+                dist = np.maximum(dist, t['Twist_Flip_Prun'][CoordCube.N_FLIP * twists + flips])
+            axes = mv // 3
+            history = np.concatenate([history[parent], mv[:, None].astype(np.int8)], axis=1)
+            self.levels.append((parent, dist))
+            parent_count = len(mv)
+        self.flip, self.twist, self.slice, self.history = flips, twists, slices, history
+
+    def survivors(self, depthPhase1):
+        """
+        Indices of the last-level nodes that Search would descend into at depthPhase1, and the number of nodes it
+        generates on the way. A node at level L is expanded if depthPhase1 - L >= its pruning value.
+        """
+        alive = np.ones(1, dtype=bool)
+        nodes = 0
+        for level, (parent, dist) in enumerate(self.levels, 1):
+            generated = alive[parent]
+            nodes += int(generated.sum())
+            alive = generated & (depthPhase1 - level >= dist)
+        return np.flatnonzero(alive), nodes
+
+
+class FrontierSearch(Search):
+    """Search with a NumPy-expanded phase-1 frontier, see the module docstring. Requires numpy."""
+
+    def __init__(self, frontierDepth=5):
+        super(FrontierSearch, self).__init__()
+        self.frontierDepth = frontierDepth
+
+    def search(self, c, maxDepth, timeOut):
+        self.phase2Time = 0.0
+        self.phase2Calls = 0
+        self.nodesPhase1 = 0
+        self.nodesPhase2 = 0
+        self.flip[0] = c.flip
+        self.twist[0] = c.twist
+        self.parity[0] = c.parity
+        self.slice[0] = c.FRtoBR // 24
+        self.URFtoDLF[0] = c.URFtoDLF
+        self.FRtoBR[0] = c.FRtoBR
+        self.URtoUL[0] = c.URtoUL
+        self.UBtoDF[0] = c.UBtoDF
+        self.tStart = time.time()
+        self.timeOut = timeOut
+        self.maxDepth = maxDepth
+
+        k = self.frontierDepth
+        frontier = None
+        try:
+            for depthPhase1 in range(1, maxDepth + 1):
+                # Within the last 5 moves Search treats H-subgroup nodes specially, so depths that reach into the
+                # frontier levels are searched from the root.
+                if k == 0 or depthPhase1 <= k + 4:
+                    s = self.dfs(0, depthPhase1)
+                else:
+                    if frontier is None:
+                        frontier = Frontier(self.flip[0], self.twist[0], self.slice[0], k, self.twistFlipPruning)
+                    survivors, nodes = frontier.survivors(depthPhase1)
+                    self.nodesPhase1 += nodes
+                    s = -1
+                    for i in survivors.tolist():
+                        for n, mv in enumerate(frontier.history[i].tolist()):
+                            self.ax[n] = mv // 3
+                            self.po[n] = mv % 3 + 1
+                        self.flip[k] = int(frontier.flip[i])
+                        self.twist[k] = int(frontier.twist[i])
+                        self.slice[k] = int(frontier.slice[i])
+                        s = self.dfs(k, depthPhase1)
+                        if s >= 0:
+                            break
+                if s >= 0:
+                    return s, depthPhase1
+                if self.cancelled or time.time() - self.tStart > timeOut:
+                    return -8, 0
+        except _Timeout:
+            return -8, 0
+        return -7, 0
+
+    def dfs(self, n, depthPhase1):
+        """
+        Depth-first phase-1 search below level n, visiting nodes in the order of Search.search().
+        @return the total solution length, or -1 if there is none below this node
+        """
+        flipMove = CoordCube.flipMove
+        twistMove = CoordCube.twistMove
+        FRtoBR_Move = CoordCube.FRtoBR_Move
+        Slice_Flip_Prun = CoordCube.Slice_Flip_Prun
+        Slice_Twist_Prun = CoordCube.Slice_Twist_Prun
+        Twist_Flip_Prun = CoordCube.Twist_Flip_Prun if self.twistFlipPruning else None
+        N_SLICE1 = CoordCube.N_SLICE1
+        N_FLIP = CoordCube.N_FLIP
+        flip = flipMove[self.flip[n]]
+        twist = twistMove[self.twist[n]]
+        slice_ = FRtoBR_Move[self.slice[n] * 24]
+        ax = self.ax
+        po = self.po
+
+        for mv in SUCCESSORS[ax[n - 1] if n > 0 else START]:
+            self.nodesPhase1 += 1
+            newFlip = flip[mv]
+            newTwist = twist[mv]
+            newSlice = slice_[mv] // 24
+            self.flip[n + 1] = newFlip
+            self.twist[n + 1] = newTwist
+            self.slice[n + 1] = newSlice
+            ax[n] = mv // 3
+            po[n] = mv % 3 + 1
+            dist = max(getPruning(Slice_Flip_Prun, N_SLICE1 * newFlip + newSlice),
+                       getPruning(Slice_Twist_Prun, N_SLICE1 * newTwist + newSlice))
+            if Twist_Flip_Prun is not None and 0 < dist < depthPhase1 - n:
+                dist = max(dist, getPruning(Twist_Flip_Prun, N_FLIP * newTwist + newFlip))
+            if dist == 0 and n >= depthPhase1 - 5:
+                dist = 10
+                if n == depthPhase1 - 1:
+                    t = time.perf_counter()
+                    s = self.totalDepth(depthPhase1, self.maxDepth)
+                    self.phase2Time += time.perf_counter() - t
+                    self.phase2Calls += 1
+                    if s >= 0 and (s == depthPhase1
+                                   or (ax[depthPhase1 - 1] != ax[depthPhase1]
+                                       and ax[depthPhase1 - 1] != ax[depthPhase1] + 3)):
+                        return s
+            if depthPhase1 - n > dist:
+                s = self.dfs(n + 1, depthPhase1)
+                if s >= 0:
+                    return s
+
+        if self.cancelled or time.time() - self.tStart > self.timeOut:
+            raise _Timeout()
+        return -1
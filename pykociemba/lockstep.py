@@ -0,0 +1,292 @@
+"""
+Phase 1 for many cubes at once, advanced in lockstep with NumPy.
+
+Every cube runs its own iterative-deepening phase-1 search, in the same order as Search, in one lane of a set of
+arrays. A step moves every busy lane to the next node Search would act on: nodes entered in this step get all their
+children generated and pruned at once, with one vectorized gather per move table and one vectorized pruning lookup per
+pruning table across all lanes, and the children that are neither descended into nor handed to phase 2 cost no step
+at all. Phase-1 endpoints go through the scalar Search.totalDepth of the cube, a cube leaves its lane as soon as it has
+a solution and the next cube of the batch takes the lane over. Once the batch is used up and only a few lanes are left
+busy, they are finished one by one by a scalar loop that picks up their search where it stands.
+
+Every cube gets the same solution as Search.solution would give it.
+"""
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .coordcube import CoordCube, getPruning
+from .facecube import FaceCube
+from .frontier import numpy_tables
+from .moves import SUCCESSORS
+from .search import Search
+from .tools import verify
+
+MAX_LEVELS = 32
+EXHAUSTED = 18      # move index after the last successor of a level
+
+# FIRST[prev] is the first move after a move on axis prev (6: none), FOLLOWING[prev][mv] the one after mv
+FIRST = tuple(SUCCESSORS[prev][0] for prev in range(7))
+FOLLOWING = tuple(
+    tuple(min([m for m in SUCCESSORS[prev] if m > mv] or [EXHAUSTED]) for mv in range(19))
+    for prev in range(7)
+)
+# LATER[prev][mv] is the number of moves after mv that may follow a move on axis prev
+LATER = tuple(tuple(sum(1 for m in SUCCESSORS[prev] if m > mv) for mv in range(18)) for prev in range(7))
+
+
+class LockstepSolver(object):
+    """Solves batches of cubes with their phase-1 searches advanced in lockstep, see the module docstring."""
+
+    def __init__(self, maxDepth=24, timeOut=1000, lanes=256, tail=16):
+        self.maxDepth = maxDepth
+        self.timeOut = timeOut
+        self.lanes = lanes
+        self.tail = tail
+        self.nodesPhase1 = 0
+        self.steps = 0
+        self.cancelled = False
+
+    def cancel(self):
+        """Stop the searches from another thread; the cubes without a solution yet get Error 8."""
+        self.cancelled = True
+
+    def solve(self, facelets, useSeparator=True):
+        """
+        Solve every cube definition string of facelets, each within timeOut seconds from when a lane takes it up.
+        @return the solution strings or error codes, in the same order and format as Search.solution
+        """
+        results = [None] * len(facelets)
+        searches = []
+        for i, cube in enumerate(facelets):
+            error = verify(cube)
+            if error != 0:
+                results[i] = "Error %s" % abs(error)
+                continue
+            c = CoordCube(FaceCube(cube).toCubieCube())
+            search = Search()
+            search.index = i
+            search.flip[0] = c.flip
+            search.twist[0] = c.twist
+            search.slice[0] = c.FRtoBR // 24
+            search.parity[0] = c.parity
+            search.URFtoDLF[0] = c.URFtoDLF
+            search.FRtoBR[0] = c.FRtoBR
+            search.URtoUL[0] = c.URtoUL
+            search.UBtoDF[0] = c.UBtoDF
+            searches.append(search)
+        if searches:
+            for search, (s, depthPhase1) in zip(searches, self.search(searches)):
+                if s < 0:
+                    results[search.index] = "Error %s" % abs(s)
+                else:
+                    results[search.index] = search.solutionToString(s, depthPhase1 if useSeparator else None)
+        return results
+
+    def phase2(self, search, moves, depthPhase1):
+        """Run phase 2 after the phase-1 maneuver moves, like Search does. @return the total length, or -1"""
+        ax = search.ax
+        po = search.po
+        for k in range(depthPhase1):
+            ax[k] = moves[k] // 3
+            po[k] = moves[k] % 3 + 1
+        s = search.totalDepth(depthPhase1, self.maxDepth)
+        if s >= 0 and (s == depthPhase1
+                       or (ax[depthPhase1 - 1] != ax[depthPhase1] and ax[depthPhase1 - 1] != ax[depthPhase1] + 3)):
+            return s
+        return -1
+
+    def search(self, searches):
+        """
+        Run phase 1 for all searches, whose level 0 coordinates are set, leaving each maneuver in its ax and po.
+        @return a (length, depthPhase1) pair per search, or a negative error code as length, like Search.search()
+        """
+        t = numpy_tables()
+        flipMove, twistMove, sliceMove = t['flipMove'], t['twistMove'], t['sliceMove']
+        flipPrun, twistPrun, valid = t['Slice_Flip_Prun'], t['Slice_Twist_Prun'], t['valid']
+        twistFlipPrun = t['Twist_Flip_Prun'] if Search.twistFlipPruning else None
+        moves = np.arange(18)
+        N_SLICE1 = CoordCube.N_SLICE1
+        N_FLIP = CoordCube.N_FLIP
+
+        # Lane l keeps level k of its search in row l * MAX_LEVELS + k: the coordinates of the node, those of its
+        # children, which children are worth visiting, and the last child visited (-1 before the first).
+        width = min(self.lanes, len(searches))
+        rows = width * MAX_LEVELS
+        flip = np.zeros(rows, dtype=np.int32)
+        twist = np.zeros(rows, dtype=np.int32)
+        slice_ = np.zeros(rows, dtype=np.int32)
+        childFlip = np.zeros((rows, 18), dtype=np.int32)
+        childTwist = np.zeros((rows, 18), dtype=np.int32)
+        childSlice = np.zeros((rows, 18), dtype=np.int32)
+        visit = np.zeros((rows, 18), dtype=bool)
+        phase2 = np.zeros((rows, 18), dtype=bool)
+        cursor = np.full(rows, -1, dtype=np.int32)
+        base = np.arange(width) * MAX_LEVELS
+        n = np.zeros(width, dtype=np.int32)         # current level
+        depth = np.ones(width, dtype=np.int32)      # current phase-1 depth
+        owner = np.full(width, -1)                  # index of the search in the lane, -1 for an idle lane
+        started = np.zeros(width)
+        pending = list(range(len(searches) - 1, -1, -1))
+        results = [(-8, 0)] * len(searches)
+
+        def load(lanes):
+            for lane in lanes:
+                i = pending.pop() if pending else -1
+                owner[lane] = i
+                if i >= 0:
+                    search = searches[i]
+                    b = base[lane]
+                    flip[b], twist[b], slice_[b] = search.flip[0], search.twist[0], search.slice[0]
+                    cursor[b] = -1
+                    n[lane] = 0
+                    depth[lane] = 1
+                    started[lane] = time.time()
+
+        load(range(width))
+        active = np.flatnonzero(owner >= 0)
+        while active.size:
+            if not pending and active.size <= self.tail:
+                # the batch is used up: finish the last few lanes one by one
+                for lane in active.tolist():
+                    i = int(owner[lane])
+                    b = base[lane]
+                    level = int(n[lane])
+                    path = cursor[b:b + MAX_LEVELS].tolist()
+                    # the children not visited yet were counted when their parent was expanded, finish counts them
+                    self.nodesPhase1 -= sum(LATER[path[k - 1] // 3 if k > 0 else 6][path[k]]
+                                            for k in range(level + 1) if path[k] >= 0)
+                    prev = path[level - 1] // 3 if level > 0 else 6
+                    path[level] = FIRST[prev] if path[level] < 0 else FOLLOWING[prev][path[level]]
+                    results[i] = self.finish(searches[i], path, flip[b:b + MAX_LEVELS].tolist(),
+                                             twist[b:b + MAX_LEVELS].tolist(), slice_[b:b + MAX_LEVELS].tolist(),
+                                             level, int(depth[lane]), started[lane])
+                break
+
+            # the timeout, checked on every step like Search checks it on every backtrack
+            expired = active[(time.time() - started[active] > self.timeOut) | self.cancelled]
+            if expired.size:
+                for lane in expired.tolist():
+                    results[owner[lane]] = (-8, 0)
+                load(expired.tolist())
+                active = np.flatnonzero(owner >= 0)
+                continue
+
+            self.steps += 1
+            level = n[active]
+            at = base[active] + level
+
+            # expand the nodes just entered: all children at once, and which of them Search would act on
+            fresh = cursor[at] < 0
+            if fresh.any():
+                node = at[fresh]
+                lv = level[fresh][:, None]
+                d = depth[active[fresh]][:, None]
+                f = childFlip[node] = flipMove[flip[node]]
+                tw = childTwist[node] = twistMove[twist[node]]
+                sl = childSlice[node] = sliceMove[slice_[node]]
+                dist = np.maximum(flipPrun[N_SLICE1 * f + sl], twistPrun[N_SLICE1 * tw + sl])
+                if twistFlipPrun is not None:
+                    # 0 wherever dist is, so taking it for every child prunes the same nodes as Search
+                    dist = np.maximum(dist, twistFlipPrun[N_FLIP * tw + f])
+                ok = valid[np.where(lv > 0, cursor[np.maximum(node - 1, 0)][:, None] // 3, 6)[:, 0]]
+                self.nodesPhase1 += int(ok.sum())
+                # H-subgroup reached within the last 5 moves: never descend, try phase 2 at the last level
+                h = (dist == 0) & (lv >= d - 5)
+                phase2[node] = candidates = ok & h & (lv == d - 1)
+                visit[node] = candidates | (ok & ~h & (d - lv > dist))
+
+            # the next child to visit of every lane
+            todo = visit[at] & (moves > cursor[at][:, None])
+            found = todo.any(axis=1)
+            mv = todo.argmax(axis=1)
+            cursor[at[found]] = mv[found]
+
+            retired = []
+            attempt = found & phase2[at, mv]
+            for j in np.flatnonzero(attempt).tolist():
+                lane = active[j]
+                i = int(owner[lane])
+                depthPhase1 = int(depth[lane])
+                b = base[lane]
+                s = self.phase2(searches[i], cursor[b:b + depthPhase1].tolist(), depthPhase1)
+                if s >= 0:
+                    results[i] = (s, depthPhase1)
+                    retired.append(lane)
+
+            descend = found & ~attempt
+            parent = at[descend]
+            child = parent + 1
+            flip[child] = childFlip[parent, mv[descend]]
+            twist[child] = childTwist[parent, mv[descend]]
+            slice_[child] = childSlice[parent, mv[descend]]
+            cursor[child] = -1
+            n[active[descend]] += 1
+
+            # all children visited: back to the parent, or one level deeper from the root
+            done = active[~found]
+            root = done[n[done] == 0]
+            n[done[n[done] > 0]] -= 1
+            if root.size:
+                depth[root] += 1
+                cursor[base[root]] = -1
+                for lane in root.tolist():
+                    if depth[lane] > self.maxDepth:
+                        results[owner[lane]] = (-7, 0)
+                        retired.append(lane)
+            if retired:
+                load(retired)
+                active = np.flatnonzero(owner >= 0)
+        return results
+
+    def finish(self, search, moves, flips, twists, slices, n, depthPhase1, tStart):
+        """Continue the phase-1 search of one lane, given as lists, in plain Python. @return like search()"""
+        flipMove = CoordCube.flipMove
+        twistMove = CoordCube.twistMove
+        FRtoBR_Move = CoordCube.FRtoBR_Move
+        Slice_Flip_Prun = CoordCube.Slice_Flip_Prun
+        Slice_Twist_Prun = CoordCube.Slice_Twist_Prun
+        Twist_Flip_Prun = CoordCube.Twist_Flip_Prun if Search.twistFlipPruning else None
+        N_SLICE1 = CoordCube.N_SLICE1
+        N_FLIP = CoordCube.N_FLIP
+
+        while True:
+            mv = moves[n]
+            if mv == EXHAUSTED:
+                if self.cancelled or time.time() - tStart > self.timeOut:
+                    return -8, 0
+                if n == 0:
+                    depthPhase1 += 1
+                    if depthPhase1 > self.maxDepth:
+                        return -7, 0
+                    moves[0] = FIRST[6]
+                else:
+                    n -= 1
+                    moves[n] = FOLLOWING[moves[n - 1] // 3 if n > 0 else 6][moves[n]]
+                continue
+
+            self.nodesPhase1 += 1
+            newFlip = flipMove[flips[n]][mv]
+            newTwist = twistMove[twists[n]][mv]
+            newSlice = FRtoBR_Move[slices[n] * 24][mv] // 24
+            dist = max(getPruning(Slice_Flip_Prun, N_SLICE1 * newFlip + newSlice),
+                       getPruning(Slice_Twist_Prun, N_SLICE1 * newTwist + newSlice))
+            if Twist_Flip_Prun is not None and 0 < dist < depthPhase1 - n:
+                dist = max(dist, getPruning(Twist_Flip_Prun, N_FLIP * newTwist + newFlip))
+            if dist == 0 and n >= depthPhase1 - 5:
+                dist = 10
+                if n == depthPhase1 - 1:
+                    s = self.phase2(search, moves, depthPhase1)
+                    if s >= 0:
+                        return s, depthPhase1
+            if depthPhase1 - n > dist:
+                n += 1
+                flips[n] = newFlip
+                twists[n] = newTwist
+                slices[n] = newSlice
+                moves[n] = FIRST[mv // 3]
+            else:
+                moves[n] = FOLLOWING[moves[n - 1] // 3 if n > 0 else 6][mv]
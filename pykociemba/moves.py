@@ -0,0 +1,32 @@
+"""
+The canonical move sequences of the search, as a state machine.
+
+Moves 0..17 are 3 * axis + power - 1 with the axes U, R, F, D, L, B. Two moves in a row on the same axis are one move
+or none, and moves on opposite axes commute, so of U D and D U only U D is canonical: after a move on axis a >= 3 the
+opposite axis a - 3 is skipped. In the face turn metric no other moves commute, so these are exactly the sequences
+without a shorter or earlier equivalent; U D U, for instance, is not one of them since U does not follow D.
+
+The state of the machine is the axis of the previous move, START before the first one. SUCCESSORS[state] are the
+moves allowed in that state, in ascending order, and a move mv leads to the state AXIS[mv]. PHASE2_SUCCESSORS is the
+same machine restricted to the phase-2 moves U, D, R2, F2, L2 and B2.
+"""
+
+START = 6
+
+AXIS = tuple(mv // 3 for mv in range(18))
+POWER = tuple(mv % 3 + 1 for mv in range(18))
+
+PHASE2_MOVES = tuple(mv for mv in range(18) if AXIS[mv] in (0, 3) or POWER[mv] == 2)
+# The column of a move in the phase-2 move tables of CoordCube, -1 for the moves not allowed in phase 2
+PHASE2_INDEX = tuple(PHASE2_MOVES.index(mv) if mv in PHASE2_MOVES else -1 for mv in range(18))
+
+
+def _successors(moves):
+    return tuple(
+        tuple(mv for mv in moves if prev == START or (AXIS[mv] != prev and AXIS[mv] != prev - 3))
+        for prev in range(START + 1)
+    )
+
+
+SUCCESSORS = _successors(range(18))
+PHASE2_SUCCESSORS = _successors(PHASE2_MOVES)
@@ -0,0 +1,95 @@
+import cProfile
+import glob
+import logging
+import os
+import random
+import re
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+
+class SamplingProfiler(object):
+    """
+    Profiles a sample of solver calls with cProfile and writes the stats to a directory.
+
+    A call is profiled when it is picked by sample_rate, or when it runs for at least slow_ms milliseconds. Slow calls
+    are only known to be slow once they have finished, so they are run a second time under the profiler in a
+    background thread; this is fine because solving is deterministic. Each file is named after the time, the reason
+    it was taken and the tag (the cube definition string, with anything but letters, digits, '.', '-' and '_'
+    replaced), and only the newest max_files files are kept. A file that cannot be written is logged and skipped, it
+    never fails the call.
+
+    One lock serializes the profiled calls: a call picked while another one is profiled runs without the profiler.
+    cProfile can only be active once per process, and from Python 3.12 on it hooks into sys.monitoring, which sees
+    every thread: a profile can contain the frames of other calls running at the same time.
+    """
+
+    def __init__(self, directory, sample_rate=0.01, slow_ms=None, max_files=100):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.max_files = max_files
+        # held while a call is profiled, see the class docstring
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def call(self, tag, func, *args):
+        """Call func(*args) and return its result, profiling it if it is sampled or slow."""
+        if self.sample_rate and random.random() < self.sample_rate and self._lock.acquire(blocking=False):
+            try:
+                start = time.perf_counter()
+                profile = cProfile.Profile()
+                result = profile.runcall(func, *args)
+                self._dump(profile, 'sampled', tag, (time.perf_counter() - start) * 1000)
+                return result
+            finally:
+                self._lock.release()
+
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = (time.perf_counter() - start) * 1000
+        if self.slow_ms is not None and elapsed >= self.slow_ms and self._lock.acquire(blocking=False):
+            threading.Thread(target=self._profile_again, args=(tag, elapsed, func, args), daemon=True).start()
+        return result
+
+    def _profile_again(self, tag, elapsed, func, args):
+        try:
+            profile = cProfile.Profile()
+            profile.runcall(func, *args)
+            self._dump(profile, 'slow', tag, elapsed)
+        except Exception:
+            log.exception('could not profile slow call for %s', tag)
+        finally:
+            self._lock.release()
+
+    def _dump(self, profile, reason, tag, elapsed):
+        tag = re.sub(r'[^\w.-]', '_', str(tag))[:64].lstrip('.')
+        name = '%s-%s-%s-%dms.pstats' % (time.strftime('%Y%m%dT%H%M%S'), reason, tag, elapsed)
+        try:
+            profile.dump_stats(os.path.join(self.directory, name))
+            self._rotate()
+        except OSError as e:
+            log.warning('could not write profile %s: %s', name, e)
+
+    def _rotate(self):
+        files = sorted(glob.glob(os.path.join(self.directory, '*.pstats')), key=os.path.getmtime)
+        for path in files[:max(0, len(files) - self.max_files)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+_profiler = None
+
+
+def set_profiler(profiler):
+    """Install the SamplingProfiler used by pykociemba.solve(). Pass None to switch profiling off."""
+    global _profiler
+    _profiler = profiler
+
+
+def get_profiler():
+    return _profiler
@@ -0,0 +1,171 @@
+"""
+Uniformly random cube states in bulk, with NumPy.
+
+random_states(count, seed) draws count states at once and returns the same states for the same seed, count and subset.
+Every permutation is drawn as its Lehmer code, one uniform digit per position, and unranked for all states together.
+The parity of the edges is not left to chance and rejected, but set by the one digit that decides it, so that it
+matches the corners; likewise the orientation of the last piece makes the twist and the flip valid. A subset leaves
+the pieces outside of it solved, e.g. 'last_layer' only permutes and orients the U-layer corners and edges.
+
+The states come as facelet strings, as arrays (cp, co, ep, eo) of shape (count, 8) and (count, 12) like the fields of a
+CubieCube, or packed into two integers per state: the Lehmer rank of the corner permutation * 3^7 + the twist, and the
+Lehmer rank of the edge permutation * 2^11 + the flip (twist and flip as in CubieCube.getTwist and getFlip).
+unpack_states() turns the packed form back into arrays.
+"""
+from math import factorial
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .color import color_keys
+from .corner import URF, UFL, ULB, UBR
+from .edge import UR, UF, UL, UB
+from .facecube import FaceCube
+
+# The corner and edge positions whose pieces a subset moves
+SUBSETS = {
+    'all': (tuple(range(8)), tuple(range(12))),
+    'last_layer': ((URF, UFL, ULB, UBR), (UR, UF, UL, UB)),
+}
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError('random_states requires numpy')
+
+
+def unrank(digits):
+    """The permutations of range(n) with the Lehmer codes digits, an array of shape (count, n)."""
+    count, n = digits.shape
+    perm = np.empty((count, n), dtype=np.int8)
+    # from the right: each digit is the value among the elements from its position on, which shifts the larger ones up
+    for i in range(n - 1, -1, -1):
+        perm[:, i] = digits[:, i]
+        later = perm[:, i + 1:]
+        later += later >= perm[:, i:i + 1]
+    return perm
+
+
+def rank(perm):
+    """The Lehmer ranks of the permutations perm, an array of shape (count, n)."""
+    n = perm.shape[1]
+    total = np.zeros(len(perm), dtype=np.uint64)
+    for i in range(n - 1):
+        smaller = (perm[:, i + 1:] < perm[:, i:i + 1]).sum(axis=1, dtype=np.uint64)
+        total += smaller * np.uint64(factorial(n - 1 - i))
+    return total
+
+
+def _digits(rng, count, n):
+    # digit i is uniform in range(n - i); scaling uniform doubles is exact up to a bias of the order of 2^-53
+    return (rng.random((count, n)) * np.arange(n, 0, -1)).astype(np.int8)
+
+
+def _orientations(rng, count, free, n, modulus):
+    ori = np.zeros((count, n), dtype=np.int8)
+    if len(free) > 1:
+        drawn = rng.integers(0, modulus, size=(count, len(free) - 1), dtype=np.int8)
+        ori[:, free[:-1]] = drawn
+        ori[:, free[-1]] = -drawn.sum(axis=1, dtype=np.int64) % modulus
+    return ori
+
+
+def _permutation(digits, free, n):
+    if len(free) == n:
+        return unrank(digits)
+    perm = np.tile(np.arange(n, dtype=np.int8), (len(digits), 1))
+    if len(free) > 1:
+        positions = np.array(free, dtype=np.int8)
+        perm[:, positions] = positions[unrank(digits)]
+    return perm
+
+
+def random_arrays(count, seed=None, subset='all'):
+    """count random states of subset as arrays (cp, co, ep, eo), see the module docstring."""
+    _require_numpy()
+    corners, edges = SUBSETS[subset]
+    rng = np.random.default_rng(seed)
+    cornerDigits = _digits(rng, count, len(corners))
+    edgeDigits = _digits(rng, count, len(edges))
+    # the digit of the second to last position (0 or 1) decides the parity of a permutation
+    if len(edges) > 1:
+        edgeDigits[:, -2] = 0
+        edgeDigits[:, -2] = (cornerDigits.sum(axis=1, dtype=np.int64) + edgeDigits.sum(axis=1, dtype=np.int64)) % 2
+    elif len(corners) > 1:
+        cornerDigits[:, -2] = 0
+        cornerDigits[:, -2] = cornerDigits.sum(axis=1, dtype=np.int64) % 2
+    co = _orientations(rng, count, corners, 8, 3)
+    eo = _orientations(rng, count, edges, 12, 2)
+    return _permutation(cornerDigits, corners, 8), co, _permutation(edgeDigits, edges, 12), eo
+
+
+def pack_states(cp, co, ep, eo):
+    """The packed form of the states given as arrays, an array of shape (count, 2), see the module docstring."""
+    _require_numpy()
+    twist = co[:, :7].astype(np.uint64) @ (3 ** np.arange(6, -1, -1, dtype=np.uint64))
+    flip = eo[:, :11].astype(np.uint64) @ (2 ** np.arange(10, -1, -1, dtype=np.uint64))
+    return np.stack([rank(cp) * np.uint64(2187) + twist, rank(ep) * np.uint64(2048) + flip], axis=1)
+
+
+def unpack_states(packed):
+    """The states packed by pack_states() as arrays (cp, co, ep, eo)."""
+    _require_numpy()
+    packed = np.asarray(packed, dtype=np.uint64)
+    count = len(packed)
+
+    def digits(values, base, n):
+        out = np.empty((count, n), dtype=np.int64)
+        for i in range(n - 1, -1, -1):
+            out[:, i] = values % base[i]
+            values = values // base[i]
+        return out
+
+    corners, edges = packed[:, 0], packed[:, 1]
+    co = np.zeros((count, 8), dtype=np.int8)
+    co[:, :7] = digits(corners % np.uint64(2187), [3] * 7, 7)
+    co[:, 7] = -co[:, :7].sum(axis=1, dtype=np.int64) % 3
+    eo = np.zeros((count, 12), dtype=np.int8)
+    eo[:, :11] = digits(edges % np.uint64(2048), [2] * 11, 11)
+    eo[:, 11] = eo[:, :11].sum(axis=1, dtype=np.int64) % 2
+    cp = unrank(digits(corners // np.uint64(2187), list(range(8, 0, -1)), 8))
+    ep = unrank(digits(edges // np.uint64(2048), list(range(12, 0, -1)), 12))
+    return cp, co, ep, eo
+
+
+def _stickers(facelet, color, modulus):
+    # stickers[piece * modulus + ori] are the letters on the facelets facelet[position] of a piece with orientation ori
+    return np.array([[ord(color_keys[color[piece][(k - ori) % modulus]]) for k in range(modulus)]
+                     for piece in range(len(color)) for ori in range(modulus)], dtype=np.uint8)
+
+
+def facelets(cp, co, ep, eo):
+    """The facelet strings of the states given as arrays, as CubieCube.toFaceCube().to_String() gives them."""
+    _require_numpy()
+    count = len(cp)
+    corners = np.take(_stickers(FaceCube.cornerFacelet, FaceCube.cornerColor, 3), (cp * 3 + co).astype(np.intp), axis=0)
+    edges = np.take(_stickers(FaceCube.edgeFacelet, FaceCube.edgeColor, 2), (ep * 2 + eo).astype(np.intp), axis=0)
+    centers = np.tile(np.frombuffer(''.join(color_keys).encode(), dtype=np.uint8), (count, 1))
+    # the columns of the stickers in facelet order
+    order = np.argsort(np.concatenate([np.ravel(FaceCube.cornerFacelet), np.ravel(FaceCube.edgeFacelet),
+                                       np.arange(4, 54, 9)]))
+    f = np.take(np.concatenate([corners.reshape(count, 24), edges.reshape(count, 24), centers], axis=1), order, axis=1)
+    data = f.tobytes().decode()
+    return [data[k:k + 54] for k in range(0, 54 * count, 54)]
+
+
+def random_states(count, seed=None, subset='all', output='facelets'):
+    """
+    count uniformly random states of subset ('all' or 'last_layer'), reproducible with seed, as a list of facelet
+    strings (output='facelets'), arrays (cp, co, ep, eo) (output='arrays') or a (count, 2) array of packed integers
+    (output='packed'). Requires numpy.
+    """
+    if output not in ('facelets', 'arrays', 'packed'):
+        raise ValueError('output must be facelets, arrays or packed, not %r' % output)
+    arrays = random_arrays(count, seed, subset)
+    if output == 'arrays':
+        return arrays
+    if output == 'packed':
+        return pack_states(*arrays)
+    return facelets(*arrays)
@@ -0,0 +1,123 @@
+"""
+A pool of random-state scrambles, filled in the background.
+
+A random-state scramble is the inverse of a solution of a random cube from tools.randomCube(), so every state of the
+cube space is equally likely, unlike a random sequence of face turns. Generating one takes a full solve, so a refill
+thread keeps up to size of them ready (generated in the thread itself, or on a pool of processes), and get() hands one
+out at once. With a path, the pool is kept in that file, one scramble per line, and survives a restart; a scramble is
+removed from the file as it is handed out.
+"""
+import collections
+import os
+import random
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from .coordcube import write_atomically
+from .search import Search
+from .tools import randomCube
+
+
+def invert(moves):
+    """The inverse of a list of moves in face turn notation."""
+    return [move if move.endswith('2') else move.rstrip("'") if move.endswith("'") else move + "'"
+            for move in reversed(moves)]
+
+
+def random_state_scramble(min_length=0, max_depth=24, timeout=10, rng=None):
+    """
+    A scramble, as a list of moves, that leads to a uniformly random state whose solution has at least min_length
+    moves. rng defaults to a freshly seeded random.Random, so forked processes do not repeat each other.
+    """
+    rng = rng or random.Random()
+    while True:
+        solution = Search().solution(randomCube(rng), max_depth, timeout, False)
+        if not solution.startswith('Error'):
+            moves = solution.split()
+            if len(moves) >= min_length:
+                return invert(moves)
+
+
+class ScramblePool(object):
+    """Random-state scrambles generated ahead of time, see the module docstring. Thread-safe."""
+
+    def __init__(self, size=20, min_length=0, path=None, processes=0, max_depth=24, timeout=10):
+        self.size = size
+        self.min_length = min_length
+        self.path = path
+        self.processes = processes
+        self.max_depth = max_depth
+        self.timeout = timeout
+        self.scrambles = collections.deque()
+        self.changed = threading.Condition()
+        self.closed = False
+        self.thread = None
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self.scrambles.extend(line.split() for line in f if line.strip())
+
+    def start(self):
+        """Start the refill thread, once."""
+        with self.changed:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.refill, name='scramble-pool', daemon=True)
+                self.thread.start()
+        return self
+
+    def get(self, timeout=None):
+        """A scramble as a list of moves, waiting up to timeout seconds for one if the pool is empty, else None."""
+        with self.changed:
+            if not self.changed.wait_for(lambda: self.scrambles, timeout):
+                return None
+            scramble = self.scrambles.popleft()
+            self.changed.notify_all()
+        # so that a restart does not hand it out again
+        self.save()
+        return scramble
+
+    def __len__(self):
+        return len(self.scrambles)
+
+    def refill(self):
+        executor = ProcessPoolExecutor(self.processes) if self.processes else None
+        try:
+            while True:
+                with self.changed:
+                    self.changed.wait_for(lambda: self.closed or len(self.scrambles) < self.size)
+                    if self.closed:
+                        return
+                    missing = self.size - len(self.scrambles)
+                args = (self.min_length, self.max_depth, self.timeout)
+                if executor is not None:
+                    scrambles = list(executor.map(random_state_scramble, *[[arg] * missing for arg in args]))
+                else:
+                    scrambles = [random_state_scramble(*args)]
+                with self.changed:
+                    self.scrambles.extend(scrambles)
+                    self.changed.notify_all()
+                self.save()
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+    def save(self):
+        """Write the pool to its path, if it has one."""
+        if self.path:
+            with self.changed:
+                lines = ''.join(' '.join(scramble) + '\n' for scramble in self.scrambles)
+            write_atomically(self.path, lambda f: f.write(lines.encode()))
+
+    def close(self):
+        """Stop the refill thread and save the pool."""
+        with self.changed:
+            self.closed = True
+            self.changed.notify_all()
+        if self.thread is not None:
+            self.thread.join()
+        self.save()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
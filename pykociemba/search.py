@@ -1,15 +1,32 @@
 import time
 from builtins import range
+from contextlib import contextmanager
+from functools import lru_cache
 from .color import colors
 from .facecube import FaceCube
-from .coordcube import CoordCube, getPruning
+from .coordcube import CoordCube, getPruning, tables_digest
 from .cubiecube import CubieCube
+from .moves import AXIS, PHASE2_INDEX, PHASE2_SUCCESSORS, POWER, START, SUCCESSORS
+from .tracing import get_tracer
+from .version import SOLVER_VERSION
+
+def solver_version():
+    """The version of the solver and its tables: the same version finds the same solutions for the same input."""
+    return '%d-%s' % (SOLVER_VERSION, tables_digest()[:16])
 
 class Search(object):
     """Class Search implements the Two-Phase-Algorithm."""
 
-    ax_to_s = ["U", "R", "F", "D", "L", "B"]
-    po_to_s = [None, "", "2", "'"]
+    ax_to_s = ("U", "R", "F", "D", "L", "B")
+    po_to_s = (None, "", "2", "'")
+
+    # Also bound the phase 1 distance by Twist_Flip_Prun. It prunes more nodes and finds the same solutions; set it to
+    # False on the class or an instance to compare.
+    twistFlipPruning = True
+
+    # An endgame.EndgameTable with the exact distances of the phase 2 cubes near solved, e.g. endgame_table(). With it,
+    # the last levels of phase 2 are looked up instead of searched, for the same solutions; None searches them.
+    endgame = None
 
     def __init__(self):
         self.ax              = [0] * 31  # The axis of the move
@@ -25,6 +42,26 @@ class Search(object):
         self.URtoDF          = [0] * 31
         self.minDistPhase1   = [0] * 31  # IDA* distance do goal estimations
         self.minDistPhase2   = [0] * 31
+        self.timings         = {}        # milliseconds spent in each stage of the last solution() call
+        self.phase2Time      = 0.0       # seconds spent in totalDepth during the last search() call
+        self.phase2Calls     = 0
+        self.nodesPhase1     = 0         # search nodes generated during the last search() call
+        self.nodesPhase2     = 0
+        self.cancelled       = False     # set by cancel() from another thread
+        # All state of a search lives in these per-instance arrays and the tables on CoordCube are read-only, so
+        # one Search per thread can run concurrently.
+
+    def cancel(self):
+        """Stop a running search from another thread; it returns as if it had timed out."""
+        self.cancelled = True
+
+    @contextmanager
+    def _stage(self, name):
+        """Time a stage of solution() and emit it as a tracing span."""
+        t = time.perf_counter()
+        with get_tracer().span(name) as span:
+            yield span
+        self.timings[name] = self.timings.get(name, 0.0) + (time.perf_counter() - t) * 1000
 
     def solutionToString(self, length, depthPhase1=None):
         """generate the solution string from the array data"""
@@ -35,7 +72,7 @@ class Search(object):
             s += self.po_to_s[self.po[i]]
             if i < length - 1:
                 s += " "
-            if depthPhase1 is not None and i == depthPhase1 - 1:
+            if depthPhase1 is not None and i == depthPhase1 - 1 and i < length - 1:
                 s += ". "
         return s
 
@@ -69,30 +106,114 @@ class Search(object):
                 Error 8: Timeout, no solution within given time
         """
 
+        self.timings = {}
+        with get_tracer().span('solve'):
+            c = self.prepare(facelets)
+            if not isinstance(c, CoordCube):
+                return c
+            return self._solve(c, maxDepth, timeOut, useSeparator)
+
+    def solve_cubie(self, cc, maxDepth, timeOut, useSeparator):
+        """Computes the solver string for the CubieCube cc like solution(), without going through facelets."""
+        self.timings = {}
+        with get_tracer().span('solve'):
+            c = self.prepareCubie(cc)
+            if not isinstance(c, CoordCube):
+                return c
+            return self._solve(c, maxDepth, timeOut, useSeparator)
+
+    def solve_coords(self, c, maxDepth, timeOut, useSeparator):
+        """Computes the solver string for the CoordCube c like solution(). c must come from a valid cube."""
+        self.timings = {}
+        with get_tracer().span('solve'):
+            return self._solve(c, maxDepth, timeOut, useSeparator)
+
+    def _solve(self, c, maxDepth, timeOut, useSeparator):
+        with self._stage('search') as span:
+            s, depthPhase1 = self.search(c, maxDepth, timeOut)
+            span.set_attribute('phase2_calls', self.phase2Calls)
+            span.set_attribute('nodes', self.nodesPhase1 + self.nodesPhase2)
+        self.timings['phase2'] = self.phase2Time * 1000
+        self.timings['phase1'] = self.timings.pop('search') - self.timings['phase2']
+        if s < 0:
+            return "Error %s" % abs(s)
+
+        with self._stage('format'):
+            return self.solutionToString(s, depthPhase1) if useSeparator else self.solutionToString(s)
+
+    def solutions(self, facelets, maxDepth, timeOut, useSeparator):
+        """
+        Generate ever shorter solutions for a given cube, with the arguments of solution(). The first one is the
+        solution() result; for the next one the search resumes where it stopped, with maxDepth lowered to one move
+        less. The generator ends when no shorter solution exists or the time is up. If there is no solution at all,
+        it generates just the error code, as solution() returns it.
+        """
+        self.timings = {}
+        c = self.prepare(facelets)
+        if not isinstance(c, CoordCube):
+            yield c
+            return
+        found = False
+        for s, depthPhase1 in self.phase1(c, maxDepth, timeOut):
+            if s < 0:
+                if not found:
+                    yield "Error %s" % abs(s)
+                return
+            found = True
+            yield self.solutionToString(s, depthPhase1) if useSeparator else self.solutionToString(s)
+
+    def prepare(self, facelets):
+        """Check the cube definition string and return its CoordCube, or the error code string."""
         # +++++++++++++++++++++check for wrong input +++++++++++++++++++++++++++++
-        count = [0] * 6
-        try:
-            for i in range(54):
-                assert facelets[i] in colors
-                count[colors[facelets[i]]] += 1
-        except Exception:
-            return "Error 1"
-
-        for i in range(6):
-            if count[i] != 9:
+        with self._stage('validate'):
+            count = [0] * 6
+            try:
+                for i in range(54):
+                    assert facelets[i] in colors
+                    count[colors[facelets[i]]] += 1
+            except Exception:
                 return "Error 1"
 
-        fc = FaceCube(facelets)
-        cc = fc.toCubieCube()
-        s = cc.verify()
+            for i in range(6):
+                if count[i] != 9:
+                    return "Error 1"
+
+        with self._stage('facecube'):
+            fc = FaceCube(facelets)
+        with self._stage('cubiecube'):
+            cc = fc.toCubieCube()
+        return self.prepareCubie(cc)
+
+    def prepareCubie(self, cc):
+        """Check the CubieCube cc and return its CoordCube, or the error code string."""
+        with self._stage('validate'):
+            s = cc.verify()
         if s != 0:
             return "Error %s" % abs(s)
 
         # +++++++++++++++++++++++ initialization +++++++++++++++++++++++++++++++++
-        c = CoordCube(cc)
+        with self._stage('coordcube'):
+            return CoordCube(cc)
+
+    def search(self, c, maxDepth, timeOut):
+        """
+        Run the two phases on the CoordCube c and leave the maneuver in ax and po.
 
-        self.po[0] = 0
-        self.ax[0] = 0
+        @return (length, depthPhase1) of the solution, or a negative error code (-7, -8, see solution()) as length
+        """
+        return next(self.phase1(c, maxDepth, timeOut))
+
+    def phase1(self, c, maxDepth, timeOut):
+        """
+        Generate (length, depthPhase1) for every solution search() finds for the CoordCube c, each time leaving the
+        maneuver in ax and po and continuing with maxDepth one below the length, so that every solution is shorter than
+        the one before. The last item is a negative error code (-7: no shorter solution, -8: timeout) as length.
+        """
+
+        self.phase2Time = 0.0
+        self.phase2Calls = 0
+        self.nodesPhase1 = 0
+        self.nodesPhase2 = 0
         self.flip[0] = c.flip
         self.twist[0] = c.twist
         self.parity[0] = c.parity
@@ -102,64 +223,36 @@ class Search(object):
         self.URtoUL[0] = c.URtoUL
         self.UBtoDF[0] = c.UBtoDF
 
-        self.minDistPhase1[1] = 1   # else failure for depth=1, n=0
-        mv = 0
         n = 0
-        busy = False
         depthPhase1 = 1
+        moves = [iter(SUCCESSORS[START])] + [None] * 30   # the canonical moves still to try on each level
 
         tStart = time.time()
 
         # +++++++++++++++++++ Main loop ++++++++++++++++++++++++++++++++++++++++++
         while True:
-            while True:
-                if depthPhase1 - n > self.minDistPhase1[n + 1] and not busy:
-                    if self.ax[n] == 0 or self.ax[n] == 3:   # Initialize next move
-                        n += 1
-                        self.ax[n] = 1
-                    else:
-                        n += 1
-                        self.ax[n] = 0
-                    self.po[n] = 1
+            mv = next(moves[n], None)
+            if mv is None:
+                # all moves on level n tried
+                if self.cancelled or time.time() - tStart > timeOut:
+                    yield -8, 0
+                    return
+
+                if n == 0:
+                    if depthPhase1 >= maxDepth:
+                        yield -7, 0
+                        return
+                    depthPhase1 += 1
+                    moves[0] = iter(SUCCESSORS[START])
                 else:
-                    self.po[n] += 1
-                    if self.po[n] > 3:
-                        while True:
-                            # increment axis
-                            self.ax[n] += 1
-                            if self.ax[n] > 5:
-
-                                if time.time() - tStart > timeOut:
-                                    return "Error 8"
-
-                                if n == 0:
-                                    if depthPhase1 >= maxDepth:
-                                        return "Error 7"
-                                    else:
-                                        depthPhase1 += 1
-                                        self.ax[n] = 0
-                                        self.po[n] = 1
-                                        busy = False
-                                        break
-                                else:
-                                    n -= 1
-                                    busy = True
-                                    break
-
-                            else:
-                                self.po[n] = 1
-                                busy = False
-
-                            if not (n != 0 and (self.ax[n - 1] == self.ax[n] or self.ax[n - 1] - 3 == self.ax[n])):
-                                break
-                    else:
-                        busy = False
-                if not busy:
-                    break
+                    n -= 1
+                continue
+            self.ax[n] = AXIS[mv]
+            self.po[n] = POWER[mv]
 
             # +++++++++++++ compute new coordinates and new minDistPhase1 ++++++++++
             # if minDistPhase1 =0, the H subgroup is reached
-            mv = 3 * self.ax[n] + self.po[n] - 1
+            self.nodesPhase1 += 1
             self.flip[n + 1] = CoordCube.flipMove[self.flip[n]][mv]
             self.twist[n + 1] = CoordCube.twistMove[self.twist[n]][mv]
             self.slice[n + 1] = CoordCube.FRtoBR_Move[self.slice[n] * 24][mv] // 24
@@ -173,18 +266,32 @@ class Search(object):
                     CoordCube.N_SLICE1 * self.twist[n + 1] + self.slice[n + 1]
                 )
             )
+            # the third table only matters if the node is not pruned anyway
+            if self.twistFlipPruning and 0 < self.minDistPhase1[n + 1] < depthPhase1 - n:
+                self.minDistPhase1[n + 1] = max(
+                    self.minDistPhase1[n + 1],
+                    getPruning(CoordCube.Twist_Flip_Prun, CoordCube.N_FLIP * self.twist[n + 1] + self.flip[n + 1])
+                )
             # ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
             if self.minDistPhase1[n + 1] == 0 and n >= depthPhase1 - 5:
                 self.minDistPhase1[n + 1] = 10  # instead of 10 any value >5 is possible
                 if n == depthPhase1 - 1:
+                    t = time.perf_counter()
                     s = self.totalDepth(depthPhase1, maxDepth)
+                    self.phase2Time += time.perf_counter() - t
+                    self.phase2Calls += 1
                     if s >= 0:
                         if (s == depthPhase1
                             or (
                                 self.ax[depthPhase1 - 1] != self.ax[depthPhase1]
                                 and self.ax[depthPhase1 - 1] != self.ax[depthPhase1] + 3)):
-                            return self.solutionToString(s, depthPhase1) if useSeparator else self.solutionToString(s)
+                            yield s, depthPhase1
+                            maxDepth = s - 1
+
+            if depthPhase1 - n > self.minDistPhase1[n + 1]:
+                n += 1
+                moves[n] = iter(SUCCESSORS[AXIS[mv]])
 
     def totalDepth(self, depthPhase1, maxDepth):
         """
@@ -230,73 +337,45 @@ class Search(object):
         # now set up search
 
         depthPhase2 = 1
+        endgame = self.endgame
+        if endgame is not None:
+            d = endgame.distance(self.URFtoDLF[depthPhase1], self.URtoDF[depthPhase1], self.FRtoBR[depthPhase1],
+                                 self.parity[depthPhase1])
+            if d is not None:
+                if d > maxDepthPhase2:
+                    return -1
+                self.followEndgame(depthPhase1, depthPhase1, d)
+                return depthPhase1 + d
+            # the cube is further from solved than the table reaches
+            depthPhase2 = endgame.depth + 1
+            if depthPhase2 > maxDepthPhase2:
+                return -1
         n = depthPhase1
-        busy = False
-        self.po[depthPhase1] = 0
-        self.ax[depthPhase1] = 0
-        self.minDistPhase2[n + 1] = 1   # else failure for depthPhase2=1, n=0
+        moves = [None] * 31   # the canonical phase2 moves still to try on each level
+        moves[n] = iter(PHASE2_SUCCESSORS[START])
         # +++++++++++++++++++ end initialization +++++++++++++++++++++++++++++++++
 
         while True:
-            while True:
-                if depthPhase1 + depthPhase2 - n > self.minDistPhase2[n + 1] and not busy:
-
-                    if self.ax[n] == 0 or self.ax[n] == 3:    # Initialize next move
-                        n += 1
-                        self.ax[n] = 1
-                        self.po[n] = 2
-                    else:
-                        n += 1
-                        self.ax[n] = 0
-                        self.po[n] = 1
+            mv = next(moves[n], None)
+            if mv is None:
+                if n == depthPhase1:
+                    if depthPhase2 >= maxDepthPhase2:
+                        return -1
+                    depthPhase2 += 1
+                    moves[n] = iter(PHASE2_SUCCESSORS[START])
                 else:
-                    if self.ax[n] == 0 or self.ax[n] == 3:
-                        self.po[n] += 1
-                        _ = (self.po[n] > 3)
-                    else:
-                        self.po[n] += 2
-                        _ = (self.po[n] > 3)
-                    if _:
-                        while True:
-                            # increment axis
-                            self.ax[n] += 1
-                            if self.ax[n] > 5:
-                                if n == depthPhase1:
-                                    if depthPhase2 >= maxDepthPhase2:
-                                        return -1
-                                    else:
-                                        depthPhase2 += 1
-                                        self.ax[n] = 0
-                                        self.po[n] = 1
-                                        busy = False
-                                        break
-                                else:
-                                    n -= 1
-                                    busy = True
-                                    break
-                            else:
-                                if self.ax[n] == 0 or self.ax[n] == 3:
-                                    self.po[n] = 1
-                                else:
-                                    self.po[n] = 2
-                                busy = False
-
-                            if not (n != depthPhase1 and (self.ax[n - 1] == self.ax[n] or self.ax[n - 1] - 3 == self.ax[n])):
-                                break
-
-                    else:
-                        busy = False
-
-                if not busy:
-                    break
+                    n -= 1
+                continue
+            self.ax[n] = AXIS[mv]
+            self.po[n] = POWER[mv]
 
             # +++++++++++++ compute new coordinates and new minDist ++++++++++
-            mv = 3 * self.ax[n] + self.po[n] - 1
-
+            self.nodesPhase2 += 1
+            j = PHASE2_INDEX[mv]    # the column of mv in the phase 2 move tables
             self.URFtoDLF[n + 1] = CoordCube.URFtoDLF_Move[self.URFtoDLF[n]][mv]
-            self.FRtoBR[n + 1] = CoordCube.FRtoBR_Move[self.FRtoBR[n]][mv]
-            self.parity[n + 1] = CoordCube.parityMove[self.parity[n]][mv]
-            self.URtoDF[n + 1] = CoordCube.URtoDF_Move[self.URtoDF[n]][mv]
+            self.FRtoBR[n + 1] = CoordCube.FRtoBR_Move2[self.FRtoBR[n]][j]
+            self.parity[n + 1] = CoordCube.parityMove2[self.parity[n]][j]
+            self.URtoDF[n + 1] = CoordCube.URtoDF_Move2[self.URtoDF[n]][j]
 
             self.minDistPhase2[n + 1] = max(
                 getPruning(
@@ -313,11 +392,55 @@ class Search(object):
             if self.minDistPhase2[n + 1] == 0:
                 break
 
+            left = depthPhase1 + depthPhase2 - n - 1    # the moves left after this one
+            if endgame is not None and self.minDistPhase2[n + 1] <= left <= endgame.depth:
+                d = endgame.distance(self.URFtoDLF[n + 1], self.URtoDF[n + 1], self.FRtoBR[n + 1], self.parity[n + 1])
+                if d is not None and d <= left:
+                    self.followEndgame(depthPhase1, n + 1, d)
+                    return n + 1 + d
+                continue
+
+            if depthPhase1 + depthPhase2 - n > self.minDistPhase2[n + 1]:
+                n += 1
+                moves[n] = iter(PHASE2_SUCCESSORS[AXIS[mv]])
+
         return depthPhase1 + depthPhase2
 
+    def followEndgame(self, depthPhase1, n, d):
+        """
+        Complete the maneuver from level n, d moves from solved by the endgame table, with the first move in search
+        order that is one move closer at every level.
+        """
+        endgame = self.endgame
+        while d > 0:
+            for mv in PHASE2_SUCCESSORS[START if n == depthPhase1 else self.ax[n - 1]]:
+                self.nodesPhase2 += 1
+                j = PHASE2_INDEX[mv]
+                self.URFtoDLF[n + 1] = CoordCube.URFtoDLF_Move[self.URFtoDLF[n]][mv]
+                self.FRtoBR[n + 1] = CoordCube.FRtoBR_Move2[self.FRtoBR[n]][j]
+                self.parity[n + 1] = CoordCube.parityMove2[self.parity[n]][j]
+                self.URtoDF[n + 1] = CoordCube.URtoDF_Move2[self.URtoDF[n]][j]
+                if endgame.distance(self.URFtoDLF[n + 1], self.URtoDF[n + 1], self.FRtoBR[n + 1],
+                                    self.parity[n + 1]) == d - 1:
+                    break
+            self.ax[n] = AXIS[mv]
+            self.po[n] = POWER[mv]
+            n += 1
+            d -= 1
+
+@lru_cache(maxsize=256)
+def inverse_pattern(pattern):
+    """The inverse of the CubieCube of the pattern string, shared by all callers: do not modify it."""
+    inverse = CubieCube()
+    FaceCube(pattern).toCubieCube().invCubieCube(inverse)
+    return inverse
+
+def patternize_cubie(cc, pattern):
+    """The CubieCube whose solution turns the CubieCube cc into the pattern string."""
+    inverse = inverse_pattern(pattern)
+    patternized_cc = CubieCube(inverse.cp, inverse.co, inverse.ep, inverse.eo)
+    patternized_cc.multiply(cc)
+    return patternized_cc
+
 def patternize(facelets, pattern):
-    facelets_cc = FaceCube(facelets).toCubieCube()
-    patternized_cc = CubieCube()
-    FaceCube(pattern).toCubieCube().invCubieCube(patternized_cc)
-    patternized_cc.multiply(facelets_cc)
-    return patternized_cc.toFaceCube().to_String()
+    return patternize_cubie(FaceCube(facelets).toCubieCube(), pattern).toFaceCube().to_String()
@@ -0,0 +1,109 @@
+"""
+Solve on a pool of sub-interpreters, each with its own GIL, inside one process.
+
+Every worker interpreter imports pykociemba with its own sys._xoptions['pykociemba_tables'] (the -X option; the
+environment is shared by the whole process) pointing at the memory-mapped table file (see
+coordcube.export_tables()), so all of them read the same physical copy of the tables instead of unpickling their own,
+and starting one takes tens of milliseconds instead of the full table load. The file is written again if it is missing
+or from another version of the solver or its tables.
+
+The protocol is two cross-interpreter queues shared by all workers. Requests are (seq, cube string, maxDepth, timeOut,
+useSeparator) tuples and None to stop a worker; results are (seq, solution, error) tuples, where solution is what
+Search.solution returns and error the text of an unexpected exception, or None.
+
+Requires Python 3.14 (concurrent.interpreters).
+"""
+import os
+import sys
+import threading
+
+try:
+    from concurrent import interpreters
+except ImportError:
+    interpreters = None
+
+from .coordcube import MMAP_TABLES_PATH, MMAP_TABLES_XOPTION, export_tables, table_file_header, tables_digest
+
+WORKER = '''
+import sys
+sys.path[:] = list(path)
+# per interpreter, unlike os.environ
+sys._xoptions[%r] = tables
+
+from pykociemba.search import Search
+
+while True:
+    request = requests.get()
+    if request is None:
+        break
+    seq, cubestring, maxDepth, timeOut, useSeparator = request
+    try:
+        results.put((seq, Search().solution(cubestring, maxDepth, timeOut, useSeparator), None))
+    except Exception as e:
+        results.put((seq, None, '%%s: %%s' %% (type(e).__name__, e)))
+''' % MMAP_TABLES_XOPTION
+
+
+def current(tables):
+    """Whether the table file tables exists and holds the tables of this solver version, as loaded here."""
+    try:
+        # raises ValueError for a file of another SOLVER_VERSION
+        header = table_file_header(tables)
+    except (IOError, ValueError):
+        return False
+    return header['digest'] == tables_digest()
+
+
+class InterpreterPool(object):
+    """A pool of solver sub-interpreters, see the module docstring. Use it as a context manager or call close()."""
+
+    def __init__(self, workers=None, tables=MMAP_TABLES_PATH):
+        if interpreters is None:
+            raise ImportError('InterpreterPool requires Python 3.14 (concurrent.interpreters)')
+        if not current(tables):
+            export_tables(tables)
+        self.requests = interpreters.create_queue()
+        self.results = interpreters.create_queue()
+        self.lock = threading.Lock()
+        self.seq = 0
+        self.workers = []
+        for _ in range(workers or os.cpu_count() or 1):
+            interp = interpreters.create()
+            interp.prepare_main(requests=self.requests, results=self.results, path=tuple(sys.path),
+                                tables=os.path.abspath(tables))
+            # exec() runs the worker loop in the calling thread, under the worker interpreter's own GIL
+            thread = threading.Thread(target=interp.exec, args=(WORKER,), daemon=True)
+            thread.start()
+            self.workers.append((interp, thread))
+
+    def map(self, cubestrings, maxDepth=24, timeOut=1000, useSeparator=True):
+        """
+        Solve cubestrings on the workers.
+        @return the solutions in input order, as from Search.solution
+        """
+        with self.lock:
+            first = self.seq
+            for cubestring in cubestrings:
+                self.requests.put((self.seq, cubestring, maxDepth, timeOut, useSeparator))
+                self.seq += 1
+            solutions = [None] * (self.seq - first)
+            for _ in range(len(solutions)):
+                seq, solution, error = self.results.get()
+                if error is not None:
+                    raise RuntimeError('solver interpreter failed: %s' % error)
+                solutions[seq - first] = solution
+            return solutions
+
+    def close(self):
+        for _ in self.workers:
+            self.requests.put(None)
+        for interp, thread in self.workers:
+            thread.join()
+            interp.close()
+        self.workers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,34 @@
+"""
+Solve many cubes on a pool of threads.
+
+Every solve runs its own Search and only reads the CoordCube tables, which are frozen when they are loaded, so the
+threads share one copy of the tables and need no locking. On a free-threaded CPython build (python3.13t and later)
+they run in parallel, without the per-worker memory and the pickling of a process pool. With the GIL they take turns,
+and solve_many only helps to overlap solving with I/O.
+"""
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from .search import Search
+
+
+def gil_enabled():
+    """False on a free-threaded build running without the GIL."""
+    is_enabled = getattr(sys, '_is_gil_enabled', None)
+    return True if is_enabled is None else is_enabled()
+
+
+def solve_many(cubestrings, workers=None, max_depth=24, timeout=1000, use_separator=True):
+    """
+    Solve cubestrings on workers threads. By default that is one per core without the GIL, and one with it, where more
+    threads would only take turns on the CPU-bound search.
+    @return the solutions (or error codes, as from Search.solution) in input order
+    """
+    def solve(cubestring):
+        return Search().solution(cubestring, max_depth, timeout, use_separator)
+
+    if not workers:
+        workers = (os.cpu_count() or 1) if not gil_enabled() else 1
+    with ThreadPoolExecutor(workers) as executor:
+        return list(executor.map(solve, cubestrings))
@@ -38,17 +38,18 @@ def verify(s):
     return cc.verify()
 
 
-def randomCube():
+def randomCube(rng=random):
     """
     Generates a random cube.
+    @param rng is the random number generator to draw from, e.g. a seeded random.Random instance
     @return A random cube in the string representation. Each cube of the cube space has the same probability.
     """
     cc = CubieCube()
-    cc.setFlip(random.randint(0, CoordCube.N_FLIP - 1))
-    cc.setTwist(random.randint(0, CoordCube.N_TWIST - 1))
+    cc.setFlip(rng.randint(0, CoordCube.N_FLIP - 1))
+    cc.setTwist(rng.randint(0, CoordCube.N_TWIST - 1))
     while True:
-        cc.setURFtoDLB(random.randint(0, CoordCube.N_URFtoDLB - 1))
-        cc.setURtoBR(random.randint(0, CoordCube.N_URtoBR - 1))
+        cc.setURFtoDLB(rng.randint(0, CoordCube.N_URFtoDLB - 1))
+        cc.setURtoBR(rng.randint(0, CoordCube.N_URtoBR - 1))
 
         if (cc.edgeParity() ^ cc.cornerParity()) == 0:
             break
@@ -76,10 +77,10 @@ def randomLastLayerCube():
     fc = cc.toFaceCube()
     return fc.to_String()
 
-def random_scramble(length=20):
+def random_scramble(length=20, rng=random):
     """
     Generate a random scramble sequence (list of moves as strings).
-    Default length is 20 moves.
+    Default length is 20 moves. rng is the random number generator to draw from.
     """
     moves = ['U', "U'", 'U2', 'R', "R'", 'R2', 'F', "F'", 'F2',
              'D', "D'", 'D2', 'L', "L'", 'L2', 'B', "B'", 'B2']
@@ -88,7 +89,7 @@ def random_scramble(length=20):
     prev_face = None
     for _ in range(length):
         while True:
-            move = random.choice(moves)
+            move = rng.choice(moves)
             face = move[0]
             if face != prev_face:
                 scramble.append(move)
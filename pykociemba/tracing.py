@@ -0,0 +1,39 @@
+from contextlib import contextmanager
+
+
+class Span(object):
+    """A span that records nothing. Tracers hand these out when they do not export anything."""
+
+    def set_attribute(self, key, value):
+        pass
+
+
+_noop_span = Span()
+
+
+class Tracer(object):
+    """
+    Default tracer, it does nothing.
+
+    Subclass it and override span() to export the solver stages to a tracing backend. span() is used as a context
+    manager and must yield an object with a set_attribute(key, value) method. Spans opened while another span is
+    active are its children, so a tracer that keeps track of the current span gets the nesting for free, e.g. an
+    OpenTelemetry tracer can simply return tracer.start_as_current_span(name).
+    """
+
+    @contextmanager
+    def span(self, name):
+        yield _noop_span
+
+
+_tracer = Tracer()
+
+
+def set_tracer(tracer):
+    """Install the tracer used by the solver. Pass None to go back to the no-op default."""
+    global _tracer
+    _tracer = tracer if tracer is not None else Tracer()
+
+
+def get_tracer():
+    return _tracer
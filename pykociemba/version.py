@@ -0,0 +1,3 @@
+# Bump whenever a change to the search can change the solutions it finds. It lives here, not in search.py, so that
+# coordcube can check table files against it while it is being imported.
+SOLVER_VERSION = 2
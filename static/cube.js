@@ -234,37 +234,13 @@ class RubiksCube {
 
             this.updateStatus('Solving cube...', '#2196F3');
 
-            // Step 2: Send the state string to the solver
-            const solveResponse = await fetch('/solve', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ state: stateData.state })
-            });
-
-            const solveData = await solveResponse.json();
+            // Step 2: Stream ever shorter solutions of the state, showing each as it comes in
+            const solveData = await this.streamSolutions(stateData.state);
             const solutionDiv = document.getElementById('solutionString');
 
             if (solveData.solution) {
-                document.getElementById('solveTime').textContent = `${solveData.solve_time} ms`;
-                document.getElementById('solutionLength').textContent = `${solveData.solution_length} moves`;
-                this.renderSolutionChart(solveData.phase1_moves, solveData.phase2_moves);
+                this.showSolution(solveData);
                 this.updateStatus(`Solution Found: ${solveData.solution}`, '#4CAF50');
-
-                // Color phase 1 and phase 2 moves differently
-                const moves = solveData.solution.trim().split(' ').filter(move => move);
-                const phase1 = solveData.phase1_moves || 0;
-                const phase2 = solveData.phase2_moves || 0;
-                let html = '';
-                for (let i = 0; i < moves.length; i++) {
-                    if (i < phase1) {
-                        html += `<span style=\"color:#e53935;font-weight:bold;\">${moves[i]}</span> `; // Nice red
-                    } else {
-                        html += `<span style=\"color:#2196F3;font-weight:bold;\">${moves[i]}</span> `;
-                    }
-                }
-                solutionDiv.innerHTML = `Solution: ${html.trim()}`;
-                solutionDiv.style.display = 'block';
-
                 await this.animateSolution(solveData.solution);
                 this.currentScramble = '';
             } else {
@@ -279,6 +255,67 @@ class RubiksCube {
         this.isAnimating = false;
     }
 
+    // Resolves with the last solution of /solve_stream, or an error payload. Falls back to POST /solve when the
+    // stream cannot be opened, e.g. on the ASGI app.
+    streamSolutions(state) {
+        const solveOnce = async () => {
+            const response = await fetch('/solve', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ state: state })
+            });
+            return response.json();
+        };
+        if (!window.EventSource) {
+            return solveOnce();
+        }
+        return new Promise(resolve => {
+            const source = new EventSource(`/solve_stream?state=${encodeURIComponent(state)}&target=20&timeout=5`);
+            let best = null;
+            const finish = result => {
+                source.close();
+                resolve(result);
+            };
+            source.addEventListener('solution', event => {
+                best = JSON.parse(event.data);
+                this.showSolution(best);
+                this.updateStatus(`Found ${best.solution_length} moves, looking for shorter...`, '#2196F3');
+            });
+            source.addEventListener('done', () => finish(best || { error: 'No solution found' }));
+            source.addEventListener('error', event => {
+                if (event.data) {
+                    finish(best || JSON.parse(event.data));
+                } else if (best) {
+                    finish(best);
+                } else {
+                    source.close();
+                    solveOnce().then(resolve, () => resolve({ error: 'Error connecting to server' }));
+                }
+            });
+        });
+    }
+
+    showSolution(solveData) {
+        document.getElementById('solveTime').textContent = `${solveData.solve_time} ms`;
+        document.getElementById('solutionLength').textContent = `${solveData.solution_length} moves`;
+        this.renderSolutionChart(solveData.phase1_moves, solveData.phase2_moves);
+
+        // Color phase 1 and phase 2 moves differently
+        const solutionDiv = document.getElementById('solutionString');
+        const moves = solveData.solution.trim().split(' ').filter(move => move);
+        const phase1 = solveData.phase1_moves || 0;
+        let html = '';
+        for (let i = 0; i < moves.length; i++) {
+            if (i < phase1) {
+                html += `<span style=\"color:#e53935;font-weight:bold;\">${moves[i]}</span> `; // Nice red
+            } else {
+                html += `<span style=\"color:#2196F3;font-weight:bold;\">${moves[i]}</span> `;
+            }
+        }
+        solutionDiv.innerHTML = `Solution: ${html.trim()}`;
+        solutionDiv.style.display = 'block';
+    }
+
     // --- Animation ---
     async animateSolution(solutionString) {
         const moves = solutionString.trim().split(' ').filter(move => move);
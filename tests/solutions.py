@@ -0,0 +1,27 @@
+"""
+The solutions of a fixed set of cubes, as the baseline Search found them. Every engine and option that claims to find
+the same solutions is pinned to them.
+"""
+
+SOLUTIONS = [
+    ('RURFUBLBULLFFRBBBFDUBUFDBDUDRRUDRFLUFLBRLRLFRDLUDBFLDD',
+     "U2 F' D B D F B D' R' L B . U' B2 U B2 R2 U R2 F2 R2 B2"),
+    ('UDUFUUUBLDLFURDFFFLDBDFBDBDLRRBDRRUUBUBLLFDLFRRRLBFLRB',
+     "R L F L' B2 U2 L' B D B R . U2 D' R2 L2 B2 U' B2 D' R2 U"),
+    ('UUBRULUBRBDLRRFFDDBDDFFULURFLURDRLURFFRLLLBBDUBLDBBFFD',
+     "U F R' D' B R' B L' B' D2 R F' . D' L2 U2 F2 B2 U B2 U' L2 D2"),
+    ('UDLUUDBBRDFDBRFLBBDUFRFRLFFDLULDLUBLBFRLLUFDBFRRRBUUDR',
+     "R2 L2 U B L F' U L2 U2 B2 L' . F2 U R2 F2 D B2 U D2 L2 F2"),
+    ('FRRUUDBFBRRFFRUFDRUDUBFLDDULLLRDBLFDURLBLLBBFDFRLBUBUD',
+     "F2 B2 L F L2 U R L' B' U' F . U2 D2 F2 U2 B2 L2 D' R2 B2 U"),
+    ('RBFDULBRBUBLURFDFRDBLRFLUBLBDBUDLLLFFRRULFFRRDUUDBFDDU',
+     "D2 F' R' D' R2 F2 B U' L . F2 D2 B2 U2 F2 L2 F2 U' F2 R2"),
+    ('DRLUUBFBRBLURRLRUBLRDDFDLFUFUFFDBRDUBRUFLLFDDBFLUBLRBD',
+     "D2 R' D' F2 B D R2 D2 R' . F2 D' F2 U' B2 L2 U2 D R2 U"),
+]
+
+# (cube, maxDepth, solution); the third cube's first solution is longer than 21 moves
+CASES = [(cube, 24, solution) for cube, solution in SOLUTIONS] + [
+    ('UUBRULUBRBDLRRFFDDBDDFFULURFLURDRLURFFRLLLBBDUBLDBBFFD', 21,
+     "R B2 D' B L2 U2 R' B' D' F' R' B' . U' D B2 R2 L2 U' R2 U2 R2"),
+]
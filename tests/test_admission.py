@@ -0,0 +1,76 @@
+import asyncio
+import threading
+
+import pytest
+
+from pykociemba import AdmissionController, Overloaded
+
+
+def test_admit_yields_remaining_budget():
+    admission = AdmissionController(1, 1)
+    with admission.admit(5) as budget:
+        assert 0 < budget <= 5
+        assert admission.pending == 1
+    assert admission.pending == 0
+
+
+def test_admit_rejects_full_queue():
+    admission = AdmissionController(1, 0)
+    with admission.admit(5):
+        with pytest.raises(Overloaded) as e:
+            with admission.admit(5):
+                pass
+    assert e.value.retry_after >= 1
+    assert admission.pending == 0
+
+
+def test_admit_rejects_what_cannot_fit_its_budget():
+    admission = AdmissionController(1, 4, estimate=10.0)
+    with admission.admit(60):
+        with pytest.raises(Overloaded) as e:
+            with admission.admit(1):
+                pass
+    assert e.value.retry_after >= 9
+
+
+def test_admit_times_out_waiting_for_a_slot():
+    admission = AdmissionController(1, 1, estimate=0.1)
+    held = threading.Event()
+    release = threading.Event()
+
+    def hold():
+        with admission.admit(5):
+            held.set()
+            release.wait()
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    held.wait()
+    try:
+        with pytest.raises(Overloaded):
+            with admission.admit(0.2):
+                pass
+    finally:
+        release.set()
+        thread.join()
+    assert admission.pending == 0
+
+
+def test_admit_async():
+    admission = AdmissionController(1, 1)
+
+    async def main():
+        order = []
+
+        async def solve(name, seconds):
+            async with admission.admit_async(5):
+                order.append(name)
+                await asyncio.sleep(seconds)
+
+        await asyncio.gather(solve('first', 0.1), solve('second', 0))
+        with pytest.raises(Overloaded):
+            await asyncio.gather(solve('a', 0.1), solve('b', 0), solve('c', 0))
+        return order
+
+    assert asyncio.run(main())[:2] == ['first', 'second']
+    assert admission.pending == 0
@@ -0,0 +1,172 @@
+import asyncio
+import json
+
+import pytest
+
+import app as web
+import asgi
+import pykociemba
+
+from solutions import SOLUTIONS
+
+STATE, SOLUTION = SOLUTIONS[0]
+
+
+def asgi_request(method, path, query='', body=None, headers=()):
+    """Run one request through the ASGI app: @return the status, the headers and the body."""
+    scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query.encode(),
+             'headers': [(name.encode(), value.encode()) for name, value in headers]}
+    messages = [{'type': 'http.request', 'body': json.dumps(body).encode() if body is not None else b''}]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asgi.app(scope, receive, send))
+    start = sent[0]
+    return (start['status'], {k.decode(): v.decode() for k, v in start['headers']},
+            b''.join(m.get('body', b'') for m in sent[1:]))
+
+
+@pytest.fixture
+def client():
+    return web.app.test_client()
+
+
+@pytest.mark.parametrize('limits', [{'timeout': 'nan'}, {'timeout': 'inf'}, {'timeout': '-1'}, {'timeout': 'x'},
+                                    {'max_depth': 'nan'}, {'max_depth': 'inf'}, {'max_depth': '0'}])
+def test_solve_limits_rejected(limits):
+    assert web.solve_limits(limits)[1][1] == 400
+
+
+def test_solve_limits_clamped():
+    assert web.solve_limits({'max_depth': '30', 'timeout': '1e9'}) == ((24, web.SOLVE_MAX_TIMEOUT), None)
+    assert web.solve_limits({'max_depth': '1', 'timeout': '0.5'}) == ((web.SOLVE_MIN_DEPTH, 0.5), None)
+
+
+@pytest.mark.parametrize('timeout', ['nan', 'inf'])
+def test_solve_non_finite_timeout(client, timeout):
+    assert client.post('/solve', json={'state': STATE, 'timeout': timeout}).status_code == 400
+    assert client.get('/solve', query_string={'state': STATE, 'timeout': timeout}).status_code == 400
+    assert asgi_request('POST', '/solve', body={'state': STATE, 'timeout': timeout})[0] == 400
+    assert asgi_request('GET', '/solve', 'state=%s&timeout=%s' % (STATE, timeout))[0] == 400
+
+
+def test_solve_overloaded(client, monkeypatch):
+    admission = pykociemba.AdmissionController(1, 0)
+    monkeypatch.setattr(web, 'admission', admission)
+    with admission.admit(10):
+        response = client.post('/solve', json={'state': STATE})
+        assert response.status_code == 503
+        assert int(response.headers['Retry-After']) >= 1
+        status, headers, _ = asgi_request('POST', '/solve', body={'state': STATE})
+        assert status == 503
+        assert int(headers['retry-after']) >= 1
+    assert client.post('/solve', json={'state': STATE}).get_json()['solution'] == SOLUTION.replace(' . ', ' ')
+    assert asgi_request('POST', '/solve', body={'state': STATE})[0] == 200
+
+
+def events(body):
+    """The (event, data) pairs of a server-sent event stream, without the keep-alive comments."""
+    parsed = []
+    for block in body.decode().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.splitlines() if not line.startswith(':'))
+        if lines:
+            parsed.append((lines['event'], json.loads(lines['data'])))
+    return parsed
+
+
+def stream(client, query):
+    """The events of a /solve_stream request to the Flask app, and the same from the ASGI app."""
+    response = client.get('/solve_stream?' + query)
+    assert response.status_code == 200
+    flask_events = events(response.get_data())
+    status, headers, body = asgi_request('GET', '/solve_stream', query)
+    assert status == 200 and headers['content-type'] == 'text/event-stream'
+    return flask_events, events(body)
+
+
+def test_solve_stream_target(client):
+    for found in stream(client, 'state=%s&target=30' % STATE):
+        assert found == [('solution', found[0][1]), ('done', {'reason': 'target'})]
+        assert found[0][1]['solution'] == SOLUTION.replace(' . ', ' ')
+
+
+def test_solve_stream_book(client):
+    # a phase-1-only solution from the opening book, then no shorter one
+    state = pykociemba.scramble_to_state.scramble_to_state(['R', 'U'])
+    for found in stream(client, 'state=%s' % state):
+        assert [event for event, _ in found] == ['solution', 'done']
+        assert found[0][1]['solution'] == "U' R'"
+        assert (found[0][1]['phase1_moves'], found[0][1]['phase2_moves']) == (2, 0)
+        assert found[1][1] == {'reason': 'exhausted'}
+
+
+def test_solve_stream_errors(client, monkeypatch):
+    assert client.get('/solve_stream?state=%s&timeout=nan' % STATE).status_code == 400
+    assert asgi_request('GET', '/solve_stream', 'state=%s&timeout=nan' % STATE)[0] == 400
+    for found in stream(client, 'state=%s' % ('U' * 54)):
+        assert found == [('error', {'error': 'Error 1'})]
+
+    admission = pykociemba.AdmissionController(1, 0)
+    monkeypatch.setattr(web, 'admission', admission)
+    with admission.admit(10):
+        for found in stream(client, 'state=%s' % STATE):
+            assert found[0][0] == 'error' and found[0][1]['retry_after'] >= 1
+
+
+def test_solve_etag(client):
+    query = 'state=%s&max_depth=24' % STATE
+    response = client.get('/solve?' + query)
+    tag = response.headers['ETag']
+    assert response.get_json() == {'solution': SOLUTION.replace(' . ', ' '), 'solution_length': 21,
+                                   'phase1_moves': 11, 'phase2_moves': 10}
+    assert response.headers['Cache-Control'] == 'public, max-age=%d' % web.SOLVE_CACHE_MAX_AGE
+    status, headers, body = asgi_request('GET', '/solve', query)
+    assert (status, headers['etag'], json.loads(body)) == (200, tag, response.get_json())
+
+    response = client.get('/solve?' + query, headers={'If-None-Match': 'W/"other", ' + tag})
+    assert (response.status_code, response.data, response.headers['ETag']) == (304, b'', tag)
+    status, headers, body = asgi_request('GET', '/solve', query, headers=[('if-none-match', tag)])
+    assert (status, headers['etag'], body) == (304, tag, b'')
+
+    # another max_depth is another response, while a POST is never cached
+    assert client.get('/solve?state=%s&max_depth=23' % STATE).headers['ETag'] != tag
+    assert 'ETag' not in client.post('/solve', json={'state': STATE}).headers
+
+
+def test_solve_timeout_not_cached(client, monkeypatch):
+    monkeypatch.setattr(pykociemba, 'solve', lambda *args, **kwargs: 'Error 8')
+    response = client.get('/solve?state=%s' % STATE)
+    assert response.headers['Cache-Control'] == 'no-store' and 'ETag' not in response.headers
+
+
+def test_state_etag(client):
+    response = client.get('/get_state_from_scramble', query_string={'scramble': 'R U'})
+    tag = response.headers['ETag']
+    assert response.get_json() == {'state': 'UUUUUUFFFUBBRRRRRRRRRFFDFFDDDBDDBDDBFFDLLLLLLLLLUBBUBB'}
+    # the same scramble with other whitespace has the same tag
+    assert client.get('/get_state_from_scramble', query_string={'scramble': ' R  U'},
+                      headers={'If-None-Match': tag}).status_code == 304
+    status, headers, _ = asgi_request('GET', '/get_state_from_scramble', 'scramble=R+U',
+                                      headers=[('if-none-match', tag)])
+    assert (status, headers['etag']) == (304, tag)
+    assert client.get('/get_state_from_scramble', query_string={'scramble': 'R U2'}).headers['ETag'] != tag
+
+
+def test_get_scramble(client, monkeypatch):
+    # random face turns by default
+    assert web.scramble_pool is None
+    assert len(client.get('/get_scramble').get_json()['scramble'].split()) > 0
+
+    pool = pykociemba.ScramblePool(1)
+    pool.scrambles.extend([['R', 'U'], ['F2']])
+    monkeypatch.setattr(web, 'scramble_pool', pool)
+    monkeypatch.setattr(pool, 'start', lambda: pool)
+    assert client.get('/get_scramble').get_json() == {'scramble': 'R U'}
+    assert asgi_request('GET', '/get_scramble')[::2] == (200, b'{"scramble": "F2"}')
@@ -0,0 +1,62 @@
+import csv
+import gc
+import json
+
+import pytest
+
+from pykociemba.__main__ import main
+from pykociemba.batch import done_ids, parse_lines, solve_batch
+
+SCRAMBLES = ['R U F', 'D L B2', "U R2 F'", 'L2 D']
+SOLUTIONS = ["F' U' R'", "B2 L' D'", "F R2 U'", "D' L2"]
+
+
+def read_jsonl(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_parse_lines():
+    lines = ['R U\n', '\n', 'x\tD L\n']
+    assert list(parse_lines(lines)) == [(0, '1', 'R U'), (2, 'x', 'D L')]
+
+
+@pytest.mark.parametrize('threads', [False, True])
+def test_solve_batch(tmp_path, threads):
+    path = str(tmp_path / 'out.jsonl')
+    assert solve_batch(SCRAMBLES, path, workers=2, scrambles=True, threads=threads) == (4, 0)
+    records = sorted(read_jsonl(path), key=lambda record: record['seq'])
+    assert [record['solution'] for record in records] == SOLUTIONS
+    assert [record['id'] for record in records] == ['1', '2', '3', '4']
+    assert gc.get_freeze_count() == 0
+
+
+def test_resume(tmp_path):
+    path = str(tmp_path / 'out.jsonl')
+    solve_batch(SCRAMBLES[:2], path, workers=1, scrambles=True)
+    # an interrupted run leaves a partial last line
+    with open(path, 'a') as f:
+        f.write('{"id": "3", "se')
+    assert done_ids(path, 'jsonl') == {'1', '2'}
+    assert solve_batch(SCRAMBLES, path, workers=1, scrambles=True, resume=True) == (2, 2)
+    records = read_jsonl(path)
+    assert sorted(record['id'] for record in records) == ['1', '2', '3', '4']
+
+
+def test_errors(tmp_path):
+    path = str(tmp_path / 'out.jsonl')
+    solve_batch(['U' * 54], path, workers=1)
+    record, = read_jsonl(path)
+    assert record['error'] == 'Error 1' and record['solution'] is None and record['length'] is None
+
+
+def test_command_csv(tmp_path):
+    source = tmp_path / 'in.txt'
+    source.write_text(''.join('c%d\t%s\n' % (i, scramble) for i, scramble in enumerate(SCRAMBLES)))
+    path = str(tmp_path / 'out.csv')
+    main(['solve-batch', str(source), '-o', path, '--scrambles', '-j', '2'])
+    main(['solve-batch', str(source), '-o', path, '--scrambles', '-j', '2', '--resume'])
+    with open(path) as f:
+        rows = list(csv.DictReader(f))
+    assert sorted((row['id'], row['solution']) for row in rows) == [('c%d' % i, solution)
+                                                                    for i, solution in enumerate(SOLUTIONS)]
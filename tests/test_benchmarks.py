@@ -0,0 +1,32 @@
+import pytest
+
+from benchmarks import solve, startup
+
+META = {'python': '3.12.0', 'implementation': 'CPython', 'machine': 'x86_64', 'count': 20, 'seed': 0, 'warmup': 2,
+        'repeat': 1, 'max_depth': 24, 'engine': 'search', 'timeout': 1000, 'import_runs': 5}
+
+
+def results(p50, **meta):
+    return {'meta': dict(META, **meta), 'corpora': {'random': {'p50_ms': p50, 'p90_ms': 10.0, 'mean_ms': 10.0}}}
+
+
+def test_compare():
+    assert solve.compare(results(10.5), results(10.0), 0.1) == []
+    assert solve.compare(results(12.0), results(10.0), 0.1) == [('random', 'p50_ms', 10.0, 12.0)]
+
+
+@pytest.mark.parametrize('meta', [{'engine': 'frontier'}, {'count': 50}, {'seed': 1}, {'python': '3.13.0'}])
+def test_compare_other_settings(meta):
+    with pytest.raises(solve.Incomparable):
+        solve.compare(results(10.0, **meta), results(10.0), 0.1)
+
+
+def test_compare_startup():
+    new = dict(results(10.0, count=50), startup={'cold_import_ms': 100.0, 'warm_import_ms': 50.0,
+                                                 'total_load_ms': 40.0})
+    old = dict(results(10.0), startup={'cold_import_ms': 100.0, 'warm_import_ms': 50.0, 'total_load_ms': 30.0})
+    del new['corpora']['random']
+    # the corpus settings do not matter for the startup summary
+    assert startup.compare(new, old, 0.1) == [('startup', 'total_load_ms', 30.0, 40.0)]
+    with pytest.raises(solve.Incomparable):
+        startup.compare(dict(new, meta=dict(new['meta'], python='3.13.0')), old, 0.1)
@@ -0,0 +1,73 @@
+"""The distances in the opening book, and solve() looking cubes up in it."""
+import pytest
+
+import pykociemba
+from pykociemba import book as book_module
+from pykociemba.scramble_to_state import scramble_to_state
+
+SOLVED = 'UUUUUUUUURRRRRRRRRFFFFFFFFFDDDDDDDDDLLLLLLLLLBBBBBBBBB'
+
+
+@pytest.mark.parametrize('scramble, distance', [
+    ('', 0),
+    ('R', 1),
+    ('R R', 1),
+    ('R L', 2),
+    ("U D U'", 1),
+    ('R U F L D', 5),
+    ("R U R' U' F2", 5),
+])
+def test_book_distance(scramble, distance):
+    pytest.importorskip('numpy')
+    from pykociemba.book import opening_book
+
+    book = opening_book()
+    state = scramble_to_state(scramble.split())
+    assert book.distance(state) == distance
+    solution = book.solution(state)
+    assert len(solution) == distance
+    assert scramble_to_state(scramble.split() + solution) == SOLVED
+
+
+def test_book_miss():
+    pytest.importorskip('numpy')
+    from pykociemba.book import opening_book
+
+    state = scramble_to_state("R U F L D B R2".split())
+    assert opening_book().distance(state) is None
+    assert opening_book().solution(state) is None
+
+
+def test_solve_from_book():
+    pytest.importorskip('numpy')
+    state = scramble_to_state(['R', 'U'])
+    timings = {}
+    assert pykociemba.solve(state, timings=timings) == "U' R'"
+    assert 'book' in timings and 'phase1' not in timings
+    # the book's solutions are optimal, so there is none shorter
+    assert pykociemba.solve(state, max_depth=1) == 'Error 7'
+    assert pykociemba.solve('U' * 54) == 'Error 1'
+
+
+def test_book_without_cache(monkeypatch):
+    pytest.importorskip('numpy')
+
+    def unwritable(table, name):
+        raise PermissionError(name)
+
+    monkeypatch.setattr(book_module, 'load_cachetable', lambda name: None)
+    monkeypatch.setattr(book_module, 'dump_cachetable', unwritable)
+    book = book_module.OpeningBook(2)
+    assert book.distance(scramble_to_state(['R', 'U'])) == 2
+
+
+def test_solve_without_book(monkeypatch):
+    def broken(*args):
+        raise MemoryError()
+
+    monkeypatch.setattr(book_module, '_book', None)
+    monkeypatch.setattr(book_module, '_book_failed', False)
+    monkeypatch.setattr(book_module, 'OpeningBook', broken)
+    state = scramble_to_state(['R', 'U'])
+    assert book_module.opening_book() is None
+    assert pykociemba.solve(state) == "U' R'"
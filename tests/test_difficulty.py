@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from pykociemba.difficulty import _lower_bound, estimate, lower_bounds
+from pykociemba.facecube import FaceCube
+from pykociemba.scramble_to_state import scramble_to_state
+from pykociemba.tools import verify
+
+from solutions import SOLUTIONS
+
+SOLVED = 'UUUUUUUUURRRRRRRRRFFFFFFFFFDDDDDDDDDLLLLLLLLLBBBBBBBBB'
+
+
+def test_lower_bounds():
+    cubes = [cube for cube, solution in SOLUTIONS] + [SOLVED, 'U' * 54, 'x']
+    expected = [_lower_bound(FaceCube(cube).toCubieCube()) for cube, solution in SOLUTIONS] + [0, -1, -1]
+    assert lower_bounds(cubes) == expected
+    for bound, (cube, solution) in zip(expected, SOLUTIONS):
+        assert 0 < bound <= len(solution.replace(' . ', ' ').split())
+
+
+def test_invalid_cubes():
+    # five UD-slice edges, which once indexed past the binomial table
+    assert lower_bounds(['UUUUUUUUURRRRDRRRRFDFFLFFFFDDDFDRDDDLFLLLLLLLBBBBBBBBB']) == [-1]
+    # facelets swapped at random: invalid exactly where verify() says so
+    rng = random.Random(5)
+    cubes = []
+    for _ in range(300):
+        cube = list(SOLUTIONS[rng.randrange(len(SOLUTIONS))][0])
+        i, j = rng.sample(range(54), 2)
+        cube[i], cube[j] = cube[j], cube[i]
+        cubes.append(''.join(cube))
+    assert [bound < 0 for bound in lower_bounds(cubes)] == [verify(cube) != 0 for cube in cubes]
+
+
+def test_arrays():
+    pytest.importorskip('numpy')
+    from pykociemba.randomstates import random_states
+
+    arrays = random_states(50, seed=6, output='arrays')
+    cubes = random_states(50, seed=6)
+    assert lower_bounds(arrays) == lower_bounds(cubes)
+
+    cp, co, ep, eo = (a.copy() for a in arrays)
+    ep[0, :2] = ep[0, 1::-1]    # wrong parity
+    co[1, 0] += 3               # out of range, with a valid sum
+    eo[2, 0] ^= 1               # wrong flip
+    bounds = lower_bounds((cp, co, ep, eo))
+    assert bounds[:3] == [-1, -1, -1] and bounds[3:] == lower_bounds(cubes)[3:]
+
+
+def test_estimate():
+    near = scramble_to_state("R U F'".split())
+    cube, solution = SOLUTIONS[0]
+    (lower, upper), book, solved, invalid = estimate([cube, near, SOLVED, 'U' * 54], timeout=10)
+    assert lower <= upper <= len(solution.replace(' . ', ' ').split())
+    # the opening book knows the optimal length
+    assert book[1] == 3 and book[0] <= 3
+    assert solved == (0, 0)
+    assert invalid == (None, None)
@@ -0,0 +1,44 @@
+from collections import Counter
+
+import pytest
+
+from pykociemba import endgame as endgame_module
+from pykociemba.search import Search
+
+from solutions import CASES, SOLUTIONS
+
+
+@pytest.mark.parametrize('cube, maxDepth, solution', CASES)
+def test_endgame(cube, maxDepth, solution):
+    pytest.importorskip('numpy')
+    from pykociemba.endgame import endgame_table
+
+    search = Search()
+    search.endgame = endgame_table()
+    assert search.solution(cube, maxDepth, 1000, True) == solution
+
+
+def test_fewer_phase2_nodes():
+    pytest.importorskip('numpy')
+    from pykociemba.endgame import endgame_table
+
+    cube, solution = SOLUTIONS[0]
+    search, lookup = Search(), Search()
+    lookup.endgame = endgame_table()
+    assert search.solution(cube, 24, 1000, True) == lookup.solution(cube, 24, 1000, True) == solution
+    assert lookup.nodesPhase2 < search.nodesPhase2
+
+
+def test_table_without_cache(monkeypatch):
+    pytest.importorskip('numpy')
+
+    def unwritable(table, name):
+        raise PermissionError(name)
+
+    monkeypatch.setattr(endgame_module, 'load_cachetable', lambda name: None)
+    monkeypatch.setattr(endgame_module, 'dump_cachetable', unwritable)
+    table = endgame_module.EndgameTable(3)
+    # the phase-2 cubes within 3 moves: 1 + 10 + 67 + 456
+    assert len(table) == 534
+    assert Counter(table.distances) == {0: 1, 1: 10, 2: 67, 3: 456}
+    assert table.distance(0, 0, 0, 0) == 0
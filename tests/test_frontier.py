@@ -0,0 +1,23 @@
+import pytest
+
+from pykociemba.frontier import FrontierSearch
+from pykociemba.search import Search
+
+from solutions import CASES, SOLUTIONS
+
+
+@pytest.mark.parametrize('cube, maxDepth, solution', CASES)
+def test_frontier(cube, maxDepth, solution):
+    pytest.importorskip('numpy')
+    assert FrontierSearch().solution(cube, maxDepth, 1000, True) == solution
+
+
+@pytest.mark.parametrize('twistFlipPruning', [True, False])
+def test_frontier_nodes(monkeypatch, twistFlipPruning):
+    # without a solution within 10 moves both search the whole tree, with the same pruning
+    pytest.importorskip('numpy')
+    monkeypatch.setattr(Search, 'twistFlipPruning', twistFlipPruning)
+    for cube, solution in SOLUTIONS[:3]:
+        search, frontier = Search(), FrontierSearch()
+        assert search.solution(cube, 10, 1000, True) == frontier.solution(cube, 10, 1000, True) == 'Error 7'
+        assert frontier.nodesPhase1 == search.nodesPhase1
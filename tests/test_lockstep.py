@@ -0,0 +1,53 @@
+import threading
+import time
+
+import pytest
+
+from pykociemba.lockstep import LockstepSolver
+from pykociemba.search import Search
+
+from solutions import SOLUTIONS
+
+pytest.importorskip('numpy')
+
+
+@pytest.mark.parametrize('lanes, tail', [(4, 16), (4, 0), (16, 16)])
+def test_lockstep(lanes, tail):
+    cubes = [cube for cube, solution in SOLUTIONS] + ['U' * 54]
+    expected = [solution for cube, solution in SOLUTIONS] + ['Error 1']
+    assert LockstepSolver(24, 1000, lanes=lanes, tail=tail).solve(cubes, True) == expected
+
+
+@pytest.mark.parametrize('twistFlipPruning', [True, False])
+@pytest.mark.parametrize('tail', [16, 0])
+def test_nodes(monkeypatch, twistFlipPruning, tail):
+    # without a solution within 10 moves both search the whole tree, with the same pruning
+    monkeypatch.setattr(Search, 'twistFlipPruning', twistFlipPruning)
+    cubes = [cube for cube, solution in SOLUTIONS[:3]]
+    nodes = 0
+    for cube in cubes:
+        search = Search()
+        assert search.solution(cube, 10, 1000, True) == 'Error 7'
+        nodes += search.nodesPhase1
+    solver = LockstepSolver(10, 1000, lanes=2, tail=tail)
+    assert solver.solve(cubes) == ['Error 7'] * 3
+    assert solver.nodesPhase1 == nodes
+
+
+@pytest.mark.parametrize('tail', [16, 0])
+def test_timeout(tail):
+    # no solution within 18 moves, and far too many nodes to rule that out in half a second
+    cubes = [cube for cube, solution in SOLUTIONS]
+    start = time.time()
+    results = LockstepSolver(18, 0.5, lanes=len(cubes), tail=tail).solve(cubes)
+    assert time.time() - start < 1.0
+    assert results == ['Error 8'] * len(cubes)
+
+
+def test_cancel():
+    cubes = [cube for cube, solution in SOLUTIONS]
+    solver = LockstepSolver(18, 1000, lanes=len(cubes), tail=0)
+    threading.Timer(0.3, solver.cancel).start()
+    start = time.time()
+    assert solver.solve(cubes) == ['Error 8'] * len(cubes)
+    assert time.time() - start < 1.0
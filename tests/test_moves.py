@@ -0,0 +1,36 @@
+"""The canonical move sequences: one for every state within 3 moves of solved, in both phases."""
+import pytest
+
+from pykociemba.moves import AXIS, PHASE2_MOVES, PHASE2_SUCCESSORS, POWER, START, SUCCESSORS
+from pykociemba.scramble_to_state import scramble_to_state
+
+
+def sequences(successors, length):
+    found = [((), START)]
+    for _ in range(length):
+        found = [(moves + (mv,), AXIS[mv]) for moves, state in found for mv in successors[state]]
+    return [moves for moves, state in found]
+
+
+def state(moves):
+    return scramble_to_state(['URFDLB'[AXIS[mv]] + ('', '2', "'")[POWER[mv] - 1] for mv in moves])
+
+
+@pytest.mark.parametrize('successors, counts', [
+    # the number of states at distance 0..3 in the face turn metric, and in the phase-2 group
+    (SUCCESSORS, [1, 18, 243, 3240]),
+    (PHASE2_SUCCESSORS, [1, 10, 67, 456]),
+])
+def test_canonical_sequences(successors, counts):
+    seen = set()
+    for length, count in enumerate(counts):
+        found = sequences(successors, length)
+        assert len(found) == count
+        seen.update(state(moves) for moves in found)
+        assert len(seen) == sum(counts[:length + 1])
+
+
+def test_phase2_moves():
+    # U, U2, U', R2, F2, D, D2, D', L2, B2
+    assert PHASE2_MOVES == (0, 1, 2, 4, 7, 9, 10, 11, 13, 16)
+    assert all(mv in PHASE2_MOVES for moves in PHASE2_SUCCESSORS for mv in moves)
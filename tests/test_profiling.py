@@ -0,0 +1,43 @@
+import glob
+import os
+import re
+import shutil
+
+import pykociemba
+from pykociemba.profiling import SamplingProfiler
+
+CUBE = 'DRLUUBFBRBLURRLRUBLRDDFDLFUFUFFDBRDUBRUFLLFDDBFLUBLRBD'
+SOLUTION = "D2 R' D' F2 B D R2 D2 R' . F2 D' F2 U' B2 L2 U2 D R2 U"
+
+
+def test_sampled(tmp_path):
+    profiler = SamplingProfiler(str(tmp_path), sample_rate=1)
+    assert profiler.call('../up/and away', pykociemba.solve, CUBE) == SOLUTION
+    files = os.listdir(str(tmp_path))
+    assert len(files) == 1
+    assert re.match(r'\d{8}T\d{6}-sampled-_up_and_away-\d+ms\.pstats$', files[0])
+    assert not glob.glob(str(tmp_path.parent / '*.pstats'))
+
+
+def test_unwritable(tmp_path):
+    directory = str(tmp_path / 'profiles')
+    profiler = SamplingProfiler(directory, sample_rate=1)
+    shutil.rmtree(directory)
+    assert profiler.call(CUBE, pykociemba.solve, CUBE) == SOLUTION
+
+
+def test_rotate(tmp_path):
+    profiler = SamplingProfiler(str(tmp_path), sample_rate=1, max_files=2)
+    for _ in range(3):
+        profiler.call(CUBE, sum, [1, 2])
+    assert len(os.listdir(str(tmp_path))) <= 2
+
+
+def test_solve_invalid(tmp_path):
+    pykociemba.set_profiler(SamplingProfiler(str(tmp_path), sample_rate=1))
+    try:
+        assert pykociemba.solve('U' * 54, book=False) == 'Error 1'
+        assert pykociemba.solve(CUBE, book=False) == SOLUTION
+    finally:
+        pykociemba.set_profiler(None)
+    assert len(os.listdir(str(tmp_path))) == 1
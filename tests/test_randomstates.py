@@ -0,0 +1,50 @@
+import pytest
+
+from pykociemba.__main__ import main
+from pykociemba.tools import verify
+
+
+def test_pack_states():
+    np = pytest.importorskip('numpy')
+    from pykociemba.randomstates import pack_states, random_states, unpack_states
+
+    states = random_states(1000, seed=1, output='arrays')
+    packed = pack_states(*states)
+    for unpacked, original in zip(unpack_states(packed), states):
+        assert np.array_equal(unpacked, original)
+    assert np.array_equal(pack_states(*unpack_states(packed)), packed)
+
+
+def test_random_states_valid_and_seeded():
+    pytest.importorskip('numpy')
+    from pykociemba.randomstates import random_states
+
+    states = list(random_states(200, seed=2))
+    assert all(verify(state) == 0 for state in states)
+    assert len(set(states)) == 200
+    assert list(random_states(200, seed=2)) == states
+    assert list(random_states(200, seed=3)) != states
+
+
+def test_last_layer():
+    pytest.importorskip('numpy')
+    from pykociemba.randomstates import random_states
+
+    for state in random_states(100, seed=4, subset='last_layer'):
+        assert verify(state) == 0
+        # the two lower layers are solved
+        for face, start in (('R', 9), ('F', 18), ('L', 36), ('B', 45)):
+            assert state[start + 3:start + 9] == face * 6
+        assert state[27:36] == 'D' * 9
+
+
+def test_cli(tmp_path, capsys):
+    pytest.importorskip('numpy')
+    from pykociemba.randomstates import random_states
+
+    main(['random-states', '5', '--seed', '1'])
+    assert capsys.readouterr().out.split() == list(random_states(5, [1, 0]))
+    path = tmp_path / 'packed.txt'
+    main(['random-states', '5', '--seed', '1', '--packed', '-o', str(path)])
+    packed = [[int(n) for n in line.split()] for line in path.read_text().splitlines()]
+    assert packed == random_states(5, [1, 0], output='packed').tolist()
@@ -0,0 +1,37 @@
+from pykociemba.scramble_to_state import scramble_to_state
+from pykociemba.scramblepool import ScramblePool, invert, random_state_scramble
+from pykociemba.search import Search
+
+SOLVED = 'UUUUUUUUURRRRRRRRRFFFFFFFFFDDDDDDDDDLLLLLLLLLBBBBBBBBB'
+
+
+def test_invert():
+    assert invert(['R', "U'", 'F2']) == ['F2', 'U', "R'"]
+
+
+def test_random_state_scramble():
+    scramble = random_state_scramble(min_length=18)
+    assert len(scramble) >= 18
+    assert scramble_to_state(scramble + invert(scramble)) == SOLVED
+
+
+def test_refill():
+    with ScramblePool(2) as pool:
+        scramble = pool.get(60)
+        assert Search().solution(scramble_to_state(scramble), 24, 60, False).split() == invert(scramble)
+        assert pool.get(60) is not None
+
+
+def test_file_without_handed_out_scrambles(tmp_path):
+    path = tmp_path / 'pool.txt'
+    path.write_text("R U F\nD2 L'\nB\n")
+    pool = ScramblePool(3, path=str(path))
+    assert len(pool) == 3
+    assert pool.get(0) == ['R', 'U', 'F']
+    # a restart only finds the scrambles not handed out yet
+    assert path.read_text() == "D2 L'\nB\n"
+    assert ScramblePool(3, path=str(path)).get(0) == ['D2', "L'"]
+    assert pool.get(0) == ['D2', "L'"]
+    assert pool.get(0) == ['B']
+    assert pool.get(0) is None
+    assert path.read_text() == ''
@@ -0,0 +1,22 @@
+"""Search against the pinned solutions of solutions.py."""
+import pytest
+
+from pykociemba.search import Search
+
+from solutions import CASES, SOLUTIONS
+
+
+@pytest.mark.parametrize('cube, maxDepth, solution', CASES)
+def test_search(cube, maxDepth, solution):
+    assert Search().solution(cube, maxDepth, 1000, True) == solution
+
+
+def test_search_errors():
+    assert Search().solution('U' * 54, 24, 1000, True) == 'Error 1'
+    assert Search().solution(SOLUTIONS[0][0], 10, 1000, True) == 'Error 7'
+
+
+def test_phase1_only_solution():
+    # no separator without phase-2 moves after it
+    cube = 'UUUUUUFFFUBBRRRRRRRRRFFDFFDDDBDDBDDBFFDLLLLLLLLLUBBUBB'  # R U
+    assert Search().solution(cube, 24, 1000, True) == "U' R'"
@@ -0,0 +1,42 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import pykociemba
+from pykociemba.scramble_to_state import scramble_to_state
+
+from solutions import SOLUTIONS
+
+
+def test_solve_async():
+    cube, solution = SOLUTIONS[0]
+    timings = {}
+    assert asyncio.run(pykociemba.solve_async(cube, timings=timings)) == solution
+    assert 'phase1' in timings and 'phase2' in timings
+
+
+def test_book():
+    pytest.importorskip('numpy')
+    cube = scramble_to_state('R U F L D'.split())
+    assert asyncio.run(pykociemba.solve_async(cube)) == "D' L' F' U' R'"
+    assert asyncio.run(pykociemba.solve_async(cube, max_depth=2)) == 'Error 7'
+
+
+def test_cancel():
+    # no solution within 18 moves: the search would run until its timeout
+    cube = SOLUTIONS[0][0]
+    executor = ThreadPoolExecutor(1)
+
+    async def cancelled():
+        task = asyncio.ensure_future(pykociemba.solve_async(cube, timeout=60, max_depth=18, executor=executor))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancelled())
+    start = time.time()
+    executor.shutdown(wait=True)
+    assert time.time() - start < 1.0
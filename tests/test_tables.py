@@ -0,0 +1,113 @@
+"""Round trips of the memory-mapped table file."""
+import json
+import os
+import struct
+import subprocess
+import sys
+
+import pytest
+
+from pykociemba import coordcube
+from pykociemba.coordcube import CoordCube, TABLES, attach_tables, export_tables, table_file_header, tables_digest
+from pykociemba.search import SOLVER_VERSION, solver_version
+from pykociemba.subinterpreters import WORKER, InterpreterPool, interpreters
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CUBE = 'DRLUUBFBRBLURRLRUBLRDDFDLFUFUFFDBRDUBRUFLLFDDBFLUBLRBD'
+SOLUTION = "D2 R' D' F2 B D R2 D2 R' . F2 D' F2 U' B2 L2 U2 D R2 U"
+
+
+@pytest.fixture(scope='module')
+def table_file(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('tables') / 'tables.mmap')
+    export_tables(path)
+    return path
+
+
+def rewrite(source, path, change_header=None, change_data=None):
+    """Copy the table file source to path with its header and data changed."""
+    with open(source, 'rb') as f:
+        data = f.read()
+    start = len(coordcube.MMAP_MAGIC) + 4
+    size, = struct.unpack('<I', data[len(coordcube.MMAP_MAGIC):start])
+    header = json.loads(data[start:start + size].decode())
+    body = bytearray(data[start + size:])
+    if change_header:
+        change_header(header)
+    if change_data:
+        change_data(body)
+    with open(path, 'wb') as f:
+        f.write(data[:start] + json.dumps(header).encode().ljust(size) + bytes(body))
+    return path
+
+
+def test_export_attach(table_file):
+    header = table_file_header(table_file)
+    assert header['solver_version'] == SOLVER_VERSION
+    assert header['digest'] == tables_digest()
+    tables = attach_tables(table_file)
+    assert sorted(tables) == sorted(TABLES)
+    for name, table in tables.items():
+        loaded = getattr(CoordCube, name)
+        if isinstance(loaded, bytes):
+            assert bytes(table) == loaded
+        else:
+            assert [list(row) for row in table] == [list(row) for row in loaded]
+
+
+def test_attach_missing_table(table_file, tmp_path):
+    path = rewrite(table_file, str(tmp_path / 't.mmap'), lambda header: header['tables'].pop('Twist_Flip_Prun'))
+    with pytest.raises(ValueError, match='Twist_Flip_Prun'):
+        attach_tables(path)
+
+
+def test_attach_other_version(table_file, tmp_path):
+    path = rewrite(table_file, str(tmp_path / 't.mmap'), lambda header: header.update(solver_version=0))
+    with pytest.raises(ValueError, match='solver version 0'):
+        table_file_header(path)
+    with pytest.raises(ValueError, match='solver version 0'):
+        attach_tables(path)
+
+
+def test_attach_other_digest(table_file, tmp_path):
+    def change(body):
+        body[0] ^= 1
+    path = rewrite(table_file, str(tmp_path / 't.mmap'), change_data=change)
+    with pytest.raises(ValueError, match='digest'):
+        attach_tables(path)
+
+
+def test_import_attached(table_file):
+    # a fresh interpreter that attaches to the file through the -X option, not the environment
+    code = ('import os, pykociemba; from pykociemba import coordcube; '
+            'assert isinstance(coordcube.CoordCube.Slice_Flip_Prun, memoryview); '
+            'assert "PYKOCIEMBA_TABLES" not in os.environ; '
+            'print(pykociemba.solver_version(), pykociemba.Search().solution(%r, 24, 1000, True))' % CUBE)
+    env = {key: value for key, value in os.environ.items() if key != 'PYKOCIEMBA_TABLES'}
+    out = subprocess.check_output([sys.executable, '-X', 'pykociemba_tables=' + table_file, '-c', code], env=env,
+                                  cwd=ROOT, text=True)
+    assert out.split(' ', 1) == [solver_version(), SOLUTION + '\n']
+
+
+def test_worker(table_file):
+    # the worker script of InterpreterPool, run in a fresh interpreter with lists for its queues
+    code = ('import queue, sys\n'
+            'requests, results = queue.Queue(), queue.Queue()\n'
+            'for request in [(0, %r, 24, 1000, True), (1, "x", 24, 1000, True), None]: requests.put(request)\n'
+            'exec(%r, {"requests": requests, "results": results, "path": tuple(sys.path), "tables": %r})\n'
+            'from pykociemba import coordcube\n'
+            'assert isinstance(coordcube.CoordCube.Slice_Flip_Prun, memoryview)\n'
+            'print(results.get()); print(results.get())' % (CUBE, WORKER, table_file))
+    out = subprocess.check_output([sys.executable, '-c', code], cwd=ROOT, text=True).splitlines()
+    assert out == [repr((0, SOLUTION, None)), repr((1, 'Error 1', None))]
+
+
+@pytest.mark.skipif(interpreters is None, reason='needs Python 3.14 (concurrent.interpreters)')
+def test_interpreter_pool(tmp_path):
+    path = str(tmp_path / 'tables.mmap')
+    # a stale file is exported again
+    with open(path, 'wb') as f:
+        f.write(b'stale')
+    with InterpreterPool(2, path) as pool:
+        assert pool.map([CUBE, 'x', CUBE]) == [SOLUTION, 'Error 1', SOLUTION]
+    assert table_file_header(path)['digest'] == tables_digest()
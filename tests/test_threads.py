@@ -0,0 +1,21 @@
+from unittest import mock
+
+from pykociemba import threads
+from pykociemba.threads import solve_many
+
+from solutions import SOLUTIONS
+
+
+def test_solve_many():
+    cubes = [cube for cube, solution in SOLUTIONS[:3]] + ['U' * 54]
+    expected = [solution for cube, solution in SOLUTIONS[:3]] + ['Error 1']
+    assert solve_many(cubes, workers=3) == expected
+
+
+def test_default_workers():
+    for enabled, workers in ((True, 1), (False, 8)):
+        with mock.patch.object(threads, 'gil_enabled', return_value=enabled), \
+                mock.patch.object(threads.os, 'cpu_count', return_value=8), \
+                mock.patch.object(threads, 'ThreadPoolExecutor', wraps=threads.ThreadPoolExecutor) as executor:
+            assert solve_many(['U' * 54]) == ['Error 1']
+        executor.assert_called_once_with(workers)